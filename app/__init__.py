@@ -1,3 +1,4 @@
+import logging
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
@@ -6,12 +7,31 @@ from app.config import Config
 # Inicializar extensiones
 db = SQLAlchemy()
 login_manager = LoginManager()
+logger = logging.getLogger(__name__)
 
 def create_app(config_class=Config):
     """Factory pattern para crear la aplicación Flask"""
-    app = Flask(__name__)
+    app = Flask(__name__, template_folder='../templates', static_folder='../static')
     app.config.from_object(config_class)
     
+    # Logging estructurado con request_id, escrito fuera del hilo del request
+    from app.utils.logs import init_logs
+    init_logs(app)
+    logger.info('Usando base de datos: %s...', app.config['SQLALCHEMY_DATABASE_URI'][:50])
+    
+    # Perfilado a pedido para administradores (antes que los demás hooks, para cubrirlos;
+    # solo el request_id de los logs se asigna antes)
+    from app.utils.profiling import init_profiling
+    init_profiling(app)
+    
+    # Serialización JSON rápida (orjson/msgspec si están instalados)
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
+    # Caché de bytecode de Jinja (antes de crear app.jinja_env)
+    from app.utils.templating import init_template_cache, warmup_templates
+    init_template_cache(app)
+    
     # Inicializar extensiones con la app
     db.init_app(app)
     login_manager.init_app(app)
@@ -19,6 +39,18 @@ def create_app(config_class=Config):
     login_manager.login_message = 'Por favor inicia sesión para acceder a esta página.'
     login_manager.login_message_category = 'info'
     
+    # Fotos: se eliminan al hacer commit y las recién subidas se descartan en rollback
+    from app.utils.helpers import init_fotos
+    init_fotos(db)
+    
+    # Bus de invalidación: lo que un worker invalida se invalida en todos
+    from app.utils.bus import init_bus
+    init_bus(app, db)
+    
+    # Caché de fragmentos de plantillas
+    from app.utils.cache import init_cache
+    init_cache(app)
+    
     # Registrar blueprints
     from app.routes.main import bp as main_bp
     app.register_blueprint(main_bp)
@@ -32,6 +64,34 @@ def create_app(config_class=Config):
     from app.routes.usuarios import bp as usuarios_bp
     app.register_blueprint(usuarios_bp)
     
+    from app.routes.asistencia import bp as asistencia_bp
+    app.register_blueprint(asistencia_bp)
+    
+    from app.routes.pwa import bp as pwa_bp
+    app.register_blueprint(pwa_bp)
+    
+    from app.routes.auditoria import bp as auditoria_bp
+    app.register_blueprint(auditoria_bp)
+    
+    from app.routes.torneos import bp as torneos_bp
+    app.register_blueprint(torneos_bp)
+    
+    # Check-in de asistencia: índice de RUT en memoria y escritura por lotes
+    from app.utils.checkin import init_checkin
+    init_checkin(app, db)
+    
+    # Auditoría de acciones de administración, escrita por lotes después del commit
+    from app.utils.auditoria import init_auditoria
+    init_auditoria(app, db)
+    
+    # Conteo de sentencias SQL por request, detector N+1 y log de consultas lentas
+    from app.utils.sql_monitor import init_sql_monitor
+    init_sql_monitor(app, db)
+    
+    # Métricas Prometheus (latencia por endpoint, tiempo de BD y de render)
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+    
     # Callback para cargar usuario
     from app.models.usuario import Usuario
     
@@ -39,10 +99,47 @@ def create_app(config_class=Config):
     def load_user(user_id):
         return Usuario.query.get(int(user_id))
     
+    # Archivos estáticos con hash y precomprimidos, entregados por el proxy si hay uno
+    from app.utils.delivery import init_delivery
+    init_delivery(app)
+    from app.utils.assets import init_assets
+    init_assets(app)
+    
+    # Compresión de respuestas HTML/JSON (gzip, brotli, zstd)
+    if app.config.get('COMPRESS_ENABLED'):
+        from app.utils.compression import CompressionMiddleware
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config['COMPRESS_MIN_SIZE'],
+            levels={
+                'gzip': app.config['COMPRESS_LEVEL_GZIP'],
+                'br': app.config['COMPRESS_LEVEL_BR'],
+                'zstd': app.config['COMPRESS_LEVEL_ZSTD'],
+            },
+        )
+    
+    # Precompilar plantillas al arrancar el worker
+    if app.config.get('TEMPLATE_WARMUP'):
+        warmup_templates(app)
+    
     # Inicializar base de datos
     with app.app_context():
         db.create_all()
         
+        # Agregar columnas nuevas a tablas ya existentes
+        from app.utils.schema import ensure_columns
+        ensure_columns(db)
+        
+        # RUT canónico (rut_num) para filas anteriores a la columna
+        from app.models.alumno import Alumno
+        from app.utils.rut import backfill_rut, link_usuarios_alumnos
+        backfill_rut(db, Alumno, Usuario)
+        link_usuarios_alumnos(db, Usuario, Alumno)
+        
+        # Inicio del rango actual para alumnos anteriores al historial de promociones
+        from app.models.alumno import backfill_rango_desde
+        backfill_rango_desde()
+        
         # Crear usuario administrador por defecto si no existe
         try:
             admin_user = Usuario.query.filter_by(username='admin').first()
@@ -56,11 +153,11 @@ def create_app(config_class=Config):
                 admin.set_password('admin123')
                 db.session.add(admin)
                 db.session.commit()
-                print('[OK] Usuario administrador creado')
+                logger.info('Usuario administrador creado')
             else:
-                print('[INFO] Usuario administrador ya existe')
-        except Exception as e:
-            print(f'[ERROR] Error al crear usuario admin: {e}')
+                logger.info('Usuario administrador ya existe')
+        except Exception:
+            logger.exception('Error al crear usuario admin')
             db.session.rollback()
     
     return app
@@ -0,0 +1,151 @@
+"""
+API asíncrona (ASGI) de solo lectura para alumnos.
+
+Sirve /api/alumnos y /api/alumno/<id> con un motor SQLAlchemy asíncrono
+(aiosqlite / asyncpg) y delega el resto de las rutas a la app Flask.
+"""
+
+import re
+from http.cookies import SimpleCookie
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.alumno import Alumno, ALUMNO_JSON_SELECT, alumno_rows_to_dicts
+from app.models.usuario import Usuario
+
+# Drivers asíncronos equivalentes a los dialectos síncronos soportados
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+ALUMNO_RE = re.compile(r'^/api/alumno/(\d+)/?$')
+
+
+def async_database_url(database_url):
+    """Convierte la URL de la base de datos a su driver asíncrono"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'Base de datos sin driver asíncrono: {backend}')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+async def _send_json(send, status, data, dumps, head=False):
+    """Envía una respuesta JSON completa (en HEAD, solo los encabezados)"""
+    body = dumps(data).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    # Como Werkzeug: HEAD lleva el content-length del cuerpo que tendría un GET
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+class AlumnosAPI:
+    """Aplicación ASGI con la API de lectura de alumnos"""
+
+    def __init__(self, flask_app, fallback=None):
+        self.flask_app = flask_app
+        self.fallback = fallback
+        # Mismo proveedor JSON (orjson/msgspec/estándar) que la app Flask
+        self.dumps = flask_app.json.dumps
+        self.engine = create_async_engine(
+            async_database_url(flask_app.config['SQLALCHEMY_DATABASE_URI']),
+            pool_pre_ping=True,
+        )
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.cookie_name = flask_app.config.get('SESSION_COOKIE_NAME', 'session')
+        # Mismo serializador que usa Flask para firmar la cookie de sesión
+        self.serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+        self.max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        path = scope.get('path', '')
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            if path.rstrip('/') == '/api/alumnos':
+                await self._handle(scope, send, self.listar_alumnos)
+                return
+            match = ALUMNO_RE.match(path)
+            if match:
+                await self._handle(scope, send, self.obtener_alumno, int(match.group(1)))
+                return
+
+        if self.fallback is None:
+            await _send_json(send, 404, {'error': 'Ruta no encontrada'}, self.dumps,
+                             head=scope.get('method') == 'HEAD')
+            return
+        await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Maneja el ciclo de vida del servidor ASGI"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _user_id(self, scope):
+        """Obtiene el id del usuario desde la cookie de sesión de Flask"""
+        if self.serializer is None:
+            return None
+        cookie = SimpleCookie()
+        for name, value in scope.get('headers', []):
+            if name == b'cookie':
+                cookie.load(value.decode('latin-1'))
+        morsel = cookie.get(self.cookie_name)
+        if morsel is None:
+            return None
+        try:
+            data = self.serializer.loads(morsel.value, max_age=self.max_age)
+        except Exception:
+            return None
+        return data.get('_user_id')
+
+    async def _handle(self, scope, send, handler, *args):
+        """Verifica la sesión y ejecuta el handler con una sesión asíncrona"""
+        head = scope['method'] == 'HEAD'
+        user_id = self._user_id(scope)
+        if user_id is None:
+            await _send_json(send, 401, {'error': 'Autenticación requerida'}, self.dumps, head)
+            return
+
+        async with self.session_factory() as session:
+            usuario = await session.get(Usuario, int(user_id))
+            if usuario is None or not usuario.is_active:
+                await _send_json(send, 401, {'error': 'Autenticación requerida'}, self.dumps, head)
+                return
+            status, data = await handler(session, *args)
+        await _send_json(send, status, data, self.dumps, head)
+
+    async def listar_alumnos(self, session):
+        """Todos los alumnos, con la misma forma que Alumno.to_dict()"""
+        result = await session.execute(ALUMNO_JSON_SELECT)
+        return 200, alumno_rows_to_dicts(result)
+
+    async def obtener_alumno(self, session, id):
+        """Un alumno específico"""
+        result = await session.execute(ALUMNO_JSON_SELECT.where(Alumno.id == id))
+        rows = alumno_rows_to_dicts(result)
+        if not rows:
+            return 404, {'error': 'Alumno no encontrado'}
+        return 200, rows[0]
+
+
+def create_asgi_app(flask_app):
+    """Monta la API asíncrona delante de la app Flask (servida vía WSGI)"""
+    from a2wsgi import WSGIMiddleware
+    return AlumnosAPI(flask_app, fallback=WSGIMiddleware(flask_app))
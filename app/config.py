@@ -1,3 +1,4 @@
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -5,6 +6,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
+logger = logging.getLogger(__name__)
 
 class Config:
     """Configuración base de la aplicación"""
@@ -17,8 +19,8 @@ class Config:
     
     # Validar que DATABASE_URL sea una URL válida, no un hash
     if not database_url or not database_url.startswith(('sqlite://', 'postgresql://', 'postgres://')):
-        print(f'[WARNING] DATABASE_URL inválida o no configurada: {database_url}')
-        print('[INFO] Usando SQLite como fallback')
+        # Se carga antes de init_logs: sale por el handler por defecto de logging (stderr)
+        logger.warning('DATABASE_URL inválida o no configurada, usando SQLite como fallback: %s', database_url)
         # Fallback a SQLite para desarrollo local
         database_url = 'sqlite:///' + os.path.join(basedir, '..', 'alumnos.db')
     
@@ -30,19 +32,101 @@ class Config:
             if database_url.startswith('postgres://'):
                 database_url = database_url.replace('postgres://', 'postgresql://', 1)
         except ImportError:
-            print('[WARNING] psycopg2 no disponible, usando SQLite como fallback')
+            logger.warning('psycopg2 no disponible, usando SQLite como fallback')
             database_url = 'sqlite:///' + os.path.join(basedir, '..', 'alumnos.db')
     
     SQLALCHEMY_DATABASE_URI = database_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    print(f'[INFO] Usando base de datos: {database_url[:50]}...')
-    
     # Configuración de archivos
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'static', 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max
     
+    # Proveedor JSON: 'auto' (orjson > msgspec > estándar), 'orjson', 'msgspec' o 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Caché de fragmentos de plantillas: 'lru' (en memoria), 'redis' o 'null'
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'lru')
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 5000))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 3600))  # Segundos (solo redis)
+    
+    # Invalidación de cachés en memoria entre workers: 'auto', 'postgres' (NOTIFY), 'archivo' o 'local'
+    BUS_BACKEND = os.environ.get('BUS_BACKEND', 'auto')
+    BUS_DIR = os.environ.get('BUS_DIR') or os.path.join(basedir, '..', '.bus')  # Transporte 'archivo' (un solo host)
+    BUS_INTERVALO = float(os.environ.get('BUS_INTERVALO', 0.5))  # Segundos entre lecturas del archivo o esperas de NOTIFY
+    
+    # Caché de bytecode de Jinja compartida entre workers de gunicorn
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR') or os.path.join(basedir, '..', '.jinja_cache')
+    TEMPLATE_WARMUP = True  # Precompilar todas las plantillas al arrancar
+    
+    # Compresión de respuestas según Accept-Encoding
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # Bytes
+    COMPRESS_LEVEL_GZIP = int(os.environ.get('COMPRESS_LEVEL_GZIP', 6))  # 1-9
+    COMPRESS_LEVEL_BR = int(os.environ.get('COMPRESS_LEVEL_BR', 4))  # 0-11
+    COMPRESS_LEVEL_ZSTD = int(os.environ.get('COMPRESS_LEVEL_ZSTD', 3))  # 1-22
+    
+    # Monitoreo SQL por request
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))  # Log de consultas lentas
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))  # Repeticiones de una misma sentencia
+    SQL_SERVER_TIMING = os.environ.get('SQL_SERVER_TIMING', '1') == '1'  # Encabezado Server-Timing
+    
+    # Perfilado a pedido (?_profile=1 o X-Profile: 1, solo administradores)
+    PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', '1') == '1'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(basedir, '..', '.profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))  # Se eliminan los más antiguos
+    PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.001))  # Segundos entre muestras
+    
+    # Lista de alumnos con scroll infinito (paginación por cursor)
+    ALUMNOS_POR_PAGINA = int(os.environ.get('ALUMNOS_POR_PAGINA', 100))
+    ALUMNOS_POR_PAGINA_MAX = int(os.environ.get('ALUMNOS_POR_PAGINA_MAX', 500))  # Tope del parámetro limite
+    
+    # Carnets de alumno en PDF
+    CARNETS_WORKERS = int(os.environ.get('CARNETS_WORKERS', 0))  # Procesos para dibujar carnets (0 = uno por CPU)
+    CARNETS_CACHE_DIR = os.environ.get('CARNETS_CACHE_DIR') or os.path.join(basedir, '..', '.carnets')
+    CARNETS_FUENTE = os.environ.get('CARNETS_FUENTE')  # TrueType con tildes; sin ella se buscan DejaVu/Liberation
+    
+    # QR firmados de alumnos (check-in y carnets)
+    QR_SECRET = os.environ.get('QR_SECRET')  # Sin valor se usa SECRET_KEY; cambiarla invalida los carnets impresos
+    QR_CACHE_DIR = os.environ.get('QR_CACHE_DIR') or os.path.join(basedir, '..', '.qr')
+    
+    # Check-in de asistencia desde kioscos
+    KIOSK_TOKEN = os.environ.get('KIOSK_TOKEN')  # Authorization: Bearer <token>; sin token, solo admins con sesión
+    KIOSK_SEDE = os.environ.get('KIOSK_SEDE', 'Central')  # Sede por defecto del kiosco
+    CHECKIN_BATCH_SIZE = int(os.environ.get('CHECKIN_BATCH_SIZE', 50))  # Check-ins por INSERT
+    CHECKIN_FLUSH_SECONDS = float(os.environ.get('CHECKIN_FLUSH_SECONDS', 2))  # Espera máxima antes de escribir
+    CHECKIN_INDEX_TTL = int(os.environ.get('CHECKIN_INDEX_TTL', 300))  # Segundos entre recargas del índice de RUT
+    CHECKIN_OFFLINE_HORAS = int(os.environ.get('CHECKIN_OFFLINE_HORAS', 48))  # Antigüedad máxima de un check-in encolado offline
+    
+    # Auditoría de acciones de administración (escrita por lotes después del commit)
+    AUDITORIA_BATCH_SIZE = int(os.environ.get('AUDITORIA_BATCH_SIZE', 100))  # Registros por INSERT
+    AUDITORIA_FLUSH_SECONDS = float(os.environ.get('AUDITORIA_FLUSH_SECONDS', 2))  # Espera máxima antes de escribir
+    AUDITORIA_POR_PAGINA = int(os.environ.get('AUDITORIA_POR_PAGINA', 50))
+    
+    # Recepción offline (PWA): sincronización incremental de la lista de alumnos
+    SYNC_MARGEN_SEGUNDOS = int(os.environ.get('SYNC_MARGEN_SEGUNDOS', 60))  # Solapamiento al pedir cambios
+    SYNC_ELIMINADOS_DIAS = int(os.environ.get('SYNC_ELIMINADOS_DIAS', 30))  # Cursores más antiguos reciben la lista completa
+    SYNC_INTERVALO_SEGUNDOS = int(os.environ.get('SYNC_INTERVALO_SEGUNDOS', 60))  # Cada cuánto pide cambios el kiosco
+    
+    # Torneos: las divisiones con pocos competidores se juegan todos contra todos
+    TORNEO_TODOS_CONTRA_TODOS_HASTA = int(os.environ.get('TORNEO_TODOS_CONTRA_TODOS_HASTA', 3))
+    
+    # Entrega de archivos estáticos y fotos: 'flask' (sendfile de gunicorn), 'x-accel' (nginx) o 'x-sendfile' (Apache)
+    STATIC_DELIVERY = os.environ.get('STATIC_DELIVERY', 'flask')
+    STATIC_ACCEL_PREFIX = os.environ.get('STATIC_ACCEL_PREFIX', '/_static_interno/')  # location internal de nginx
+    
+    # Logging estructurado: JSON a stdout escrito desde un hilo aparte
+    LOG_NIVEL = os.environ.get('LOG_NIVEL', 'INFO')
+    LOG_NIVELES = os.environ.get('LOG_NIVELES', '')  # Por módulo: 'app.utils.sql_monitor=WARNING,app.routes.auth=DEBUG'
+    LOG_FORMATO = os.environ.get('LOG_FORMATO', 'json')  # 'json' o 'texto' (consola de desarrollo)
+    LOG_MUESTREO_DEBUG = float(os.environ.get('LOG_MUESTREO_DEBUG', 0.01))  # Fracción de eventos DEBUG que se escriben
+    LOG_REQUEST_ID_HEADER = os.environ.get('LOG_REQUEST_ID_HEADER', 'X-Request-ID')  # Lo envía el proxy o se genera
+    
+    # Token para que Prometheus lea /metrics (Authorization: Bearer <token>); sin él solo entra un admin con sesión
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
     # Crear directorio de uploads si no existe
     if not os.path.exists(UPLOAD_FOLDER):
         os.makedirs(UPLOAD_FOLDER)
@@ -54,6 +138,7 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Configuración para producción"""
     DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False  # No revisar cambios en plantillas en cada render
 
 # Configuración por defecto
 config = {
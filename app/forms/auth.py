@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Length, Email, EqualTo
+from app.forms.forms import RUT_PATTERN, rut_valido
 
 class LoginForm(FlaskForm):
     """Formulario de inicio de sesión"""
@@ -10,8 +11,8 @@ class LoginForm(FlaskForm):
 
 class RegistroForm(FlaskForm):
     """Formulario de registro público"""
-    rut = StringField('RUT', validators=[DataRequired(), Length(min=9, max=12)], 
-                      render_kw={'placeholder': '12.345.678-9', 'pattern': '[0-9]{1,2}\\.[0-9]{3}\\.[0-9]{3}-[0-9kK]{1}'})
+    rut = StringField('RUT', validators=[DataRequired(), Length(min=8, max=12), rut_valido], 
+                      render_kw={'placeholder': '12.345.678-9', 'pattern': RUT_PATTERN})
     username = StringField('Usuario', validators=[DataRequired(), Length(min=3, max=80)])
     email = StringField('Email', validators=[DataRequired(), Email()])
     password = PasswordField('Contraseña', validators=[DataRequired(), Length(min=6)])
@@ -1,11 +1,22 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SelectField, SubmitField
-from wtforms.validators import DataRequired, Length
+from wtforms.validators import DataRequired, Length, ValidationError
+from app.utils.rut import RutInvalido, parse_rut
+
+# Acepta el RUT con o sin puntos y guion; el dígito se valida en el servidor
+RUT_PATTERN = r'[0-9]{1,2}\.?[0-9]{3}\.?[0-9]{3}-?[0-9kK]{1}'
+
+def rut_valido(form, field):
+    """Validador WTForms: formato y dígito verificador (módulo 11)"""
+    try:
+        parse_rut(field.data)
+    except RutInvalido:
+        raise ValidationError('RUT inválido: revisa el número y el dígito verificador.')
 
 class UsuarioForm(FlaskForm):
     """Formulario para crear usuarios (solo admin)"""
-    rut = StringField('RUT', validators=[DataRequired(), Length(min=9, max=12)], 
-                      render_kw={'placeholder': '12.345.678-9', 'pattern': r'[0-9]{1,2}\.[0-9]{3}\.[0-9]{3}-[0-9kK]{1}'})
+    rut = StringField('RUT', validators=[DataRequired(), Length(min=8, max=12), rut_valido], 
+                      render_kw={'placeholder': '12.345.678-9', 'pattern': RUT_PATTERN})
     username = StringField('Usuario', validators=[DataRequired(), Length(min=3, max=80)])
     email = StringField('Email', validators=[DataRequired()])
     password = PasswordField('Contraseña', validators=[DataRequired(), Length(min=6)])
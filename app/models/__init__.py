@@ -1,4 +1,9 @@
 from app.models.usuario import Usuario
-from app.models.alumno import Alumno
+from app.models.alumno import Alumno, AlumnoEliminado
+from app.models.asistencia import Asistencia
+from app.models.promocion import Promocion
+from app.models.auditoria import Auditoria
+from app.models.torneo import Torneo, Division, Competidor, Combate
 
-__all__ = ['Usuario', 'Alumno']
+__all__ = ['Usuario', 'Alumno', 'AlumnoEliminado', 'Asistencia', 'Promocion', 'Auditoria',
+           'Torneo', 'Division', 'Competidor', 'Combate']
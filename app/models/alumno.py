@@ -1,18 +1,78 @@
+import logging
 from datetime import datetime, date
+from sqlalchemy import func, select
+from sqlalchemy.orm import validates
 from app import db
+from app.utils.rut import formatear_rut, parse_rut
+
+logger = logging.getLogger(__name__)
+
+CINTURONES = ('Blanco', 'Azul', 'Morado', 'Marron', 'Negro')
+MAX_NIVEL = 4  # Rayitas por cinturón
+PESO_MIN, PESO_MAX = 10, 250  # Kilos aceptados en el formulario
+
+def calcular_edad(fecha_nacimiento, today=None):
+    """Edad en años cumplidos a la fecha indicada (hoy por defecto)"""
+    today = today or date.today()
+    return today.year - fecha_nacimiento.year - ((today.month, today.day) < (fecha_nacimiento.month, fecha_nacimiento.day))
+
+def formatear_tiempo(dias):
+    """Duración aproximada en días, meses o años"""
+    if dias < 60:
+        return f"{dias} día" if dias == 1 else f"{dias} días"
+    if dias < 730:
+        return f"{dias // 30} meses"
+    return f"{dias // 365} años"
+
+def formatear_cinturon(cinturon, nivel):
+    """Cinturón con el nivel de rayitas"""
+    if nivel == 0:
+        return f"{cinturon} - Sin rayitas"
+    elif nivel == 1:
+        return f"{cinturon} - {nivel} rayita"
+    else:
+        return f"{cinturon} - {nivel} rayitas"
 
 class Alumno(db.Model):
     """Modelo de Alumno para gestión de estudiantes de artes marciales"""
     
     id = db.Column(db.Integer, primary_key=True)
     rut = db.Column(db.String(12), unique=True, nullable=False)  # RUT chileno formato XX.XXX.XXX-X
+    rut_num = db.Column(db.Integer, index=True)  # Cuerpo del RUT, para búsquedas
+    rut_dv = db.Column(db.String(1))  # Dígito verificador (0-9 o K)
     nombre = db.Column(db.String(100), nullable=False)
     apellido = db.Column(db.String(100), nullable=False)
     fecha_nacimiento = db.Column(db.Date, nullable=False)
     cinturon = db.Column(db.String(50), nullable=False)
     nivel = db.Column(db.Integer, nullable=False)  # Rayitas del 1 al 4
     foto = db.Column(db.String(200), nullable=True)  # Ruta de la foto
+    peso = db.Column(db.Float, nullable=True)  # Kilos, para las categorías de torneo
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+    rango_desde = db.Column(db.DateTime, nullable=True)  # Último cambio de cinturón o rayitas (copia de Promocion)
+    version = db.Column(db.Integer, nullable=False, server_default='1')  # Se incrementa en cada UPDATE
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Sincronización incremental
+    
+    usuario = db.relationship('Usuario', back_populates='alumno', uselist=False)
+    
+    __mapper_args__ = {'version_id_col': version}
+    
+    @validates('rut')
+    def _validar_rut(self, key, rut):
+        """Valida el RUT (módulo 11), lo normaliza y calcula rut_num/rut_dv"""
+        self.rut_num, self.rut_dv = parse_rut(rut)
+        return formatear_rut(self.rut_num, self.rut_dv)
+    
+    @validates('peso')
+    def _validar_peso(self, key, peso):
+        """Acepta kilos como número o texto ('72,5'); vacío queda sin peso"""
+        if peso is None or (isinstance(peso, str) and not peso.strip()):
+            return None
+        if isinstance(peso, str):
+            peso = peso.strip().replace(',', '.')
+        peso = round(float(peso), 1)
+        if not PESO_MIN <= peso <= PESO_MAX:
+            raise ValueError(f'Peso fuera de rango ({PESO_MIN} a {PESO_MAX} kg)')
+        return peso
     
     def __repr__(self):
         return f'<Alumno {self.nombre} {self.apellido} - {self.cinturon} {self.nivel} rayitas>'
@@ -20,18 +80,42 @@ class Alumno(db.Model):
     @property
     def edad(self):
         """Calcula la edad basada en la fecha de nacimiento"""
-        today = date.today()
-        return today.year - self.fecha_nacimiento.year - ((today.month, today.day) < (self.fecha_nacimiento.month, self.fecha_nacimiento.day))
+        return calcular_edad(self.fecha_nacimiento)
+    
+    @property
+    def dias_en_rango(self):
+        """Días desde el último cambio de cinturón o rayitas (rango_desde está en UTC)"""
+        if self.rango_desde is None:
+            return None
+        return (datetime.utcnow().date() - self.rango_desde.date()).days
+    
+    def cambiar_rango(self, cinturon, nivel, otorgada_por=None):
+        """Asigna cinturón y rayitas registrando la promoción en el historial
+
+        Retorna la Promocion agregada a la sesión, o None si el rango no cambió.
+        """
+        from app.models.promocion import Promocion
+        if cinturon == self.cinturon and nivel == self.nivel:
+            return None
+        promocion = Promocion(
+            alumno=self,
+            cinturon_anterior=self.cinturon,
+            nivel_anterior=self.nivel,
+            cinturon=cinturon,
+            nivel=nivel,
+            fecha=datetime.utcnow(),
+            otorgada_por=otorgada_por,
+        )
+        self.cinturon = cinturon
+        self.nivel = nivel
+        self.rango_desde = promocion.fecha
+        db.session.add(promocion)
+        return promocion
     
     @property
     def cinturon_completo(self):
         """Retorna el cinturón con el nivel de rayitas"""
-        if self.nivel == 0:
-            return f"{self.cinturon} - Sin rayitas"
-        elif self.nivel == 1:
-            return f"{self.cinturon} - {self.nivel} rayita"
-        else:
-            return f"{self.cinturon} - {self.nivel} rayitas"
+        return formatear_cinturon(self.cinturon, self.nivel)
     
     def to_dict(self):
         """Convierte el objeto a diccionario para JSON"""
@@ -45,6 +129,79 @@ class Alumno(db.Model):
             'nivel': self.nivel,
             'cinturon_completo': self.cinturon_completo,
             'foto': self.foto,
+            'peso': self.peso,
             'edad': self.edad,
-            'fecha_registro': self.fecha_registro.strftime('%Y-%m-%d %H:%M:%S')
+            'fecha_registro': self.fecha_registro.strftime('%Y-%m-%d %H:%M:%S'),
+            'rango_desde': self.rango_desde.strftime('%Y-%m-%d %H:%M:%S') if self.rango_desde else None,
+            'dias_en_rango': self.dias_en_rango,
         }
+
+class AlumnoEliminado(db.Model):
+    """Registro de alumnos eliminados para la sincronización incremental de los kioscos"""
+    
+    alumno_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    eliminado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+# Columnas en el orden que espera alumno_rows_to_dicts
+ALUMNO_JSON_SELECT = select(
+    Alumno.id,
+    Alumno.rut,
+    Alumno.nombre,
+    Alumno.apellido,
+    Alumno.fecha_nacimiento,
+    Alumno.cinturon,
+    Alumno.nivel,
+    Alumno.foto,
+    Alumno.peso,
+    Alumno.fecha_registro,
+    Alumno.rango_desde,
+)
+
+def alumno_rows_to_dicts(rows):
+    """Serializa filas de ALUMNO_JSON_SELECT con la misma forma que Alumno.to_dict()
+
+    Trabaja sobre tuplas de Core (sin instanciar objetos ORM) y calcula la
+    fecha de hoy y cada texto de cinturón una sola vez por llamada.
+    """
+    today = date.today()
+    hoy_utc = datetime.utcnow().date()  # Para dias_en_rango: rango_desde está en UTC
+    cinturones = {}
+    resultado = []
+    for id, rut, nombre, apellido, fecha_nacimiento, cinturon, nivel, foto, peso, fecha_registro, rango_desde in rows:
+        completo = cinturones.get((cinturon, nivel))
+        if completo is None:
+            completo = cinturones[(cinturon, nivel)] = formatear_cinturon(cinturon, nivel)
+        resultado.append({
+            'id': id,
+            'rut': rut,
+            'nombre': nombre,
+            'apellido': apellido,
+            'fecha_nacimiento': fecha_nacimiento.isoformat(),
+            'cinturon': cinturon,
+            'nivel': nivel,
+            'cinturon_completo': completo,
+            'foto': foto,
+            'peso': peso,
+            'edad': calcular_edad(fecha_nacimiento, today),
+            'fecha_registro': fecha_registro.isoformat(sep=' ', timespec='seconds'),
+            'rango_desde': rango_desde.isoformat(sep=' ', timespec='seconds') if rango_desde else None,
+            'dias_en_rango': (hoy_utc - rango_desde.date()).days if rango_desde else None,
+        })
+    return resultado
+
+def backfill_rango_desde():
+    """Usa la fecha de registro como inicio del rango actual en filas antiguas
+
+    Incrementa la versión para invalidar fragmentos cacheados (la fila
+    muestra el tiempo en el rango).
+    """
+    tabla = Alumno.__table__
+    resultado = db.session.execute(
+        tabla.update()
+        .where(tabla.c.rango_desde.is_(None))
+        .values(rango_desde=func.coalesce(tabla.c.fecha_registro, func.current_timestamp()),
+                version=tabla.c.version + 1)
+    )
+    db.session.commit()
+    if resultado.rowcount:
+        logger.info('rango_desde completado en %d alumnos', resultado.rowcount)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app import db
+
+class Asistencia(db.Model):
+    """Registro de asistencia de un alumno a una clase"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id', ondelete='CASCADE'), nullable=False)
+    sede = db.Column(db.String(50), nullable=False)  # Lugar donde se registró (kiosco)
+    clase = db.Column(db.String(50), nullable=False)  # Sesión de clase, ej. "19:00 Adultos"
+    fecha = db.Column(db.Date, nullable=False)  # Día de la clase (para evitar duplicados)
+    registrada_en = db.Column(db.DateTime, nullable=False, default=datetime.now)  # Momento del check-in
+
+    alumno = db.relationship('Alumno', backref=db.backref('asistencias', lazy='dynamic', passive_deletes=True))
+
+    __table_args__ = (
+        # Un check-in por alumno, clase y día; también sirve para listar por alumno
+        db.UniqueConstraint('alumno_id', 'sede', 'clase', 'fecha', name='uq_asistencia_alumno_clase'),
+        db.Index('ix_asistencia_fecha_sede', 'fecha', 'sede'),
+    )
+
+    def __repr__(self):
+        return f'<Asistencia alumno={self.alumno_id} {self.sede} {self.clase} {self.fecha}>'
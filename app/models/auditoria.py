@@ -0,0 +1,30 @@
+from sqlalchemy import event
+from app import db
+
+class Auditoria(db.Model):
+    """Registro de acciones de administración; solo se agregan filas"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    momento = db.Column(db.DateTime, nullable=False)  # Hora del commit de la acción (UTC)
+    usuario_id = db.Column(db.Integer, nullable=True)  # Sin FK: el registro sobrevive al usuario
+    usuario = db.Column(db.String(80), nullable=True)  # Nombre de usuario al momento de la acción
+    accion = db.Column(db.String(40), nullable=False)  # 'alumno.editar', 'usuario.eliminar', ...
+    objeto_tipo = db.Column(db.String(20), nullable=False)
+    objeto_id = db.Column(db.Integer, nullable=True)
+    cambios = db.Column(db.JSON, nullable=True)  # {campo: [antes, después]} o los datos creados/eliminados
+    request_id = db.Column(db.String(64), nullable=True)  # Para cruzar con los logs
+
+    __table_args__ = (
+        # El visor pagina por id descendente, con o sin filtro
+        db.Index('ix_auditoria_accion_id', 'accion', 'id'),
+        db.Index('ix_auditoria_usuario_id', 'usuario_id', 'id'),
+        db.Index('ix_auditoria_objeto', 'objeto_tipo', 'objeto_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<Auditoria {self.accion} {self.objeto_tipo}={self.objeto_id} por {self.usuario}>'
+
+@event.listens_for(Auditoria, 'before_update')
+@event.listens_for(Auditoria, 'before_delete')
+def _solo_agregar(mapper, connection, target):
+    raise ValueError('Los registros de auditoría no se modifican ni se eliminan')
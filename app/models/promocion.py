@@ -0,0 +1,52 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from app import db
+
+class Promocion(db.Model):
+    """Historial de cambios de cinturón y rayitas de un alumno"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id', ondelete='CASCADE'), nullable=False)
+    cinturon_anterior = db.Column(db.String(50), nullable=True)  # Nulo en el rango inicial
+    nivel_anterior = db.Column(db.Integer, nullable=True)
+    cinturon = db.Column(db.String(50), nullable=False)
+    nivel = db.Column(db.Integer, nullable=False)
+    fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    otorgada_por_id = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='SET NULL'), nullable=True)  # Instructor
+
+    alumno = db.relationship('Alumno', backref=db.backref('promociones', lazy='dynamic', passive_deletes=True,
+                                                          order_by='Promocion.fecha.desc()'))
+    otorgada_por = db.relationship('Usuario')
+
+    __table_args__ = (
+        db.Index('ix_promocion_alumno_fecha', 'alumno_id', 'fecha'),  # Historial de un alumno
+        db.Index('ix_promocion_fecha', 'fecha'),  # Promociones por período
+        db.Index('ix_promocion_instructor_fecha', 'otorgada_por_id', 'fecha'),  # Reportes por instructor
+    )
+
+    def __repr__(self):
+        return f'<Promocion alumno={self.alumno_id} {self.cinturon_anterior} {self.nivel_anterior} -> {self.cinturon} {self.nivel}>'
+
+    @property
+    def es_cambio_de_cinturon(self):
+        return self.cinturon_anterior is not None and self.cinturon_anterior != self.cinturon
+
+def promociones_por_periodo(desde, hasta):
+    """Promociones entre dos fechas agrupadas por cinturón: [(cinturon, cantidad)]"""
+    return db.session.execute(
+        select(Promocion.cinturon, func.count(Promocion.id))
+        .where(Promocion.fecha >= desde, Promocion.fecha < hasta, Promocion.cinturon_anterior.isnot(None))
+        .group_by(Promocion.cinturon)
+        .order_by(func.count(Promocion.id).desc())
+    ).all()
+
+def reporte_instructores(desde, hasta):
+    """Promociones otorgadas por cada instructor entre dos fechas: [(username, cantidad)]"""
+    from app.models.usuario import Usuario
+    return db.session.execute(
+        select(Usuario.username, func.count(Promocion.id))
+        .join(Usuario, Usuario.id == Promocion.otorgada_por_id)
+        .where(Promocion.fecha >= desde, Promocion.fecha < hasta, Promocion.cinturon_anterior.isnot(None))
+        .group_by(Usuario.username)
+        .order_by(func.count(Promocion.id).desc())
+    ).all()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from app import db
+
+FORMATOS = {
+    'simple': 'Eliminación simple',
+    'doble': 'Doble eliminación',
+    'todos': 'Todos contra todos',
+}
+
+class Torneo(db.Model):
+    """Competencia interna; sus divisiones se generan una vez desde la lista de alumnos"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(120), nullable=False)
+    fecha = db.Column(db.Date, nullable=False)  # La edad de competencia se calcula con el año de esta fecha
+    formato = db.Column(db.String(10), nullable=False)  # Clave de FORMATOS
+    semilla = db.Column(db.Integer, nullable=False)  # Desempate aleatorio reproducible del sembrado
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    creado_por_id = db.Column(db.Integer, db.ForeignKey('usuario.id', ondelete='SET NULL'), nullable=True)
+
+    divisiones = db.relationship('Division', back_populates='torneo', order_by='Division.orden', lazy='dynamic')
+
+    @property
+    def formato_texto(self):
+        return FORMATOS.get(self.formato, self.formato)
+
+    def __repr__(self):
+        return f'<Torneo {self.nombre} {self.fecha}>'
+
+class Division(db.Model):
+    """Cinturón, categoría de edad y categoría de peso dentro de un torneo"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    torneo_id = db.Column(db.Integer, db.ForeignKey('torneo.id', ondelete='CASCADE'), nullable=False)
+    orden = db.Column(db.Integer, nullable=False)
+    cinturon = db.Column(db.String(50), nullable=False)
+    categoria_edad = db.Column(db.String(30), nullable=False)
+    categoria_peso = db.Column(db.String(40), nullable=False)
+    formato = db.Column(db.String(10), nullable=False)  # Puede diferir del torneo en divisiones chicas
+
+    torneo = db.relationship('Torneo', back_populates='divisiones')
+
+    __table_args__ = (
+        db.Index('ix_division_torneo_orden', 'torneo_id', 'orden'),
+    )
+
+    @property
+    def nombre(self):
+        return f'{self.cinturon} · {self.categoria_edad} · {self.categoria_peso}'
+
+    @property
+    def formato_texto(self):
+        return FORMATOS.get(self.formato, self.formato)
+
+    def __repr__(self):
+        return f'<Division {self.nombre}>'
+
+class Competidor(db.Model):
+    """Inscripción de un alumno en una división, con sus datos al momento del torneo"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    division_id = db.Column(db.Integer, db.ForeignKey('division.id', ondelete='CASCADE'), nullable=False)
+    semilla = db.Column(db.Integer, nullable=False)  # 1 = favorito; los combates se refieren a esta posición
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id', ondelete='SET NULL'), nullable=True)
+    nombre = db.Column(db.String(201), nullable=False)  # Copia: la llave impresa no cambia si se edita el alumno
+    cinturon = db.Column(db.String(50), nullable=False)
+    nivel = db.Column(db.Integer, nullable=False)
+    edad = db.Column(db.Integer, nullable=False)  # Edad de competencia (año del torneo - año de nacimiento)
+    peso = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('division_id', 'semilla', name='uq_competidor_division_semilla'),
+    )
+
+    def __repr__(self):
+        return f'<Competidor {self.semilla}. {self.nombre}>'
+
+class Combate(db.Model):
+    """Un combate de la llave de una división
+
+    Los lados de la primera ronda apuntan a una semilla; los demás vienen de
+    otro combate (origen 'G<n>' ganador u 'P<n>' perdedor del combate número
+    n de la misma división) y se completan al registrar resultados.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    division_id = db.Column(db.Integer, db.ForeignKey('division.id', ondelete='CASCADE'), nullable=False)
+    numero = db.Column(db.Integer, nullable=False)  # Orden de la llave; los orígenes siempre son números menores
+    llave = db.Column(db.String(1), nullable=False)  # G ganadores, P perdedores, F final, T todos contra todos
+    ronda = db.Column(db.Integer, nullable=False)
+    origen1 = db.Column(db.String(8), nullable=True)
+    origen2 = db.Column(db.String(8), nullable=True)
+    semilla1 = db.Column(db.Integer, nullable=True)  # Null: pendiente o bye
+    semilla2 = db.Column(db.Integer, nullable=True)
+    bye1 = db.Column(db.Boolean, nullable=False, default=False)
+    bye2 = db.Column(db.Boolean, nullable=False, default=False)
+    ganador = db.Column(db.SmallInteger, nullable=True)  # 1 o 2
+    automatico = db.Column(db.Boolean, nullable=False, default=False)  # Decidido por bye, no se disputa
+
+    __table_args__ = (
+        db.UniqueConstraint('division_id', 'numero', name='uq_combate_division_numero'),
+    )
+
+    def __repr__(self):
+        return f'<Combate {self.llave}{self.ronda} #{self.numero}>'
@@ -1,13 +1,19 @@
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
+from app.utils.metrics import observe_password_hash
+from app.utils.rut import formatear_rut, parse_rut
 
 class Usuario(UserMixin, db.Model):
     """Modelo de Usuario para autenticación y autorización"""
     
     id = db.Column(db.Integer, primary_key=True)
     rut = db.Column(db.String(12), unique=True, nullable=False)  # RUT del alumno asociado
+    rut_num = db.Column(db.Integer, index=True)  # Cuerpo del RUT, para búsquedas
+    rut_dv = db.Column(db.String(1))  # Dígito verificador (0-9 o K)
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id', ondelete='SET NULL'), index=True)  # Nulo para administradores
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
@@ -15,16 +21,26 @@ class Usuario(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
+    alumno = db.relationship('Alumno', back_populates='usuario')
+    
+    @validates('rut')
+    def _validar_rut(self, key, rut):
+        """Valida el RUT (módulo 11), lo normaliza y calcula rut_num/rut_dv"""
+        self.rut_num, self.rut_dv = parse_rut(rut)
+        return formatear_rut(self.rut_num, self.rut_dv)
+    
     def __repr__(self):
         return f'<Usuario {self.username} - {self.role}>'
     
     def set_password(self, password):
         """Genera hash de la contraseña"""
-        self.password_hash = generate_password_hash(password)
+        with observe_password_hash('generar'):
+            self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
         """Verifica la contraseña"""
-        return check_password_hash(self.password_hash, password)
+        with observe_password_hash('verificar'):
+            return check_password_hash(self.password_hash, password)
     
     def is_admin(self):
         """Verifica si el usuario es administrador"""
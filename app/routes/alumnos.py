@@ -1,19 +1,72 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from flask_login import login_required
-from datetime import datetime
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, current_app, jsonify, \
+    abort, send_from_directory
+from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from datetime import datetime, date, timedelta
 from app import db
-from app.models.alumno import Alumno
+from app.models.alumno import Alumno, CINTURONES, formatear_cinturon, formatear_tiempo
+from app.models.asistencia import Asistencia
+from app.models.promocion import Promocion, promociones_por_periodo, reporte_instructores
+from app.models.usuario import Usuario
 from app.utils.decorators import admin_required
-from app.utils.helpers import save_picture, delete_picture
+from app.utils.helpers import save_picture, delete_picture_after_commit
+from app.utils.cache import fragmento_alumno, invalidate_alumno, invalidate_alumnos
+from app.utils.rut import RutInvalido, parse_rut
+from app.utils.carnets import generar_pdf
+from app.utils.sync import registrar_eliminados
+from app.utils.auditoria import CAMPOS_ALUMNO, datos, diferencias, registrar
+from app.utils import qr
+from app.utils.assets import IMMUTABLE_CACHE_CONTROL
+from app.utils import masivo
 
 bp = Blueprint('alumnos', __name__, url_prefix='/alumnos')
+bp.add_app_template_global(formatear_cinturon)
+bp.add_app_template_global(formatear_tiempo)
+
+@bp.app_template_global()
+def url_qr(alumno, formato='svg'):
+    """URL versionada del QR de un alumno"""
+    return url_for('alumnos.qr_alumno', id=alumno.id, version=alumno.version, formato=formato)
+
+def _pagina_alumnos(despues, limite):
+    """Alumnos con id mayor que despues (paginación por cursor) y el cursor siguiente"""
+    query = Alumno.query.order_by(Alumno.id)
+    if despues:
+        query = query.filter(Alumno.id > despues)
+    alumnos = query.limit(limite + 1).all()
+    if len(alumnos) > limite:
+        alumnos = alumnos[:limite]
+        return alumnos, alumnos[-1].id
+    return alumnos, None
 
 @bp.route('/')
 @login_required
 def listar_alumnos():
-    """Lista todos los alumnos"""
-    alumnos = Alumno.query.all()
-    return render_template('alumnos.html', alumnos=alumnos)
+    """Lista de alumnos: primera página renderizada, el resto se carga al hacer scroll"""
+    total = db.session.query(func.count(Alumno.id)).scalar()
+    alumnos, siguiente = _pagina_alumnos(None, current_app.config['ALUMNOS_POR_PAGINA'])
+    return render_template('alumnos.html', alumnos=alumnos, total=total, siguiente=siguiente,
+                           cinturones=CINTURONES)
+
+@bp.route('/pagina')
+@login_required
+def pagina_alumnos():
+    """Página de filas de la lista (?despues=<id>&limite=<n>) como HTML cacheado dentro de JSON"""
+    limite = request.args.get('limite', current_app.config['ALUMNOS_POR_PAGINA'], type=int)
+    limite = max(1, min(limite, current_app.config['ALUMNOS_POR_PAGINA_MAX']))
+    alumnos, siguiente = _pagina_alumnos(request.args.get('despues', type=int), limite)
+    return jsonify({
+        'ids': [alumno.id for alumno in alumnos],
+        'filas': [str(fragmento_alumno('fila', alumno)) for alumno in alumnos],
+        'siguiente': siguiente,
+    })
+
+def _vincular_usuario(alumno, cuerpo):
+    """Asocia al alumno el usuario con su RUT que aún no tiene alumno (creado antes que el alumno)"""
+    usuario = Usuario.query.filter_by(rut_num=cuerpo, alumno_id=None).first()
+    if usuario is not None:
+        alumno.usuario = usuario
 
 @bp.route('/crear', methods=['GET', 'POST'])
 @login_required
@@ -29,8 +82,14 @@ def crear_alumno():
             cinturon = request.form['cinturon']
             nivel = int(request.form['nivel'])
             
-            # Verificar si el RUT ya existe
-            existing_alumno = Alumno.query.filter_by(rut=rut).first()
+            try:
+                cuerpo, _ = parse_rut(rut)
+            except RutInvalido:
+                flash('RUT inválido: revisa el número y el dígito verificador', 'error')
+                return render_template('crear_alumno.html')
+            
+            # Verificar si el RUT ya existe (en cualquier formato)
+            existing_alumno = Alumno.query.filter_by(rut_num=cuerpo).first()
             if existing_alumno:
                 flash('Ya existe un alumno con este RUT', 'error')
                 return render_template('crear_alumno.html')
@@ -51,12 +110,16 @@ def crear_alumno():
                 nombre=nombre,
                 apellido=apellido,
                 fecha_nacimiento=fecha_nacimiento,
-                cinturon=cinturon,
-                nivel=nivel,
+                peso=request.form.get('peso'),
                 foto=foto_filename
             )
+            # El rango inicial queda como primera entrada del historial
+            nuevo_alumno.cambiar_rango(cinturon, nivel, otorgada_por=current_user._get_current_object())
+            _vincular_usuario(nuevo_alumno, cuerpo)
             
             db.session.add(nuevo_alumno)
+            db.session.flush()  # Asigna el id para la auditoría
+            registrar('alumno.crear', 'alumno', nuevo_alumno.id, datos(nuevo_alumno, CAMPOS_ALUMNO))
             db.session.commit()
             
             flash('Alumno creado exitosamente', 'success')
@@ -73,8 +136,12 @@ def crear_alumno():
 @login_required
 def ver_alumno(id):
     """Ver detalles de un alumno"""
-    alumno = Alumno.query.get_or_404(id)
-    return render_template('ver_alumno.html', alumno=alumno)
+    alumno = Alumno.query.options(joinedload(Alumno.usuario)).get_or_404(id)
+    promociones = (
+        alumno.promociones.options(joinedload(Promocion.otorgada_por))
+        .limit(20).all()
+    )
+    return render_template('ver_alumno.html', alumno=alumno, promociones=promociones)
 
 @bp.route('/editar/<int:id>', methods=['GET', 'POST'])
 @login_required
@@ -84,35 +151,50 @@ def editar_alumno(id):
     alumno = Alumno.query.get_or_404(id)
     
     if request.method == 'POST':
+        version_anterior = alumno.version
+        antes = datos(alumno, CAMPOS_ALUMNO)
         try:
             nuevo_rut = request.form['rut']
+            try:
+                cuerpo, _ = parse_rut(nuevo_rut)
+            except RutInvalido:
+                flash('RUT inválido: revisa el número y el dígito verificador', 'error')
+                return render_template('editar_alumno.html', alumno=alumno)
             
             # Verificar si el RUT ya existe en otro alumno
-            if nuevo_rut != alumno.rut:  # Solo verificar si el RUT cambió
-                existing_alumno = Alumno.query.filter_by(rut=nuevo_rut).first()
+            if cuerpo != alumno.rut_num:  # Solo verificar si el RUT cambió
+                existing_alumno = Alumno.query.filter_by(rut_num=cuerpo).first()
                 if existing_alumno:
                     flash('Ya existe otro alumno con este RUT', 'error')
                     return render_template('editar_alumno.html', alumno=alumno)
             
             # Actualizar datos
+            if cuerpo != alumno.rut_num:
+                _vincular_usuario(alumno, cuerpo)
             alumno.rut = nuevo_rut
             alumno.nombre = request.form['nombre']
             alumno.apellido = request.form['apellido']
             alumno.fecha_nacimiento = datetime.strptime(request.form['fecha_nacimiento'], '%Y-%m-%d').date()
-            alumno.cinturon = request.form['cinturon']
-            alumno.nivel = int(request.form['nivel'])
+            alumno.peso = request.form.get('peso')
+            # Registra la promoción solo si cambió el cinturón o las rayitas
+            alumno.cambiar_rango(request.form['cinturon'], int(request.form['nivel']),
+                                 otorgada_por=current_user._get_current_object())
             
             # Manejar foto si se subió una nueva
             if 'foto' in request.files:
                 foto = request.files['foto']
                 if foto and foto.filename != '':
-                    # Eliminar foto anterior si existe
+                    # La foto anterior se elimina solo si el commit se concreta
                     if alumno.foto:
-                        delete_picture(alumno.foto)
+                        delete_picture_after_commit(alumno.foto)
                     # Guardar nueva foto
                     alumno.foto = save_picture(foto)
             
+            cambios = diferencias(antes, datos(alumno, CAMPOS_ALUMNO))
+            if cambios:
+                registrar('alumno.editar', 'alumno', alumno.id, cambios)
             db.session.commit()
+            invalidate_alumno(alumno.id, version_anterior)  # También el índice de RUT, en todos los workers
             flash('Alumno actualizado exitosamente', 'success')
             return redirect(url_for('alumnos.ver_alumno', id=alumno.id))
             
@@ -122,6 +204,24 @@ def editar_alumno(id):
     
     return render_template('editar_alumno.html', alumno=alumno)
 
+@bp.route('/<int:id>/qr/<int:version>.<any(png, svg):formato>')
+@login_required
+def qr_alumno(id, version, formato):
+    """QR firmado de un alumno (admin o el propio alumno); la URL cambia con la versión"""
+    if not current_user.is_admin() and current_user.alumno_id != id:
+        abort(403)
+    fila = db.session.execute(select(Alumno.version, Alumno.rut_num).where(Alumno.id == id)).first()
+    if fila is None:
+        abort(404)
+    if fila.version != version:
+        return redirect(url_for('alumnos.qr_alumno', id=id, version=fila.version, formato=formato))
+    
+    nombre = qr.archivo_qr(id, fila.version, fila.rut_num, formato)
+    response = send_from_directory(current_app.config['QR_CACHE_DIR'], nombre, mimetype=qr.FORMATOS[formato])
+    # private: la respuesta requiere sesión y no debe quedar en cachés compartidas
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL.replace('public', 'private')
+    return response
+
 @bp.route('/eliminar/<int:id>', methods=['POST'])
 @login_required
 @admin_required
@@ -130,14 +230,94 @@ def eliminar_alumno(id):
     try:
         alumno = Alumno.query.get_or_404(id)
         
-        # Eliminar foto si existe
+        # Eliminar foto si existe (después del commit)
         if alumno.foto:
-            delete_picture(alumno.foto)
+            delete_picture_after_commit(alumno.foto)
         
+        version = alumno.version
+        registrar('alumno.eliminar', 'alumno', id, datos(alumno, CAMPOS_ALUMNO))
+        # Historial y asistencia en una sentencia cada uno (SQLite no aplica ON DELETE CASCADE)
+        Asistencia.query.filter_by(alumno_id=id).delete(synchronize_session=False)
+        Promocion.query.filter_by(alumno_id=id).delete(synchronize_session=False)
         db.session.delete(alumno)
+        registrar_eliminados([id])
         db.session.commit()
+        invalidate_alumno(id, version)
         flash('Alumno eliminado exitosamente', 'success')
     except Exception as e:
+        db.session.rollback()
         flash(f'Error al eliminar alumno: {str(e)}', 'error')
     
     return redirect(url_for('alumnos.listar_alumnos'))
+
+@bp.route('/promociones')
+@login_required
+@admin_required
+def reporte_promociones():
+    """Promociones por cinturón e instructor en un período (solo admin)"""
+    hoy = date.today()
+    try:
+        desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date() if request.args.get('desde') else hoy.replace(day=1)
+        hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date() if request.args.get('hasta') else hoy
+    except ValueError:
+        flash('Fechas inválidas, se muestra el mes en curso', 'error')
+        desde, hasta = hoy.replace(day=1), hoy
+    
+    # hasta es inclusivo: se compara contra la medianoche del día siguiente
+    inicio = datetime.combine(desde, datetime.min.time())
+    fin = datetime.combine(hasta + timedelta(days=1), datetime.min.time())
+    return render_template('promociones.html', desde=desde, hasta=hasta,
+                           por_cinturon=promociones_por_periodo(inicio, fin),
+                           por_instructor=reporte_instructores(inicio, fin))
+
+@bp.route('/masivo', methods=['POST'])
+@login_required
+@admin_required
+def accion_masiva():
+    """Promover, eliminar, exportar o imprimir carnets de varios alumnos en una sola transacción"""
+    ids = [int(id) for id in request.form.getlist('ids') if id.isdigit()]
+    accion = request.form.get('accion')
+    if not ids:
+        flash('Selecciona al menos un alumno', 'error')
+        return redirect(url_for('alumnos.listar_alumnos'))
+    
+    if accion == 'exportar':
+        return Response(masivo.exportar_csv(ids), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=alumnos.csv'})
+    
+    if accion == 'carnets':
+        alumnos = Alumno.query.filter(Alumno.id.in_(ids)).order_by(Alumno.apellido, Alumno.nombre).all()
+        # Se envía por hojas; X-Accel-Buffering evita que nginx junte el PDF completo
+        return Response(generar_pdf(current_app._get_current_object(), alumnos), mimetype='application/pdf',
+                        headers={'Content-Disposition': 'attachment; filename=carnets.pdf',
+                                 'X-Accel-Buffering': 'no'})
+    
+    try:
+        if accion == 'rayita':
+            afectados = masivo.agregar_rayita(ids, otorgada_por_id=current_user.id)
+            mensaje = f'{len(afectados)} alumnos recibieron una rayita'
+        elif accion == 'cinturon' and request.form.get('cinturon') in CINTURONES:
+            afectados = masivo.asignar_cinturon(ids, request.form['cinturon'], otorgada_por_id=current_user.id)
+            mensaje = f'{len(afectados)} alumnos promovidos a cinturón {request.form["cinturon"]}'
+        elif accion == 'eliminar':
+            afectados = masivo.eliminar_alumnos(ids)
+            for fila in afectados:
+                delete_picture_after_commit(fila.foto)
+            mensaje = f'{len(afectados)} alumnos eliminados'
+        else:
+            flash('Acción masiva inválida', 'error')
+            return redirect(url_for('alumnos.listar_alumnos'))
+        cambios = {'masivo': True, 'cinturon': request.form['cinturon']} if accion == 'cinturon' else {'masivo': True}
+        for fila in afectados:
+            registrar(f'alumno.{accion}', 'alumno', fila.id, cambios)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error en la acción masiva: {str(e)}', 'error')
+        return redirect(url_for('alumnos.listar_alumnos'))
+    
+    # Después del commit: fragmentos cacheados e índice de RUT
+    invalidate_alumnos((fila.id, fila.version) for fila in afectados)
+    
+    flash(mensaje, 'success')
+    return redirect(url_for('alumnos.listar_alumnos'))
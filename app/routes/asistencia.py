@@ -0,0 +1,97 @@
+import hmac
+from datetime import date, datetime, timedelta
+from flask import Blueprint, render_template, request, jsonify, current_app
+from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from app.models.asistencia import Asistencia
+from app.utils.checkin import registrar_checkin, resolver_codigo
+from app.utils.decorators import admin_required
+
+bp = Blueprint('asistencia', __name__, url_prefix='/asistencia')
+
+def _kiosco_autorizado():
+    """Kiosco con KIOSK_TOKEN (Authorization: Bearer) o administrador con sesión"""
+    token = current_app.config.get('KIOSK_TOKEN')
+    recibido = request.headers.get('Authorization', '')
+    if token and recibido.startswith('Bearer ') and hmac.compare_digest(recibido[7:].encode(), token.encode()):
+        return True
+    return current_user.is_authenticated and current_user.is_admin()
+
+def _momento(valor):
+    """Hora local de un check-in encolado offline; None si no viene
+
+    Lanza ValueError si no es una fecha ISO o está fuera de la ventana aceptada.
+    """
+    if not valor:
+        return None
+    momento = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    if momento.tzinfo is not None:
+        momento = momento.astimezone().replace(tzinfo=None)
+    ahora = datetime.now()
+    if not ahora - timedelta(hours=current_app.config['CHECKIN_OFFLINE_HORAS']) <= momento <= ahora + timedelta(minutes=5):
+        raise ValueError('momento fuera de rango')
+    return momento
+
+@bp.route('/')
+@login_required
+@admin_required
+def listar_asistencia():
+    """Asistencia del día (solo admin)"""
+    asistencias = (
+        Asistencia.query.options(joinedload(Asistencia.alumno))
+        .filter_by(fecha=date.today())
+        .order_by(Asistencia.registrada_en.desc())
+        .all()
+    )
+    return render_template('asistencia.html', asistencias=asistencias)
+
+@bp.route('/kiosco')
+@login_required
+@admin_required
+def kiosco():
+    """Pantalla de check-in para la entrada de la academia"""
+    return render_template('kiosco.html', sede=request.args.get('sede', current_app.config['KIOSK_SEDE']))
+
+@bp.route('/checkin', methods=['POST'])
+def checkin():
+    """Check-in de un alumno por RUT o código QR (JSON o formulario)
+
+    Responde apenas el check-in queda encolado; la escritura se hace por lotes.
+    momento (ISO, opcional) es la hora real de un check-in que el kiosco encoló sin conexión.
+    """
+    if not _kiosco_autorizado():
+        return jsonify({'ok': False, 'error': 'No autorizado'}), 401
+
+    datos = request.get_json(silent=True) or request.form
+    codigo = datos.get('rut') or datos.get('qr')
+    sede = datos.get('sede') or current_app.config['KIOSK_SEDE']
+    clase = datos.get('clase')
+    if not codigo or not clase:
+        return jsonify({'ok': False, 'error': 'Faltan el RUT/QR o la clase'}), 400
+    try:
+        momento = _momento(datos.get('momento'))
+    except ValueError:
+        return jsonify({'ok': False, 'error': 'Hora del check-in inválida'}), 400
+
+    alumno, nuevo = registrar_checkin(codigo, sede[:50], clase[:50], momento)
+    if alumno is None:
+        return jsonify({'ok': False, 'error': 'RUT o QR no corresponde a ningún alumno'}), 404
+    return jsonify({'ok': True, 'alumno': alumno[1], 'nuevo': nuevo})
+
+@bp.route('/verificar', methods=['POST'])
+def verificar():
+    """Valida un QR o RUT sin registrar asistencia (lectores de puerta)
+
+    Los QR firmados se resuelven sin consultar la base: firma HMAC e índice de RUT en memoria.
+    """
+    if not _kiosco_autorizado():
+        return jsonify({'ok': False, 'error': 'No autorizado'}), 401
+
+    datos = request.get_json(silent=True) or request.form
+    codigo = datos.get('qr') or datos.get('rut')
+    if not codigo:
+        return jsonify({'ok': False, 'error': 'Falta el RUT/QR'}), 400
+    alumno = resolver_codigo(codigo)
+    if alumno is None:
+        return jsonify({'ok': False, 'error': 'RUT o QR no corresponde a ningún alumno'}), 404
+    return jsonify({'ok': True, 'alumno_id': alumno[0], 'alumno': alumno[1]})
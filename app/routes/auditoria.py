@@ -0,0 +1,37 @@
+from flask import Blueprint, render_template, request, current_app
+from flask_login import login_required
+from sqlalchemy import select
+from app import db
+from app.models.auditoria import Auditoria
+from app.utils.decorators import admin_required
+
+bp = Blueprint('auditoria', __name__, url_prefix='/auditoria')
+
+# Filtros aceptados en la query string (cada uno tiene su índice con id)
+FILTROS = ('accion', 'usuario_id', 'objeto_tipo', 'objeto_id')
+
+@bp.route('/')
+@login_required
+@admin_required
+def listar_auditoria():
+    """Registro de auditoría, del más reciente al más antiguo (solo admin)
+
+    Pagina por id (?antes=<id>) en vez de OFFSET: cada página cuesta lo mismo
+    aunque la tabla crezca.
+    """
+    por_pagina = current_app.config['AUDITORIA_POR_PAGINA']
+    filtros = {campo: request.args[campo] for campo in FILTROS if request.args.get(campo)}
+    consulta = select(Auditoria).order_by(Auditoria.id.desc()).limit(por_pagina + 1)
+    for campo, valor in filtros.items():
+        if campo.endswith('_id'):
+            if not valor.isdigit():
+                continue
+            valor = int(valor)
+        consulta = consulta.where(getattr(Auditoria, campo) == valor)
+    antes = request.args.get('antes', type=int)
+    if antes:
+        consulta = consulta.where(Auditoria.id < antes)
+
+    registros = db.session.execute(consulta).scalars().all()
+    siguiente = registros[por_pagina - 1].id if len(registros) > por_pagina else None
+    return render_template('auditoria.html', registros=registros[:por_pagina], filtros=filtros, siguiente=siguiente)
@@ -1,11 +1,14 @@
+import logging
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, current_user
 from app import db
 from app.models.usuario import Usuario
 from app.models.alumno import Alumno
 from app.forms.auth import LoginForm, RegistroForm
+from app.utils.rut import rut_num
 
 bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -41,17 +44,19 @@ def registro():
     
     form = RegistroForm()
     if form.validate_on_submit():
-        print(f'[DEBUG] Intentando registrar: {form.username.data} - {form.email.data}')
+        logger.debug('Intentando registrar: %s', form.username.data, extra={'email': form.email.data})
+        
+        # El formulario ya validó el RUT; se busca por su cuerpo numérico
+        cuerpo = rut_num(form.rut.data)
         
         # Verificar si el RUT existe en la tabla de alumnos
-        alumno_existente = Alumno.query.filter_by(rut=form.rut.data).first()
+        alumno_existente = Alumno.query.filter_by(rut_num=cuerpo).first()
         if not alumno_existente:
             flash('El RUT ingresado no corresponde a ningún alumno registrado. Contacta al administrador.', 'error')
             return render_template('registro.html', form=form)
         
-        # Verificar si ya existe un usuario con este RUT
-        usuario_existente = Usuario.query.filter_by(rut=form.rut.data).first()
-        if usuario_existente:
+        # Verificar si ya existe un usuario con este RUT (aunque no esté asociado al alumno)
+        if Usuario.query.filter_by(rut_num=cuerpo).first():
             flash('Ya existe un usuario registrado con este RUT.', 'error')
             return render_template('registro.html', form=form)
         
@@ -72,7 +77,8 @@ def registro():
             rut=form.rut.data,
             username=form.username.data,
             email=form.email.data,
-            role='visualizador'  # Los usuarios públicos son visualizadores por defecto
+            role='visualizador',  # Los usuarios públicos son visualizadores por defecto
+            alumno=alumno_existente
         )
         nuevo_usuario.set_password(form.password.data)
         
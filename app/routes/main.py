@@ -1,25 +1,83 @@
-from flask import Blueprint, render_template, jsonify
+from datetime import datetime
+from flask import Blueprint, render_template, jsonify, abort, current_app, send_from_directory, request
 from flask_login import login_required
-from app.models.alumno import Alumno
+from app import db
+from app.models.alumno import Alumno, ALUMNO_JSON_SELECT, alumno_rows_to_dicts
+from app.utils.decorators import admin_required
+from app.utils import sync
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/')
 def home():
     """Página principal"""
-    return render_template('home.html')
+    return render_template('index.html')
+
+@bp.route('/about')
+def about():
+    """Página acerca de"""
+    return render_template('about.html')
 
 @bp.route('/api/alumnos', methods=['GET'])
 @login_required
 def api_alumnos():
     """API endpoint para obtener todos los alumnos"""
-    alumnos = Alumno.query.all()
-    return jsonify([alumno.to_dict() for alumno in alumnos])
+    rows = db.session.execute(ALUMNO_JSON_SELECT)
+    return jsonify(alumno_rows_to_dicts(rows))
+
+@bp.route('/api/alumno/<int:id>', methods=['GET'])
+@login_required
+def api_alumno(id):
+    """API endpoint para obtener un alumno específico"""
+    rows = alumno_rows_to_dicts(db.session.execute(ALUMNO_JSON_SELECT.where(Alumno.id == id)))
+    if not rows:
+        abort(404)
+    return jsonify(rows[0])
+
+@bp.route('/api/alumnos/snapshot', methods=['GET'])
+@login_required
+def api_alumnos_snapshot():
+    """Lista completa para la recepción offline, con el cursor para /api/alumnos/cambios"""
+    return jsonify(sync.snapshot())
+
+@bp.route('/api/alumnos/cambios', methods=['GET'])
+@login_required
+def api_alumnos_cambios():
+    """Alumnos modificados y eliminados desde el cursor ?desde="""
+    try:
+        desde = datetime.fromisoformat(request.args.get('desde', ''))
+    except ValueError:
+        return jsonify(sync.snapshot())
+    return jsonify(sync.cambios(desde))
+
+@bp.route('/metrics')
+def metrics():
+    """Métricas en formato Prometheus (agregadas entre workers)"""
+    from app.utils.metrics import metrics_response
+    return metrics_response()
+
+@bp.route('/perfiles')
+@login_required
+@admin_required
+def perfiles():
+    """Informes de perfilado recientes (solo admin)"""
+    from app.utils.profiling import list_profiles
+    perfiles = list_profiles(current_app.config['PROFILE_DIR'])
+    return render_template('perfiles.html', perfiles=perfiles)
+
+@bp.route('/perfiles/<nombre>')
+@login_required
+@admin_required
+def ver_perfil(nombre):
+    """Informe de perfilado (flame graph de pyinstrument o texto de cProfile)"""
+    from app.utils.profiling import is_profile_name
+    if not is_profile_name(nombre):
+        abort(404)
+    return send_from_directory(current_app.config['PROFILE_DIR'], nombre, max_age=0)
 
 @bp.route('/init-db')
 def init_db():
     """Inicializar base de datos y crear usuario admin"""
-    from app import db
     from app.models.usuario import Usuario
     
     try:
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+from flask import Blueprint, Response, render_template, current_app, url_for
+from flask_login import login_required
+from app.utils.assets import vendor_url
+
+bp = Blueprint('pwa', __name__)
+
+# Plantillas cuyo cambio debe instalar un service worker nuevo
+PLANTILLAS_SHELL = ('recepcion.html', 'base.html', 'sw.js')
+
+def _recursos_shell():
+    """URLs que el service worker guarda al instalarse"""
+    return [
+        url_for('pwa.recepcion'),
+        url_for('pwa.manifest'),
+        vendor_url('vendor/bootstrap-5.3.0/css/bootstrap.min.css'),
+        vendor_url('vendor/bootstrap-5.3.0/js/bootstrap.bundle.min.js'),
+        vendor_url('vendor/fontawesome-6.4.0/css/all.min.css'),
+        url_for('static', filename='css/style.css'),
+        url_for('static', filename='css/custom.css'),
+        url_for('static', filename='img/icono.svg'),
+    ]
+
+def _version(recursos):
+    """Hash de las URLs del shell y del contenido de los archivos que no cambian de URL
+
+    Los estáticos con hash ya cambian de URL al modificarse; style.css sin
+    construir y las plantillas del shell no, por eso entra su contenido.
+    """
+    huella = hashlib.sha256(json.dumps(recursos).encode())
+    archivos = [os.path.join(current_app.static_folder, ruta) for ruta in ('css/style.css', 'css/custom.css')]
+    archivos += [os.path.join(current_app.root_path, current_app.template_folder, nombre) for nombre in PLANTILLAS_SHELL]
+    for archivo in archivos:
+        try:
+            with open(archivo, 'rb') as f:
+                huella.update(f.read())
+        except OSError:
+            pass
+    return huella.hexdigest()[:12]
+
+@bp.route('/recepcion')
+@login_required
+def recepcion():
+    """Recepción offline: lista y fichas de alumnos desde la copia local, check-in con cola"""
+    return render_template('recepcion.html', sync_intervalo=current_app.config['SYNC_INTERVALO_SEGUNDOS'])
+
+@bp.route('/manifest.webmanifest')
+def manifest():
+    """Manifest de la PWA de recepción"""
+    datos = {
+        'name': 'Lempar Recepción',
+        'short_name': 'Lempar',
+        'lang': 'es',
+        'start_url': url_for('pwa.recepcion'),
+        'scope': '/',
+        'display': 'standalone',
+        'background_color': '#ffffff',
+        'theme_color': '#0d6efd',
+        'icons': [{
+            'src': url_for('static', filename='img/icono.svg'),
+            'sizes': 'any',
+            'type': 'image/svg+xml',
+            'purpose': 'any maskable',
+        }],
+    }
+    return Response(json.dumps(datos, ensure_ascii=False), mimetype='application/manifest+json')
+
+@bp.route('/sw.js')
+def service_worker():
+    """Service worker en la raíz para que su alcance cubra todo el sitio"""
+    recursos = _recursos_shell()
+    js = render_template('sw.js', version=_version(recursos), recursos=recursos,
+                         shell=url_for('pwa.recepcion'))
+    response = Response(js, mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'  # El navegador revisa si hay versión nueva
+    return response
@@ -0,0 +1,195 @@
+from collections import defaultdict
+from datetime import date, datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from app import db
+from app.models.alumno import Alumno, CINTURONES
+from app.models.torneo import Torneo, Division, Competidor, Combate, FORMATOS
+from app.utils.auditoria import registrar
+from app.utils.decorators import admin_required
+from app.utils.torneos import armar_torneo, campeon, posiciones_todos, registrar_resultado, COLUMNAS_COMBATE
+
+bp = Blueprint('torneos', __name__, url_prefix='/torneos')
+
+SECCIONES = (('G', 'Llave de ganadores'), ('P', 'Llave de perdedores'), ('F', 'Final'), ('T', 'Combates'))
+NOMBRES_RONDA = {0: 'Final', 1: 'Semifinal', 2: 'Cuartos de final', 3: 'Octavos de final'}
+
+def _lado(combate, lado, competidores):
+    """Texto de un lado del combate: competidor, bye o de qué combate viene"""
+    semilla = combate[f'semilla{lado}']
+    if semilla is not None:
+        return {'competidor': competidores[semilla], 'ganador': combate['ganador'] == lado}
+    if combate[f'bye{lado}']:
+        return {'texto': 'BYE'}
+    origen = combate[f'origen{lado}']
+    return {'texto': f"{'Ganador' if origen[0] == 'G' else 'Perdedor'} #{origen[1:]}", 'pendiente': True}
+
+def _vista_division(division, competidores, combates):
+    """Rondas por sección de la llave, listas para la plantilla"""
+    por_semilla = {competidor.semilla: competidor for competidor in competidores}
+    secciones = []
+    for llave, titulo in SECCIONES:
+        rondas = defaultdict(list)
+        for combate in combates:
+            if combate['llave'] == llave:
+                combate['lados'] = [_lado(combate, 1, por_semilla), _lado(combate, 2, por_semilla)]
+                rondas[combate['ronda']].append(combate)
+        if not rondas:
+            continue
+        if llave == 'G' and division.formato == 'simple':
+            titulo = 'Llave'
+            total = len(rondas)
+            nombres = [NOMBRES_RONDA.get(total - ronda, f'Ronda {ronda}') for ronda in sorted(rondas)]
+        elif llave == 'F':
+            nombres = ['Gran final']
+        else:
+            nombres = [f'Ronda {ronda}' for ronda in sorted(rondas)]
+        secciones.append({'llave': llave, 'titulo': titulo,
+                          'rondas': list(zip(nombres, (rondas[ronda] for ronda in sorted(rondas))))})
+
+    ganador = campeon(division.formato, combates, len(competidores))
+    posiciones = None
+    if division.formato == 'todos' and combates:
+        posiciones = [dict(fila, competidor=por_semilla[fila['semilla']])
+                      for fila in posiciones_todos(combates, len(competidores))]
+    return {
+        'division': division,
+        'competidores': competidores,
+        'secciones': secciones,
+        'posiciones': posiciones,
+        'campeon': por_semilla.get(ganador),
+        'pendientes': sum(1 for combate in combates if combate['ganador'] is None),
+    }
+
+def _vistas(divisiones):
+    """Vistas de varias divisiones con una consulta para competidores y otra para combates"""
+    ids = [division.id for division in divisiones]
+    competidores = defaultdict(list)
+    for competidor in Competidor.query.filter(Competidor.division_id.in_(ids)).order_by(Competidor.semilla):
+        competidores[competidor.division_id].append(competidor)
+    combates = defaultdict(list)
+    filas = db.session.execute(
+        select(Combate.division_id, *[getattr(Combate, columna) for columna in COLUMNAS_COMBATE])
+        .where(Combate.division_id.in_(ids))
+        .order_by(Combate.division_id, Combate.numero)
+    )
+    for fila in filas:
+        combate = dict(fila._mapping)
+        combates[combate.pop('division_id')].append(combate)
+    return [_vista_division(division, competidores[division.id], combates[division.id]) for division in divisiones]
+
+@bp.route('/')
+@login_required
+def listar_torneos():
+    """Torneos, del más reciente al más antiguo"""
+    torneos = Torneo.query.order_by(Torneo.fecha.desc(), Torneo.id.desc()).all()
+    inscritos = dict(db.session.execute(
+        select(Division.torneo_id, func.count(Competidor.id))
+        .join(Competidor, Competidor.division_id == Division.id)
+        .group_by(Division.torneo_id)
+    ).all())
+    return render_template('torneos.html', torneos=torneos, inscritos=inscritos)
+
+@bp.route('/crear', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def crear_torneo():
+    """Arma las divisiones y llaves de un torneo desde la lista de alumnos"""
+    sin_peso = db.session.execute(select(func.count()).where(Alumno.peso.is_(None))).scalar()
+    contexto = {'formatos': FORMATOS, 'cinturones': CINTURONES, 'hoy': date.today(), 'sin_peso': sin_peso}
+    if request.method == 'POST':
+        nombre = request.form.get('nombre', '').strip()
+        formato = request.form.get('formato')
+        cinturones = [cinturon for cinturon in request.form.getlist('cinturones') if cinturon in CINTURONES]
+        try:
+            fecha = datetime.strptime(request.form['fecha'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            flash('Fecha inválida', 'error')
+            return render_template('crear_torneo.html', **contexto)
+        if not nombre or formato not in FORMATOS:
+            flash('Completa el nombre y el formato del torneo', 'error')
+            return render_template('crear_torneo.html', **contexto)
+
+        try:
+            torneo, excluidos = armar_torneo(nombre, fecha, formato, cinturones=cinturones, creado_por=current_user.id)
+            registrar('torneo.crear', 'torneo', torneo.id, {
+                'nombre': nombre, 'fecha': fecha.isoformat(), 'formato': formato,
+                'cinturones': cinturones or list(CINTURONES), 'sin_peso': len(excluidos),
+            })
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error al crear torneo: {str(e)}', 'error')
+            return render_template('crear_torneo.html', **contexto)
+
+        if excluidos:
+            flash(f'{len(excluidos)} alumnos quedaron fuera por no tener peso registrado', 'info')
+        flash('Torneo creado exitosamente', 'success')
+        return redirect(url_for('torneos.ver_torneo', id=torneo.id))
+
+    return render_template('crear_torneo.html', **contexto)
+
+@bp.route('/<int:id>')
+@login_required
+def ver_torneo(id):
+    """Divisiones del torneo con su avance"""
+    torneo = Torneo.query.get_or_404(id)
+    divisiones = torneo.divisiones.all()
+    return render_template('torneo.html', torneo=torneo, vistas=_vistas(divisiones))
+
+@bp.route('/<int:id>/imprimir')
+@login_required
+def imprimir_torneo(id):
+    """Todas las llaves del torneo, una división por página"""
+    torneo = Torneo.query.get_or_404(id)
+    return render_template('torneo_imprimir.html', torneo=torneo, vistas=_vistas(torneo.divisiones.all()))
+
+@bp.route('/<int:id>/divisiones/<int:division_id>')
+@login_required
+def ver_division(id, division_id):
+    """Llave de una división; el admin registra resultados desde aquí"""
+    division = Division.query.filter_by(id=division_id, torneo_id=id).first_or_404()
+    return render_template('division.html', torneo=division.torneo, vista=_vistas([division])[0])
+
+@bp.route('/<int:id>/divisiones/<int:division_id>/combates/<int:numero>', methods=['POST'])
+@login_required
+@admin_required
+def resultado_combate(id, division_id, numero):
+    """Registra (o anula con ganador=0) el resultado de un combate"""
+    division = Division.query.filter_by(id=division_id, torneo_id=id).first_or_404()
+    ganador = request.form.get('ganador', type=int) or None
+    try:
+        modificados = registrar_resultado(division, numero, ganador)
+        registrar('torneo.resultado', 'torneo', id, {
+            'division': division.nombre, 'combate': numero, 'ganador': ganador, 'afectados': sorted(modificados),
+        })
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), 'error')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error al registrar resultado: {str(e)}', 'error')
+    return redirect(url_for('torneos.ver_division', id=id, division_id=division_id, _anchor=f'combate-{numero}'))
+
+@bp.route('/<int:id>/eliminar', methods=['POST'])
+@login_required
+@admin_required
+def eliminar_torneo(id):
+    """Eliminar un torneo con sus divisiones, inscripciones y combates"""
+    try:
+        torneo = Torneo.query.get_or_404(id)
+        registrar('torneo.eliminar', 'torneo', id, {'nombre': torneo.nombre, 'fecha': torneo.fecha.isoformat()})
+        # Una sentencia por tabla (SQLite no aplica ON DELETE CASCADE)
+        divisiones = select(Division.id).where(Division.torneo_id == id)
+        Combate.query.filter(Combate.division_id.in_(divisiones)).delete(synchronize_session=False)
+        Competidor.query.filter(Competidor.division_id.in_(divisiones)).delete(synchronize_session=False)
+        Division.query.filter_by(torneo_id=id).delete(synchronize_session=False)
+        db.session.delete(torneo)
+        db.session.commit()
+        flash('Torneo eliminado exitosamente', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error al eliminar torneo: {str(e)}', 'error')
+    return redirect(url_for('torneos.listar_torneos'))
@@ -1,9 +1,13 @@
 from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models.usuario import Usuario
+from app.models.alumno import Alumno
 from app.forms.forms import UsuarioForm
 from app.utils.decorators import admin_required
+from app.utils.rut import rut_num
+from app.utils.auditoria import CAMPOS_USUARIO, datos, registrar
 
 bp = Blueprint('usuarios', __name__, url_prefix='/usuarios')
 
@@ -12,7 +16,8 @@ bp = Blueprint('usuarios', __name__, url_prefix='/usuarios')
 @admin_required
 def listar_usuarios():
     """Lista todos los usuarios (solo admin)"""
-    usuarios = Usuario.query.all()
+    # El alumno de cada usuario en el mismo SELECT (sin una consulta por fila)
+    usuarios = Usuario.query.options(joinedload(Usuario.alumno)).order_by(Usuario.id).all()
     return render_template('usuarios.html', usuarios=usuarios)
 
 @bp.route('/crear', methods=['GET', 'POST'])
@@ -35,7 +40,8 @@ def crear_usuario():
             return render_template('crear_usuario.html', form=form)
         
         # Verificar si el RUT ya existe
-        existing_rut = Usuario.query.filter_by(rut=form.rut.data).first()
+        cuerpo = rut_num(form.rut.data)
+        existing_rut = Usuario.query.filter_by(rut_num=cuerpo).first()
         if existing_rut:
             flash('El RUT ya está registrado.', 'error')
             return render_template('crear_usuario.html', form=form)
@@ -45,12 +51,15 @@ def crear_usuario():
             rut=form.rut.data,
             username=form.username.data,
             email=form.email.data,
-            role=form.role.data
+            role=form.role.data,
+            alumno=Alumno.query.filter_by(rut_num=cuerpo).first()  # Puede no ser alumno (ej. administradores)
         )
         usuario.set_password(form.password.data)
         
         try:
             db.session.add(usuario)
+            db.session.flush()  # Asigna el id para la auditoría
+            registrar('usuario.crear', 'usuario', usuario.id, datos(usuario, CAMPOS_USUARIO))
             db.session.commit()
             flash(f'Usuario {usuario.username} creado exitosamente.', 'success')
             return redirect(url_for('usuarios.listar_usuarios'))
@@ -73,10 +82,12 @@ def eliminar_usuario(id):
             flash('No puedes eliminar tu propia cuenta.', 'error')
             return redirect(url_for('usuarios.listar_usuarios'))
         
+        registrar('usuario.eliminar', 'usuario', usuario.id, datos(usuario, CAMPOS_USUARIO))
         db.session.delete(usuario)
         db.session.commit()
         flash(f'Usuario {usuario.username} eliminado exitosamente.', 'success')
     except Exception as e:
+        db.session.rollback()
         flash(f'Error al eliminar usuario: {str(e)}', 'error')
     
     return redirect(url_for('usuarios.listar_usuarios'))
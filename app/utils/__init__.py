@@ -1,4 +1,7 @@
 from app.utils.decorators import admin_required
-from app.utils.helpers import allowed_file, save_picture, delete_picture
+from app.utils.helpers import allowed_file, save_picture, delete_picture, delete_picture_after_commit
+from app.utils.cache import init_cache, invalidate_alumno, invalidate_alumnos
 
-__all__ = ['admin_required', 'allowed_file', 'save_picture', 'delete_picture']
+__all__ = ['admin_required', 'allowed_file', 'save_picture', 'delete_picture',
+           'delete_picture_after_commit', 'init_cache', 'invalidate_alumno',
+           'invalidate_alumnos']
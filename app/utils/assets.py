@@ -0,0 +1,228 @@
+"""
+Pipeline de archivos estáticos.
+
+Construcción (una vez por deploy):
+    python -m app.utils.assets
+
+- Descarga a static/vendor/ las dependencias que antes se cargaban desde CDNs
+- Minifica el CSS propio y genera copias con hash de contenido en static/dist/
+- Precomprime cada archivo en gzip y brotli (si está instalado)
+- Escribe static/dist/manifest.json con el mapeo nombre original -> nombre con hash
+
+En ejecución, url_for('static', ...) emite el nombre con hash y los archivos
+de static/dist/ se sirven con la variante precomprimida y caché inmutable.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import sys
+import urllib.request
+from urllib.parse import urljoin
+
+from flask import current_app, request, url_for
+
+from app.utils.delivery import proxy_entrega, send_static
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Dependencias vendorizadas: ruta dentro de static/ -> URL del CDN original
+VENDOR_ASSETS = {
+    'vendor/bootstrap-5.3.0/css/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap-5.3.0/js/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/fontawesome-6.4.0/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+}
+
+# Archivos propios que pasan por el pipeline
+SOURCE_ASSETS = ['css/style.css', 'css/custom.css']
+
+# Extensiones que vale la pena comprimir (woff2, png, jpg ya vienen comprimidos)
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.ttf', '.eot', '.map'}
+
+# Variantes precomprimidas en orden de preferencia
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+
+def minify_css(css):
+    """Minificador de CSS conservador: comentarios y espacios sobrantes"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+def _download(url, destino):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with urllib.request.urlopen(url, timeout=30) as response, open(destino, 'wb') as f:
+        shutil.copyfileobj(response, f)
+
+def fetch_vendor_assets(static_folder):
+    """Descarga las dependencias de CDN (y las fuentes que referencian)"""
+    for relpath, url in VENDOR_ASSETS.items():
+        destino = os.path.join(static_folder, relpath)
+        if not os.path.exists(destino):
+            print(f'[INFO] Descargando {url}')
+            _download(url, destino)
+
+        if relpath.endswith('.css'):
+            with open(destino, encoding='utf-8') as f:
+                css = f.read()
+            for ref in set(CSS_URL_RE.findall(css)):
+                if ref.startswith(('data:', 'http:', 'https:', '#')):
+                    continue
+                ref = ref.split('?')[0].split('#')[0]
+                recurso = os.path.normpath(os.path.join(os.path.dirname(destino), ref))
+                if not os.path.exists(recurso):
+                    _download(urljoin(url, ref), recurso)
+
+def _hashed_name(relpath, content):
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    base, ext = os.path.splitext(relpath)
+    return f'{base}.{digest}{ext}'
+
+def _precompress(path):
+    """Escribe las variantes .gz y .br de un archivo; retorna las encodings generadas"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    encodings = []
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append('gzip')
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        encodings.append('br')
+    return encodings
+
+def build_assets(static_folder, fetch=True):
+    """Genera static/dist/ y su manifest; retorna el manifest"""
+    if fetch:
+        fetch_vendor_assets(static_folder)
+
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.exists(dist):
+        shutil.rmtree(dist)
+
+    manifest = {'files': {}, 'encodings': {}}
+
+    # Archivos referenciados desde el CSS vendorizado (fuentes) se copian tal cual,
+    # conservando la ruta relativa; el directorio ya está versionado
+    vendor_dir = os.path.join(static_folder, 'vendor')
+    if os.path.isdir(vendor_dir):
+        for root, _, files in os.walk(vendor_dir):
+            for name in files:
+                origen = os.path.join(root, name)
+                relpath = os.path.relpath(origen, static_folder).replace(os.sep, '/')
+                if relpath in VENDOR_ASSETS:
+                    continue
+                destino = os.path.join(dist, relpath)
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                shutil.copyfile(origen, destino)
+                if os.path.splitext(name)[1] in COMPRESSIBLE:
+                    manifest['encodings'][f'{DIST_DIR}/{relpath}'] = _precompress(destino)
+
+    for relpath in SOURCE_ASSETS + list(VENDOR_ASSETS):
+        origen = os.path.join(static_folder, relpath)
+        if not os.path.exists(origen):
+            print(f'[WARNING] Archivo estático no encontrado: {relpath}')
+            continue
+
+        with open(origen, 'rb') as f:
+            content = f.read()
+        if relpath.endswith('.css') and '.min.' not in relpath:
+            content = minify_css(content.decode('utf-8')).encode('utf-8')
+
+        hashed = f'{DIST_DIR}/{_hashed_name(relpath, content)}'
+        destino = os.path.join(static_folder, hashed)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, 'wb') as f:
+            f.write(content)
+
+        manifest['files'][relpath] = hashed
+        manifest['encodings'][hashed] = _precompress(destino)
+        print(f'[INFO] {relpath} -> {hashed}')
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def load_manifest(static_folder):
+    """Lee el manifest generado por build_assets (vacío si no existe)"""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'files': {}, 'encodings': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def vendor_url(relpath):
+    """URL de una dependencia vendorizada, o la del CDN si no se ha construido"""
+    if relpath in current_app.extensions['assets']['files']:
+        return url_for('static', filename=relpath)
+    return VENDOR_ASSETS[relpath]
+
+def init_assets(app):
+    """Registra el manifest, la reescritura de url_for y el handler de estáticos"""
+    manifest = load_manifest(app.static_folder)
+    app.extensions['assets'] = manifest
+    files = manifest['files']
+    encodings = manifest['encodings']
+
+    if files:
+        logger.info('Manifest de estáticos cargado: %d archivos con hash', len(files))
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in files:
+            values['filename'] = files[values['filename']]
+
+    def static(filename):
+        """Sirve static/dist/ con variante precomprimida y caché inmutable"""
+        if not filename.startswith(DIST_DIR + '/'):
+            return send_static(filename)
+
+        if proxy_entrega():
+            # nginx elige la variante .gz/.br con gzip_static/brotli_static
+            response = send_static(filename)
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            return response
+
+        path = filename
+        content_encoding = None
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            if encoding in encodings.get(filename, ()) and accepted[encoding]:
+                path = filename + suffix
+                content_encoding = encoding
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_static(path, mimetype=mimetype)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        if filename in encodings:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    app.view_functions['static'] = static
+    app.add_template_global(vendor_url)
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.dirname(__file__), '..', '..', 'static')
+    build_assets(os.path.abspath(static_folder), fetch='--no-fetch' not in sys.argv)
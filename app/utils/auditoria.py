@@ -0,0 +1,137 @@
+"""
+Auditoría de acciones de administración.
+
+Las rutas llaman a registrar() dentro de su transacción: solo se arma un dict
+y se anota en session.info. Al hacer commit los registros pasan a un búfer en
+memoria que un hilo por proceso escribe con un INSERT por lote (cada
+AUDITORIA_BATCH_SIZE registros o AUDITORIA_FLUSH_SECONDS segundos); si la
+transacción hace rollback se descartan, así solo queda lo que efectivamente
+se hizo.
+"""
+
+import atexit
+import logging
+import threading
+from datetime import date, datetime
+from flask import current_app, g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, insert
+
+logger = logging.getLogger(__name__)
+
+# Clave en session.info: registros de la transacción en curso
+AUDITORIA_PENDIENTE = 'auditoria_pendiente'
+
+CAMPOS_ALUMNO = ('rut', 'nombre', 'apellido', 'fecha_nacimiento', 'cinturon', 'nivel', 'peso', 'foto')
+CAMPOS_USUARIO = ('rut', 'username', 'email', 'role', 'alumno_id')  # Nunca el hash de la contraseña
+
+def _valor(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+def datos(objeto, campos):
+    """{campo: valor} de un objeto, serializable a JSON"""
+    return {campo: _valor(getattr(objeto, campo)) for campo in campos}
+
+def diferencias(antes, despues):
+    """{campo: [antes, después]} de los campos que cambiaron entre dos llamadas a datos()"""
+    return {campo: [antes[campo], despues[campo]] for campo in antes if antes[campo] != despues[campo]}
+
+def registrar(accion, objeto_tipo, objeto_id=None, cambios=None):
+    """Anota una acción en la transacción en curso; se escribe después del commit"""
+    from app import db
+    fila = {
+        'accion': accion,
+        'objeto_tipo': objeto_tipo,
+        'objeto_id': objeto_id,
+        'cambios': cambios or None,
+        'usuario_id': None,
+        'usuario': None,
+        'request_id': None,
+    }
+    if has_request_context():
+        if current_user.is_authenticated:
+            fila['usuario_id'] = current_user.id
+            fila['usuario'] = current_user.username
+        fila['request_id'] = g.get('request_id')
+    db.session.info.setdefault(AUDITORIA_PENDIENTE, []).append(fila)
+
+class AuditoriaBuffer:
+    """Búfer de registros de auditoría que se escribe por lotes desde un hilo propio"""
+
+    def __init__(self, app, db, batch_size=100, flush_interval=2.0):
+        self.app = app
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pendientes = []
+        self._cond = threading.Condition()
+        self._hilo = None
+
+    def extend(self, filas):
+        momento = datetime.utcnow()
+        with self._cond:
+            for fila in filas:
+                fila['momento'] = momento
+                self._pendientes.append(fila)
+            self._iniciar_hilo()
+            if len(self._pendientes) >= self.batch_size:
+                self._cond.notify()
+
+    def _iniciar_hilo(self):
+        # Igual que el búfer de check-in: el hilo se crea al primer uso, después del fork de gunicorn
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._run, name='auditoria-flush', daemon=True)
+            self._hilo.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pendientes) >= self.batch_size, timeout=self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Escribe los registros pendientes en un solo INSERT por lote"""
+        from app.models.auditoria import Auditoria
+        with self._cond:
+            lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return 0
+
+        with self.app.app_context():
+            try:
+                self.db.session.execute(insert(Auditoria), lote)
+                self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                logger.warning('Lote de auditoría falló (%s); reintentando de a uno', e, extra={'filas': len(lote)})
+                for fila in lote:
+                    try:
+                        self.db.session.execute(insert(Auditoria), fila)
+                        self.db.session.commit()
+                    except Exception:
+                        self.db.session.rollback()
+                        logger.exception('Registro de auditoría descartado', extra={'registro': fila})
+        return len(lote)
+
+def _after_commit(session):
+    filas = session.info.pop(AUDITORIA_PENDIENTE, None)
+    if filas:
+        current_app.extensions['auditoria'].extend(filas)
+
+def _after_rollback(session):
+    session.info.pop(AUDITORIA_PENDIENTE, None)
+
+def init_auditoria(app, db):
+    """Crea el búfer de auditoría y lo ata al commit de la sesión"""
+    buffer = AuditoriaBuffer(
+        app, db,
+        batch_size=app.config['AUDITORIA_BATCH_SIZE'],
+        flush_interval=app.config['AUDITORIA_FLUSH_SECONDS'],
+    )
+    app.extensions['auditoria'] = buffer
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_rollback', _after_rollback)
+    # No perder los registros encolados al detener el worker
+    atexit.register(buffer.flush)
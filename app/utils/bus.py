@@ -0,0 +1,259 @@
+"""
+Bus de invalidación de cachés entre workers.
+
+Cada worker de gunicorn tiene sus propias cachés en memoria (fragmentos LRU,
+índice de RUT). publicar(canal, claves) ejecuta de inmediato los suscriptores
+del proceso actual y avisa a los demás workers, donde un hilo suscriptor
+ejecuta los mismos suscriptores con esas claves.
+
+Transportes (BUS_BACKEND):
+- 'postgres': NOTIFY/LISTEN sobre la base de datos de la app
+- 'archivo': segmentos de solo agregado en BUS_DIR (SQLite, un solo host);
+  cada worker revisa cada BUS_INTERVALO segundos si crecieron
+- 'local': solo el proceso actual (un worker, scripts)
+- 'auto': postgres si la base es PostgreSQL, si no archivo
+
+Los mensajes son avisos de invalidación: si uno se pierde la caché afectada
+igual se corrige sola (versión en la clave, TTL del índice de RUT).
+"""
+
+import json
+import logging
+import os
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+CANAL_PG = 'lempar_invalidacion'
+CLAVES_POR_MENSAJE = 200  # NOTIFY acepta hasta 8000 bytes por mensaje
+MAX_ARCHIVO = 1024 * 1024  # Bytes por segmento del bus de archivo
+SEGMENTOS_GUARDADOS = 8  # Margen para workers atrasados
+_SEGMENTO_RE = re.compile(r'^invalidacion\.(\d+)\.log$')
+
+class TransporteLocal:
+    """Sin otros procesos: publicar no envía nada"""
+
+    def abrir(self):
+        pass
+
+    def enviar(self, mensaje):
+        pass
+
+    def recibir(self, timeout):
+        time.sleep(timeout)
+        return []
+
+class TransporteArchivo:
+    """Segmentos de solo agregado compartidos por los workers de un mismo host
+
+    Cada mensaje es una línea JSON escrita con un solo write() en el segmento
+    actual (invalidacion.<n>.log). Cada suscriptor guarda su segmento y su
+    posición; (segmento, posición) es el contador de generación. Al pasar
+    MAX_ARCHIVO el publicador abre el segmento siguiente y borra los más
+    antiguos que SEGMENTOS_GUARDADOS; un suscriptor atrasado termina de leer
+    el suyo por el descriptor abierto y sigue con el siguiente.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self._segmento = None
+        self._archivo = None
+        self._pendiente = b''
+
+    def _ruta(self, segmento):
+        return os.path.join(self.directorio, f'invalidacion.{segmento:08d}.log')
+
+    def _segmentos(self):
+        return sorted(int(m.group(1)) for m in map(_SEGMENTO_RE.match, os.listdir(self.directorio)) if m)
+
+    def _abrir_segmento(self, segmento):
+        if self._archivo is not None:
+            self._archivo.close()
+        self._segmento = segmento
+        self._archivo = open(self._ruta(segmento), 'ab+')
+        self._archivo.seek(0)
+        self._pendiente = b''
+
+    def abrir(self):
+        # Se empieza al final: lo anterior a este worker no afecta sus cachés vacías
+        segmentos = self._segmentos()
+        self._abrir_segmento(segmentos[-1] if segmentos else 0)
+        self._archivo.seek(0, os.SEEK_END)
+
+    def enviar(self, mensaje):
+        import fcntl  # Solo POSIX; en Windows usar BUS_BACKEND=local
+        linea = (json.dumps(mensaje, separators=(',', ':')) + '\n').encode('utf-8')
+        with open(os.path.join(self.directorio, 'invalidacion.lock'), 'ab') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # Un publicador a la vez decide el segmento actual
+            segmentos = self._segmentos() or [0]
+            with open(self._ruta(segmentos[-1]), 'ab') as f:
+                f.write(linea)
+                lleno = f.tell() > MAX_ARCHIVO
+            if lleno:
+                open(self._ruta(segmentos[-1] + 1), 'ab').close()
+                for viejo in segmentos[:-SEGMENTOS_GUARDADOS]:
+                    os.remove(self._ruta(viejo))
+
+    def _leer(self):
+        datos = self._pendiente + self._archivo.read()
+        completas, _, self._pendiente = datos.rpartition(b'\n')
+        return [json.loads(linea) for linea in completas.split(b'\n') if linea]
+
+    def recibir(self, timeout):
+        time.sleep(timeout)
+        # Se listan antes de leer: un segmento con sucesor ya no recibe líneas y se lee completo
+        siguientes = [n for n in self._segmentos() if n > self._segmento]
+        mensajes = self._leer()
+        for segmento in siguientes:
+            if segmento != self._segmento + 1:
+                logger.warning('Bus de invalidación: segmentos %d a %d ya eliminados, avisos perdidos',
+                               self._segmento + 1, segmento - 1)
+            try:
+                self._abrir_segmento(segmento)
+            except FileNotFoundError:
+                continue
+            mensajes += self._leer()
+        return mensajes
+
+class TransportePostgres:
+    """NOTIFY/LISTEN con una conexión psycopg2 dedicada por worker"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._conexion = None
+
+    def abrir(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        url = self.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        self._conexion = psycopg2.connect(url)
+        self._conexion.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._conexion.cursor() as cursor:
+            cursor.execute(f'LISTEN {CANAL_PG}')
+
+    def enviar(self, mensaje):
+        from sqlalchemy import text
+        with self.engine.begin() as conexion:
+            conexion.execute(text('SELECT pg_notify(:canal, :mensaje)'),
+                             {'canal': CANAL_PG, 'mensaje': json.dumps(mensaje, separators=(',', ':'))})
+
+    def recibir(self, timeout):
+        if select.select([self._conexion], [], [], timeout)[0]:
+            self._conexion.poll()
+        mensajes = [json.loads(aviso.payload) for aviso in self._conexion.notifies]
+        self._conexion.notifies.clear()
+        return mensajes
+
+class Bus:
+    """Suscriptores por canal y el hilo que recibe los avisos de otros workers"""
+
+    def __init__(self, app, transporte, intervalo=0.5):
+        self.app = app
+        self.transporte = transporte
+        self.intervalo = intervalo
+        self._suscriptores = defaultdict(list)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._origen = None
+        self._hilo = None
+
+    def suscribir(self, canal, funcion):
+        """funcion(claves) se ejecuta con app context en cada proceso que reciba el aviso"""
+        self._suscriptores[canal].append(funcion)
+
+    def _despachar(self, canal, claves):
+        for funcion in self._suscriptores.get(canal, ()):
+            try:
+                funcion(claves)
+            except Exception:
+                logger.exception('Suscriptor del bus falló', extra={'canal': canal})
+
+    def iniciar(self):
+        """Abre el transporte y lanza el hilo suscriptor en este proceso (una vez por pid)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Después del fork de gunicorn: ni el hilo ni la conexión del padre sirven aquí
+            self._origen = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+            try:
+                self.transporte.abrir()  # Antes del primer request: ningún aviso queda sin escuchar
+            except Exception:
+                logger.exception('No se pudo abrir el bus de invalidación; solo se invalida este proceso')
+                self.transporte = TransporteLocal()
+            self._hilo = threading.Thread(target=self._run, name='bus-invalidacion', daemon=True)
+            self._hilo.start()
+            self._pid = os.getpid()
+
+    def publicar(self, canal, claves):
+        """Invalida en este proceso y avisa a los demás workers"""
+        claves = list(claves)
+        if not claves:
+            return
+        self._despachar(canal, claves)
+        self.iniciar()
+        for inicio in range(0, len(claves), CLAVES_POR_MENSAJE):
+            mensaje = {'origen': self._origen, 'canal': canal, 'claves': claves[inicio:inicio + CLAVES_POR_MENSAJE]}
+            try:
+                self.transporte.enviar(mensaje)
+            except Exception:
+                logger.exception('No se pudo publicar en el bus de invalidación', extra={'canal': canal})
+
+    def _run(self):
+        while True:
+            try:
+                mensajes = self.transporte.recibir(self.intervalo)
+            except Exception:
+                logger.exception('Error leyendo el bus de invalidación; reconectando')
+                time.sleep(self.intervalo * 10)
+                try:
+                    self.transporte.abrir()
+                except Exception:
+                    pass
+                continue
+            with self.app.app_context():
+                for mensaje in mensajes:
+                    if mensaje.get('origen') != self._origen:  # Lo propio ya se aplicó al publicar
+                        self._despachar(mensaje['canal'], mensaje['claves'])
+
+def _transporte(app, db):
+    backend = app.config['BUS_BACKEND']
+    if backend == 'auto':
+        backend = 'postgres' if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql') else 'archivo'
+    if backend == 'postgres':
+        try:
+            import psycopg2  # noqa: F401
+        except ImportError:
+            logger.warning('psycopg2 no disponible, usando el bus de archivo')
+            backend = 'archivo'
+        else:
+            with app.app_context():
+                return TransportePostgres(db.engine)
+    if backend == 'archivo':
+        return TransporteArchivo(app.config['BUS_DIR'])
+    if backend != 'local':
+        logger.warning('BUS_BACKEND desconocido: %s, usando local', backend)
+    return TransporteLocal()
+
+def init_bus(app, db):
+    """Crea el bus de la app; el transporte se abre en cada worker con su primer request"""
+    bus = Bus(app, _transporte(app, db), intervalo=app.config['BUS_INTERVALO'])
+    app.extensions['bus'] = bus
+    app.before_request(bus.iniciar)
+    return bus
+
+def get_bus():
+    return current_app.extensions['bus']
+
+def publicar(canal, claves):
+    """Invalida claves de un canal en todos los workers"""
+    get_bus().publicar(canal, claves)
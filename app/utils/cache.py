@@ -0,0 +1,145 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from flask import current_app, render_template
+from flask_login import current_user
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+# Tipos de fragmento cacheados por alumno
+FRAGMENTOS_ALUMNO = ('fila', 'detalle')
+ROLES = ('admin', 'visualizador', 'anonimo')
+
+class LRUCache:
+    """Caché en memoria del proceso con expulsión LRU"""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RedisCache:
+    """Caché compartida en un servidor compatible con Redis"""
+
+    def __init__(self, url, ttl=3600, prefix='lempar:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value.encode('utf-8'), ex=self.ttl)
+
+    def delete_many(self, keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+class NullCache:
+    """Caché deshabilitada: siempre renderiza"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+    def clear(self):
+        pass
+
+def init_cache(app):
+    """Crea el backend de caché configurado y lo registra en la app"""
+    backend = app.config.get('CACHE_BACKEND', 'lru')
+    if backend == 'redis':
+        try:
+            cache = RedisCache(app.config['CACHE_REDIS_URL'], ttl=app.config.get('CACHE_TTL', 3600))
+        except ImportError:
+            logger.warning('redis no disponible, usando caché LRU en memoria')
+            cache = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 5000))
+    elif backend == 'null':
+        cache = NullCache()
+    else:
+        cache = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 5000))
+
+    app.extensions['fragment_cache'] = cache
+    app.add_template_global(fragmento_alumno)
+    app.extensions['bus'].suscribir('alumno', _expulsar_alumnos)
+    return cache
+
+def get_cache():
+    """Retorna el backend de caché de la app actual"""
+    return current_app.extensions['fragment_cache']
+
+def _rol_actual():
+    if current_user.is_authenticated:
+        return current_user.role
+    return 'anonimo'
+
+def fragment_key(tipo, alumno_id, version, rol, dia=None):
+    """Clave de un fragmento: (alumno, versión de la fila, rol, día)"""
+    # El día forma parte de la clave porque la edad cambia con la fecha
+    dia = dia or date.today().isoformat()
+    return f'alumno:{alumno_id}:v{version}:{rol}:{tipo}:{dia}'
+
+def fragmento_alumno(tipo, alumno):
+    """Renderiza (o recupera de la caché) el parcial de un alumno"""
+    cache = get_cache()
+    key = fragment_key(tipo, alumno.id, alumno.version, _rol_actual())
+    html = cache.get(key)
+    if html is None:
+        html = render_template(f'_alumno_{tipo}.html', alumno=alumno)
+        cache.set(key, html)
+    return Markup(html)
+
+def _expulsar_alumnos(pares):
+    keys = [fragment_key(tipo, alumno_id, version, rol)
+            for alumno_id, version in pares for tipo in FRAGMENTOS_ALUMNO for rol in ROLES]
+    get_cache().delete_many(keys)
+
+def invalidate_alumnos(pares):
+    """Invalida en todos los workers los fragmentos de pares (alumno_id, versión)
+
+    Los suscriptores del canal 'alumno' (este y el índice de RUT) se ejecutan
+    en este proceso antes de retornar y en los demás workers vía el bus.
+    """
+    from app.utils.bus import publicar
+    publicar('alumno', [[alumno_id, version] for alumno_id, version in pares])
+
+def invalidate_alumno(alumno_id, version):
+    """Elimina los fragmentos cacheados de una versión de un alumno"""
+    invalidate_alumnos([(alumno_id, version)])
@@ -0,0 +1,280 @@
+"""
+Carnets de alumno en PDF, generados por lotes.
+
+- Cada carnet (foto, nombre, RUT, cinturón y QR de check-in) se dibuja como un
+  JPEG a 300 DPI en un ProcessPoolExecutor: decodificar y redimensionar la foto
+  y rasterizar el texto es trabajo de CPU que no conviene hacer en el worker web
+- Los carnets se guardan en CARNETS_CACHE_DIR con la versión del alumno en el
+  nombre; un alumno sin cambios no se vuelve a dibujar
+- El PDF se escribe a mano (los JPEG se incrustan tal cual con DCTDecode) y se
+  envía página por página a medida que se completan sus carnets
+"""
+
+import glob
+import io
+import multiprocessing
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import segno
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from app.utils.qr import firmar
+
+# Cambiar al modificar el diseño para invalidar los carnets guardados
+DISEÑO_VERSION = 2
+
+# Carnet CR80 (85,6 x 54 mm) a 300 DPI
+ANCHO, ALTO = 1011, 638
+ANCHO_PT, ALTO_PT = 242.65, 153.07
+
+# Hoja A4 con 2 x 5 carnets centrados
+HOJA_PT = (595.28, 841.89)
+COLUMNAS, FILAS = 2, 5
+POR_HOJA = COLUMNAS * FILAS
+
+# Fuentes TrueType con tildes y eñes, en orden de preferencia (después de CARNETS_FUENTE)
+FUENTES = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Debian/Ubuntu
+    '/usr/share/fonts/dejavu-sans-fonts/DejaVuSans.ttf',  # Fedora
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',  # Arch
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',  # macOS
+]
+
+COLOR_PRIMARIO = (13, 110, 253)
+COLORES_CINTURON = {
+    'Blanco': (255, 255, 255),
+    'Azul': (0, 0, 255),
+    'Morado': (128, 0, 128),
+    'Marron': (139, 69, 19),
+    'Negro': (0, 0, 0),
+}
+
+def datos_carnet(alumno, upload_folder):
+    """Datos primitivos de un carnet (se envían al proceso que lo dibuja)"""
+    return {
+        'id': alumno.id,
+        'version': alumno.version,
+        'nombre': f'{alumno.nombre} {alumno.apellido}',
+        'rut': alumno.rut,
+        'cinturon': alumno.cinturon,
+        'nivel': alumno.nivel,
+        'cinturon_completo': alumno.cinturon_completo,
+        'foto': os.path.join(upload_folder, alumno.foto) if alumno.foto else None,
+        'qr': firmar(alumno.id, alumno.rut_num),  # Token firmado que acepta el kiosco
+    }
+
+def _ruta_cache(cache_dir, datos):
+    return os.path.join(cache_dir, f'{datos["id"]}-v{datos["version"]}-d{DISEÑO_VERSION}.jpg')
+
+def buscar_fuente(preferida=None):
+    """Ruta de la primera fuente TrueType disponible, o None"""
+    for ruta in [preferida, *FUENTES]:
+        if ruta and os.path.exists(ruta):
+            return ruta
+    return None
+
+@lru_cache(maxsize=32)
+def _fuente(tamaño, ruta):
+    if ruta:
+        return ImageFont.truetype(ruta, tamaño)
+    return ImageFont.load_default(size=tamaño)
+
+def _texto(texto, ruta):
+    """La fuente por defecto de Pillow no tiene tildes: sin TrueType se escriben sin ellas"""
+    if ruta:
+        return texto
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+def _texto_ajustado(draw, posicion, texto, tamaño, ancho_max, color, ruta):
+    """Dibuja texto reduciendo la fuente hasta que quepa en ancho_max"""
+    texto = _texto(texto, ruta)
+    fuente = _fuente(tamaño, ruta)
+    while tamaño > 18 and fuente.getlength(texto) > ancho_max:
+        tamaño -= 2
+        fuente = _fuente(tamaño, ruta)
+    draw.text(posicion, texto, font=fuente, fill=color)
+
+def _foto(ruta, tamaño):
+    """Foto recortada al tamaño del recuadro; None si no hay o no se puede leer"""
+    if not ruta:
+        return None
+    try:
+        with Image.open(ruta) as imagen:
+            imagen.draft('RGB', tamaño)  # Los JPEG grandes se decodifican ya reducidos
+            return ImageOps.fit(ImageOps.exif_transpose(imagen).convert('RGB'), tamaño, Image.LANCZOS)
+    except (OSError, ValueError):
+        return None
+
+def _qr(texto, lado):
+    buffer = io.BytesIO()
+    segno.make(texto, error='m').save(buffer, kind='png', scale=1, border=2)
+    buffer.seek(0)
+    return Image.open(buffer).convert('RGB').resize((lado, lado), Image.NEAREST)
+
+def dibujar_carnet(datos, fuente=None):
+    """JPEG del carnet de un alumno (fuente: ruta de una TrueType, ver buscar_fuente)"""
+    carnet = Image.new('RGB', (ANCHO, ALTO), 'white')
+    draw = ImageDraw.Draw(carnet)
+
+    draw.rectangle((0, 0, ANCHO, 110), fill=COLOR_PRIMARIO)
+    draw.text((40, 28), 'LEMPAR', font=_fuente(52, fuente), fill='white')
+    draw.text((ANCHO - 40, 40), 'Carnet de Alumno', font=_fuente(34, fuente), fill='white', anchor='ra')
+
+    recuadro = (240, 300)
+    foto = _foto(datos['foto'], recuadro)
+    if foto is not None:
+        carnet.paste(foto, (40, 140))
+    else:
+        draw.rectangle((40, 140, 40 + recuadro[0], 140 + recuadro[1]), fill=(222, 226, 230))
+        draw.text((160, 290), 'Sin foto', font=_fuente(30, fuente), fill=(108, 117, 125), anchor='mm')
+
+    _texto_ajustado(draw, (310, 145), datos['nombre'], 46, ANCHO - 350, 'black', fuente)
+    draw.text((310, 215), f'RUT {datos["rut"]}', font=_fuente(38, fuente), fill=(33, 37, 41))
+    _texto_ajustado(draw, (310, 275), datos['cinturon_completo'], 34, 400, (33, 37, 41), fuente)
+    carnet.paste(_qr(datos['qr'], 250), (ANCHO - 290, 330))
+
+    # Cinturón en el borde inferior, con las rayitas en la punta negra (roja si es negro)
+    color = COLORES_CINTURON.get(datos['cinturon'], (108, 117, 125))
+    draw.rectangle((0, 595, ANCHO, ALTO), fill=color)
+    punta = (200, 0, 0) if datos['cinturon'] == 'Negro' else (0, 0, 0)
+    draw.rectangle((ANCHO - 260, 595, ANCHO - 60, ALTO), fill=punta)
+    for i in range(datos['nivel']):
+        x = ANCHO - 230 + i * 45
+        draw.rectangle((x, 595, x + 20, ALTO), fill='white')
+    draw.rectangle((0, 0, ANCHO - 1, ALTO - 1), outline=(173, 181, 189), width=2)  # Guía de corte
+
+    salida = io.BytesIO()
+    carnet.save(salida, 'JPEG', quality=90, dpi=(300, 300))
+    return salida.getvalue()
+
+def _generar(datos, cache_dir, fuente):
+    """Tarea del pool: dibuja un carnet y lo guarda en la caché"""
+    jpeg = dibujar_carnet(datos, fuente)
+    destino = _ruta_cache(cache_dir, datos)
+    for anterior in glob.glob(os.path.join(cache_dir, f'{datos["id"]}-v*.jpg')):
+        if anterior != destino:
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(jpeg)
+    os.replace(temporal, destino)
+    return jpeg
+
+def _leer_cache(cache_dir, datos):
+    try:
+        with open(_ruta_cache(cache_dir, datos), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+class _PDF:
+    """Escritor de PDF incremental: cada página se emite apenas está lista"""
+
+    def __init__(self):
+        self.offsets = {}
+        self.posicion = 0
+        self.paginas = []
+        self.siguiente_objeto = 3  # 1: catálogo y 2: árbol de páginas, escritos al final
+
+    def _emitir(self, datos):
+        self.posicion += len(datos)
+        return datos
+
+    def _objeto(self, numero, cuerpo, stream=None):
+        self.offsets[numero] = self.posicion
+        partes = [f'{numero} 0 obj\n'.encode(), cuerpo]
+        if stream is not None:
+            partes += [b'\nstream\n', stream, b'\nendstream']
+        partes.append(b'\nendobj\n')
+        return self._emitir(b''.join(partes))
+
+    def _nuevo(self):
+        numero = self.siguiente_objeto
+        self.siguiente_objeto += 1
+        return numero
+
+    def inicio(self):
+        return self._emitir(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def pagina(self, jpegs):
+        """Una hoja con hasta POR_HOJA carnets"""
+        salida = []
+        margen_x = (HOJA_PT[0] - COLUMNAS * ANCHO_PT) / 2
+        margen_y = (HOJA_PT[1] - FILAS * ALTO_PT) / 2
+        recursos, contenido = [], []
+        for i, jpeg in enumerate(jpegs):
+            imagen = self._nuevo()
+            salida.append(self._objeto(imagen, (
+                f'<< /Type /XObject /Subtype /Image /Width {ANCHO} /Height {ALTO} /ColorSpace /DeviceRGB '
+                f'/BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpeg)} >>').encode(), jpeg))
+            x = margen_x + (i % COLUMNAS) * ANCHO_PT
+            y = HOJA_PT[1] - margen_y - (i // COLUMNAS + 1) * ALTO_PT
+            recursos.append(f'/C{i} {imagen} 0 R')
+            contenido.append(f'q {ANCHO_PT} 0 0 {ALTO_PT} {x:.2f} {y:.2f} cm /C{i} Do Q')
+
+        flujo = '\n'.join(contenido).encode()
+        numero_contenido = self._nuevo()
+        salida.append(self._objeto(numero_contenido, f'<< /Length {len(flujo)} >>'.encode(), flujo))
+        pagina = self._nuevo()
+        salida.append(self._objeto(pagina, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {HOJA_PT[0]} {HOJA_PT[1]}] '
+            f'/Resources << /XObject << {" ".join(recursos)} >> >> /Contents {numero_contenido} 0 R >>').encode()))
+        self.paginas.append(pagina)
+        return b''.join(salida)
+
+    def fin(self):
+        kids = ' '.join(f'{pagina} 0 R' for pagina in self.paginas)
+        salida = [
+            self._objeto(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(self.paginas)} >>'.encode()),
+            self._objeto(1, b'<< /Type /Catalog /Pages 2 0 R >>'),
+        ]
+        xref = self.posicion
+        total = self.siguiente_objeto
+        tabla = [f'xref\n0 {total}\n', '0000000000 65535 f \n']
+        tabla += [f'{self.offsets[numero]:010d} 00000 n \n' for numero in range(1, total)]
+        tabla.append(f'trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n')
+        salida.append(self._emitir(''.join(tabla).encode()))
+        return b''.join(salida)
+
+def _pool(app):
+    """Pool de procesos de la app, creado al primer uso"""
+    pool = app.extensions.get('carnets_pool')
+    if pool is None:
+        # forkserver y no fork: el worker ya tiene hilos (logs, bus, búferes) y un fork desde aquí
+        # puede copiar un lock tomado por otro hilo y colgar al hijo. Los procesos salen de un
+        # servidor sin hilos que ya importó este módulo (PIL, segno, fuentes).
+        contexto = multiprocessing.get_context('forkserver')
+        contexto.set_forkserver_preload([__name__])
+        pool = ProcessPoolExecutor(max_workers=app.config['CARNETS_WORKERS'] or None, mp_context=contexto)
+        app.extensions['carnets_pool'] = pool
+    return pool
+
+def generar_pdf(app, alumnos):
+    """PDF con los carnets de alumnos, como iterable de bytes página por página
+
+    Los carnets en caché se leen del disco y el resto se encola de inmediato en
+    el pool de procesos; las hojas salen en orden a medida que sus carnets terminan.
+    """
+    cache_dir = app.config['CARNETS_CACHE_DIR']
+    os.makedirs(cache_dir, exist_ok=True)
+    fuente = buscar_fuente(app.config['CARNETS_FUENTE'])
+    carnets = []
+    for alumno in alumnos:
+        datos = datos_carnet(alumno, app.config['UPLOAD_FOLDER'])
+        carnets.append(_leer_cache(cache_dir, datos) or _pool(app).submit(_generar, datos, cache_dir, fuente))
+    return _hojas(carnets)
+
+def _hojas(carnets):
+    pdf = _PDF()
+    yield pdf.inicio()
+    for inicio in range(0, len(carnets), POR_HOJA):
+        hoja = carnets[inicio:inicio + POR_HOJA]
+        yield pdf.pagina([carnet if isinstance(carnet, bytes) else carnet.result() for carnet in hoja])
+    yield pdf.fin()
@@ -0,0 +1,204 @@
+"""
+Check-in de asistencia desde kioscos.
+
+Los alumnos se resuelven desde un índice en memoria rut_num -> alumno y los
+check-ins se acumulan en un búfer que un único hilo por proceso escribe en
+inserts por lote. Así una clase completa escaneando a la vez produce una
+transacción cada pocos segundos en vez de una por alumno, lo que evita la
+contención del lock de escritura de SQLite.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.utils import qr
+from app.utils.rut import rut_num
+
+logger = logging.getLogger(__name__)
+
+class RutIndex:
+    """Índice en memoria rut_num -> (id, nombre) de los alumnos
+
+    Se carga completo la primera vez y se recarga cada ttl segundos; un RUT
+    que no está en el índice se busca en la base (alumnos recién creados).
+    """
+
+    def __init__(self, db, ttl=300):
+        self.db = db
+        self.ttl = ttl
+        self._alumnos = {}
+        self._cargado_en = None
+        self._lock = threading.Lock()
+
+    def _query(self):
+        from app.models.alumno import Alumno
+        return select(Alumno.rut_num, Alumno.id, Alumno.nombre, Alumno.apellido)
+
+    def _cargar(self):
+        filas = self.db.session.execute(self._query()).all()
+        self._alumnos = {num: (id, f'{nombre} {apellido}') for num, id, nombre, apellido in filas}
+        self._cargado_en = time.monotonic()
+
+    def get(self, cuerpo):
+        with self._lock:
+            if self._cargado_en is None or time.monotonic() - self._cargado_en > self.ttl:
+                self._cargar()
+            alumno = self._alumnos.get(cuerpo)
+        if alumno is not None:
+            return alumno
+
+        from app.models.alumno import Alumno
+        fila = self.db.session.execute(self._query().where(Alumno.rut_num == cuerpo)).first()
+        if fila is None:
+            return None
+        alumno = (fila.id, f'{fila.nombre} {fila.apellido}')
+        with self._lock:
+            self._alumnos[cuerpo] = alumno
+        return alumno
+
+    def discard(self, *alumno_ids):
+        """Quita alumnos eliminados o con RUT cambiado del índice de este proceso"""
+        alumno_ids = set(alumno_ids)
+        with self._lock:
+            self._alumnos = {num: a for num, a in self._alumnos.items() if a[0] not in alumno_ids}
+
+class CheckinBuffer:
+    """Búfer de check-ins que se escribe por lotes desde un hilo propio"""
+
+    def __init__(self, app, db, batch_size=50, flush_interval=2.0):
+        self.app = app
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pendientes = []
+        self._vistos = set()  # (alumno_id, sede, clase, fecha) del día en curso
+        self._dia = None
+        self._cond = threading.Condition()
+        self._hilo = None
+
+    def add(self, alumno_id, sede, clase, momento=None):
+        """Encola un check-in; retorna False si ya se registró hoy en esta clase
+
+        Los check-ins de otros días (cola offline de un kiosco) no pasan por el
+        filtro en memoria; los repetidos los descarta la restricción única.
+        """
+        momento = momento or datetime.now()
+        clave = (alumno_id, sede, clase, momento.date())
+        with self._cond:
+            if momento.date() == date.today():
+                if self._dia != momento.date():
+                    self._dia = momento.date()
+                    self._vistos.clear()
+                if clave in self._vistos:
+                    return False
+                self._vistos.add(clave)
+            self._pendientes.append({
+                'alumno_id': alumno_id,
+                'sede': sede,
+                'clase': clase,
+                'fecha': momento.date(),
+                'registrada_en': momento,
+            })
+            self._iniciar_hilo()
+            if len(self._pendientes) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _iniciar_hilo(self):
+        # Se crea al primer check-in y no al importar: los hilos no sobreviven al fork de gunicorn
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._run, name='checkin-flush', daemon=True)
+            self._hilo.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pendientes) >= self.batch_size, timeout=self.flush_interval)
+            self.flush()
+
+    def _insert(self):
+        from app.models.asistencia import Asistencia
+        dialecto = self.db.engine.dialect.name
+        if dialecto == 'sqlite':
+            return sqlite.insert(Asistencia).on_conflict_do_nothing()
+        if dialecto == 'postgresql':
+            return postgresql.insert(Asistencia).on_conflict_do_nothing()
+        return insert(Asistencia)
+
+    def flush(self):
+        """Escribe los check-ins pendientes en un solo INSERT por lote"""
+        with self._cond:
+            lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return 0
+
+        with self.app.app_context():
+            try:
+                self.db.session.execute(self._insert(), lote)
+                self.db.session.commit()
+            except Exception as e:
+                # Un alumno eliminado mientras tanto no debe perder el lote completo
+                self.db.session.rollback()
+                logger.warning('Lote de asistencia falló (%s); reintentando de a uno', e, extra={'filas': len(lote)})
+                for fila in lote:
+                    try:
+                        self.db.session.execute(self._insert(), fila)
+                        self.db.session.commit()
+                    except Exception as e:
+                        self.db.session.rollback()
+                        logger.error('Asistencia descartada para alumno %s: %s', fila['alumno_id'], e)
+        return len(lote)
+
+def init_checkin(app, db):
+    """Crea el índice de RUT y el búfer de check-ins de la app"""
+    rut_index = RutIndex(db, ttl=app.config['CHECKIN_INDEX_TTL'])
+    app.extensions['rut_index'] = rut_index
+    # Alumno editado o eliminado en cualquier worker: se vuelve a buscar en la base
+    app.extensions['bus'].suscribir('alumno', lambda pares: rut_index.discard(*(alumno_id for alumno_id, _ in pares)))
+    buffer = CheckinBuffer(
+        app, db,
+        batch_size=app.config['CHECKIN_BATCH_SIZE'],
+        flush_interval=app.config['CHECKIN_FLUSH_SECONDS'],
+    )
+    app.extensions['checkin_buffer'] = buffer
+    # No perder los check-ins encolados al detener el worker
+    atexit.register(buffer.flush)
+
+def resolver_codigo(codigo):
+    """Alumno (id, nombre) de un RUT o de un token QR firmado, o None
+
+    El token se verifica sin consultar la base; debe coincidir además con el
+    RUT actual del alumno (un carnet anterior a un cambio de RUT no sirve).
+    """
+    if qr.es_token(codigo):
+        verificado = qr.verificar(codigo)
+        if verificado is None:
+            return None
+        alumno_id, cuerpo = verificado
+    else:
+        alumno_id, cuerpo = None, rut_num(codigo)
+        if cuerpo is None:
+            return None
+    alumno = current_app.extensions['rut_index'].get(cuerpo)
+    if alumno is None or (alumno_id is not None and alumno[0] != alumno_id):
+        return None
+    return alumno
+
+def registrar_checkin(codigo, sede, clase, momento=None):
+    """Resuelve el alumno de un RUT o QR firmado y encola su asistencia
+
+    momento es la hora del check-in si no es ahora (cola offline del kiosco).
+
+    Retorna (alumno, nuevo): alumno es (id, nombre) o None si el código no
+    corresponde a ningún alumno; nuevo es False si ya había marcado esta clase hoy.
+    """
+    alumno = resolver_codigo(codigo)
+    if alumno is None:
+        return None, False
+    nuevo = current_app.extensions['checkin_buffer'].add(alumno[0], sede, clase, momento)
+    return alumno, nuevo
@@ -0,0 +1,210 @@
+import zlib
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tipos de contenido que se comprimen (las imágenes ya vienen comprimidas)
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+class GzipStream:
+    """Compresor gzip incremental"""
+
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data, flush=False):
+        out = self._obj.compress(data)
+        if flush:
+            out += self._obj.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+class BrotliStream:
+    """Compresor brotli incremental"""
+
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data, flush=False):
+        out = self._obj.process(data)
+        if flush:
+            out += self._obj.flush()
+        return out
+
+    def finish(self):
+        return self._obj.finish()
+
+class ZstdStream:
+    """Compresor zstd incremental"""
+
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data, flush=False):
+        out = self._obj.compress(data)
+        if flush:
+            out += self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return out
+
+    def finish(self):
+        return self._obj.flush()
+
+def available_encodings():
+    """Codificaciones soportadas según las librerías instaladas, en orden de preferencia"""
+    encodings = {}
+    if zstandard is not None:
+        encodings['zstd'] = ZstdStream
+    if brotli is not None:
+        encodings['br'] = BrotliStream
+    encodings['gzip'] = GzipStream
+    return encodings
+
+class CompressionMiddleware:
+    """Middleware WSGI que comprime respuestas HTML/JSON según Accept-Encoding
+
+    Las respuestas con Content-Length menor a min_size se envían sin comprimir.
+    Las respuestas sin Content-Length (generadores) se comprimen en streaming,
+    vaciando el compresor en cada bloque para no retrasar al cliente.
+    """
+
+    def __init__(self, app, min_size=500, levels=None, encodings=None):
+        self.app = app
+        self.min_size = min_size
+        self.levels = {'gzip': 6, 'br': 4, 'zstd': 3}
+        self.levels.update(levels or {})
+        self.encodings = available_encodings()
+        if encodings is not None:
+            self.encodings = {name: cls for name, cls in self.encodings.items() if name in encodings}
+
+    def negotiate(self, accept_encoding):
+        """Elige la mejor codificación aceptada por el cliente"""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_header(accept_encoding)
+        mejor, mejor_q = None, 0
+        for name in self.encodings:
+            q = accepted[name]
+            if q > mejor_q:
+                mejor, mejor_q = name, q
+        return mejor
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+
+        state = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            state['status'] = status
+            state['headers'] = headers
+            state['exc_info'] = exc_info
+            return state.setdefault('buffer', []).append
+
+        app_iter = self.app(environ, capture_start_response)
+        status, headers = state['status'], state['headers']
+        header_map = {name.lower(): value for name, value in headers}
+
+        if not self._should_compress(status, header_map):
+            start_response(status, headers, state['exc_info'])
+            return self._passthrough(app_iter, state.get('buffer'))
+
+        headers = self._vary(headers, header_map)
+        content_length = header_map.get('content-length')
+        if content_length is not None and int(content_length) < self.min_size:
+            start_response(status, headers, state['exc_info'])
+            return self._passthrough(app_iter, state.get('buffer'))
+
+        compressor = self.encodings[encoding](self.levels[encoding])
+        headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+        headers.append(('Content-Encoding', encoding))
+        etag = header_map.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers = [(n, 'W/' + v if n.lower() == 'etag' else v) for n, v in headers]
+
+        if content_length is not None:
+            # Cuerpo de tamaño conocido: comprimir de una vez y fijar Content-Length
+            try:
+                body = b''.join(state.get('buffer', [])) + b''.join(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+            data = compressor.compress(body) + compressor.finish()
+            headers.append(('Content-Length', str(len(data))))
+            start_response(status, headers, state['exc_info'])
+            return [data]
+
+        start_response(status, headers, state['exc_info'])
+        return self._stream(app_iter, compressor, state.get('buffer'))
+
+    def _should_compress(self, status, header_map):
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if 'content-encoding' in header_map:
+            return False
+        if 'x-accel-redirect' in header_map or 'x-sendfile' in header_map:
+            return False  # El proxy envía el archivo; el cuerpo de la respuesta va vacío
+        if 'no-transform' in header_map.get('cache-control', ''):
+            return False
+        content_type = header_map.get('content-type', '')
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _vary(headers, header_map):
+        vary = header_map.get('vary')
+        if vary is None:
+            return headers + [('Vary', 'Accept-Encoding')]
+        if 'accept-encoding' in vary.lower():
+            return headers
+        return [(n, f'{v}, Accept-Encoding' if n.lower() == 'vary' else v) for n, v in headers]
+
+    @staticmethod
+    def _passthrough(app_iter, buffer):
+        if not buffer:
+            return app_iter
+        return PassthroughIterable(buffer, app_iter)
+
+    @staticmethod
+    def _stream(app_iter, compressor, buffer):
+        try:
+            for chunk in buffer or ():
+                yield compressor.compress(chunk, flush=True)
+            for chunk in app_iter:
+                if chunk:
+                    yield compressor.compress(chunk, flush=True)
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+class PassthroughIterable:
+    """Antepone lo escrito con write() al iterable original, conservando close()"""
+
+    def __init__(self, buffer, app_iter):
+        self.buffer = buffer
+        self.app_iter = app_iter
+
+    def __iter__(self):
+        yield from self.buffer
+        yield from self.app_iter
+
+    def close(self):
+        if hasattr(self.app_iter, 'close'):
+            self.app_iter.close()
@@ -0,0 +1,62 @@
+"""
+Entrega de archivos estáticos y fotos.
+
+STATIC_DELIVERY define quién copia los bytes del archivo al cliente:
+- 'flask': send_file con wsgi.file_wrapper; gunicorn lo envía con sendfile(2)
+  sin pasar el contenido por Python
+- 'x-accel': nginx; la respuesta lleva X-Accel-Redirect hacia una location
+  internal (ver nginx.conf) y sale sin cuerpo
+- 'x-sendfile': Apache/lighttpd; X-Sendfile con la ruta absoluta (USE_X_SENDFILE de Flask)
+
+Con un proxy delante el worker queda libre apenas envía los encabezados.
+"""
+
+import logging
+import mimetypes
+import os
+import stat
+from urllib.parse import quote
+
+from flask import abort, current_app, g, send_from_directory
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('flask', 'x-accel', 'x-sendfile')
+
+def proxy_entrega():
+    """True si un proxy (nginx) entrega el archivo y negocia la compresión"""
+    return current_app.config['STATIC_DELIVERY'] == 'x-accel'
+
+def send_static(filename, mimetype=None):
+    """Envía un archivo de static/ según STATIC_DELIVERY"""
+    app = current_app
+    if not proxy_entrega():
+        return send_from_directory(app.static_folder, filename, mimetype=mimetype)
+
+    path = safe_join(app.static_folder, filename)
+    if path is None:
+        abort(404)
+    try:
+        info = os.stat(path)
+    except OSError:
+        abort(404)
+    if not stat.S_ISREG(info.st_mode):
+        abort(404)
+
+    response = app.response_class(mimetype=mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    response.headers['X-Accel-Redirect'] = app.config['STATIC_ACCEL_PREFIX'] + quote(filename)
+    response.cache_control.no_cache = True  # Igual que send_file sin max_age; nginx responde los condicionales
+    g.archivo_bytes = info.st_size  # El cuerpo va vacío; las métricas usan el tamaño real
+    return response
+
+def init_delivery(app):
+    """Valida STATIC_DELIVERY y activa X-Sendfile si corresponde"""
+    modo = app.config['STATIC_DELIVERY']
+    if modo not in MODOS:
+        logger.warning('STATIC_DELIVERY desconocido: %s, usando flask', modo)
+        app.config['STATIC_DELIVERY'] = modo = 'flask'
+    app.config['USE_X_SENDFILE'] = modo == 'x-sendfile'
+    app.config['STATIC_ACCEL_PREFIX'] = app.config['STATIC_ACCEL_PREFIX'].rstrip('/') + '/'
+    if modo != 'flask':
+        logger.info('Archivos estáticos y fotos entregados por el proxy (%s)', modo)
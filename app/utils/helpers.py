@@ -1,8 +1,16 @@
+import logging
 import os
 import uuid
 from flask import current_app
+from sqlalchemy import event
 from werkzeug.utils import secure_filename
 
+logger = logging.getLogger(__name__)
+
+# Claves en session.info: fotos a borrar tras el commit y fotos subidas en la transacción
+FOTOS_POR_ELIMINAR = 'fotos_por_eliminar'
+FOTOS_NUEVAS = 'fotos_nuevas'
+
 def allowed_file(filename):
     """Verifica si la extensión del archivo está permitida"""
     return '.' in filename and \
@@ -17,8 +25,9 @@ def save_picture(form_picture):
         picture_filename = random_hex + f_ext
         picture_path = os.path.join(current_app.config['UPLOAD_FOLDER'], picture_filename)
         
-        # Guardar archivo
+        # Guardar archivo; se descarta si la transacción hace rollback
         form_picture.save(picture_path)
+        _session_info().setdefault(FOTOS_NUEVAS, []).append(picture_path)
         return picture_filename
     return None
 
@@ -28,3 +37,39 @@ def delete_picture(picture_filename):
         picture_path = os.path.join(current_app.config['UPLOAD_FOLDER'], picture_filename)
         if os.path.exists(picture_path):
             os.remove(picture_path)
+
+def delete_picture_after_commit(picture_filename):
+    """Programa la eliminación de una imagen para cuando la transacción haga commit
+
+    Si la transacción hace rollback la imagen se conserva, así un alumno nunca
+    queda apuntando a un archivo borrado.
+    """
+    if picture_filename:
+        picture_path = os.path.join(current_app.config['UPLOAD_FOLDER'], picture_filename)
+        _session_info().setdefault(FOTOS_POR_ELIMINAR, []).append(picture_path)
+
+def _session_info():
+    from app import db
+    return db.session.info
+
+def _eliminar_archivos(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning('No se pudo eliminar %s: %s', path, e)
+
+def _after_commit(session):
+    session.info.pop(FOTOS_NUEVAS, None)
+    _eliminar_archivos(session.info.pop(FOTOS_POR_ELIMINAR, ()))
+
+def _after_rollback(session):
+    session.info.pop(FOTOS_POR_ELIMINAR, None)
+    _eliminar_archivos(session.info.pop(FOTOS_NUEVAS, ()))
+
+def init_fotos(db):
+    """Ata la eliminación de fotos al ciclo de vida de la transacción"""
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_rollback', _after_rollback)
@@ -0,0 +1,107 @@
+import logging
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Proveedor JSON basado en orjson
+
+    Las fechas se delegan a DefaultJSONProvider.default para mantener el
+    mismo formato que el proveedor estándar de Flask. Respeta sort_keys y,
+    como json, acepta claves int, float, bool o None.
+    """
+
+    name = 'orjson'
+
+    def _opciones(self):
+        opciones = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        return opciones
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Opciones del módulo json (indent, sort_keys...): usar el proveedor estándar
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._opciones()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._opciones())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+class MsgspecProvider(DefaultJSONProvider):
+    """Proveedor JSON basado en msgspec (fechas en formato ISO 8601)
+
+    Con sort_keys msgspec solo ordena diccionarios de claves str; con otras
+    claves se usa el proveedor estándar.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoders = {
+            False: msgspec.json.Encoder(enc_hook=self.default),
+            True: msgspec.json.Encoder(enc_hook=self.default, order='sorted'),
+        }
+        self._decoder = msgspec.json.Decoder()
+
+    def _encode(self, obj):
+        return self._encoders[bool(self.sort_keys)].encode(obj)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._decoder.decode(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._encode(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def select_json_provider(preferencia='auto'):
+    """Retorna la clase de proveedor JSON según preferencia y librerías disponibles"""
+    if preferencia in ('auto', 'orjson') and orjson is not None:
+        return OrjsonProvider
+    if preferencia in ('auto', 'msgspec') and msgspec is not None:
+        return MsgspecProvider
+    if preferencia not in ('auto', 'stdlib'):
+        logger.warning('Proveedor JSON %s no disponible, usando json estándar', preferencia)
+    return DefaultJSONProvider
+
+def init_json_provider(app):
+    """Reemplaza el proveedor JSON de la app según JSON_PROVIDER"""
+    provider_class = select_json_provider(app.config.get('JSON_PROVIDER', 'auto'))
+    app.json = provider_class(app)
+    return app.json
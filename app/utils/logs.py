@@ -0,0 +1,179 @@
+"""
+Logging estructurado sin bloquear los requests.
+
+Los módulos escriben con logging.getLogger(__name__). init_logs(app) deja en
+el logger raíz un QueueHandler: el hilo del request solo arma el registro y lo
+encola; un QueueListener en su propio hilo lo formatea (una línea JSON por
+evento) y lo escribe en stdout.
+
+- Cada registro lleva el request_id: el X-Request-ID que manda el proxy o uno
+  nuevo, que también se devuelve en la respuesta.
+- Los campos pasados en extra={...} salen como claves del JSON.
+- Los eventos DEBUG se muestrean (LOG_MUESTREO_DEBUG) antes de encolarse.
+- Niveles por módulo en LOG_NIVELES: 'app.utils.sql_monitor=WARNING,app.routes.auth=DEBUG'.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+# Atributos propios de LogRecord; el resto son campos de extra={...}
+_ATRIBUTOS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+_REQUEST_ID_VALIDO = re.compile(r'^[\w.-]{1,64}$')
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro"""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            datos['request_id'] = record.request_id
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS:
+                datos[clave] = valor
+        if record.exc_text:
+            datos['exc'] = record.exc_text
+        if record.stack_info:
+            datos['stack'] = record.stack_info
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class TextoFormatter(logging.Formatter):
+    """Formato legible para la consola de desarrollo"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s', '%H:%M:%S')
+
+    def format(self, record):
+        texto = super().format(record)
+        if getattr(record, 'request_id', None):
+            texto = f'{texto} [{record.request_id[:8]}]'
+        return texto
+
+class _ContextoRequest(logging.Filter):
+    """Agrega el request_id (se evalúa en el hilo del request, antes de encolar)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+class _MuestreoDebug(logging.Filter):
+    """Deja pasar solo una fracción de los eventos DEBUG"""
+
+    def __init__(self, tasa):
+        super().__init__()
+        self.tasa = tasa
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.tasa
+
+class _ColaHandler(QueueHandler):
+    """QueueHandler que conserva los campos del registro para el formatter JSON
+
+    QueueHandler.prepare() reemplaza el mensaje por el texto ya formateado; aquí
+    solo se resuelve lo que no puede pasar a otro hilo (args y excepción). El
+    handler guarda el QueueListener que vacía su cola en salida.
+    """
+
+    def __init__(self, cola, salida):
+        super().__init__(cola)
+        self.salida = salida
+        self.listener = None
+
+    def iniciar_listener(self):
+        self.listener = QueueListener(self.queue, self.salida, respect_handler_level=True)
+        self.listener.start()
+
+    def detener_listener(self):
+        if self.listener is not None:
+            self.listener.stop()  # Escribe lo que quedó en la cola
+            self.listener = None
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def parse_niveles(valor):
+    """'a.b=WARNING,c=DEBUG' -> {'a.b': 'WARNING', 'c': 'DEBUG'}"""
+    niveles = {}
+    for par in filter(None, (p.strip() for p in valor.split(','))):
+        nombre, _, nivel = par.partition('=')
+        niveles[nombre.strip()] = nivel.strip().upper()
+    return niveles
+
+def _handler_instalado():
+    return next((h for h in logging.getLogger().handlers if isinstance(h, _ColaHandler)), None)
+
+def _reiniciar_en_hijo():
+    # El hilo del listener no sobrevive al fork (gunicorn --preload, pool de carnets);
+    # solo hace falta el del handler instalado, no los de apps ya reemplazadas
+    handler = _handler_instalado()
+    if handler is not None:
+        handler.iniciar_listener()
+
+def _detener_al_salir():
+    handler = _handler_instalado()
+    if handler is not None:
+        handler.detener_listener()
+
+# Una vez por proceso, no por app. El atexit queda antes que los flush de otros
+# módulos (se importa en el primer init_logs), así que corre después de ellos
+os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+atexit.register(_detener_al_salir)
+
+def init_logs(app):
+    """Configura el logging de la aplicación y el request_id por request"""
+    cola = queue.SimpleQueue()
+    salida = logging.StreamHandler(sys.stdout)
+    salida.setFormatter(TextoFormatter() if app.config['LOG_FORMATO'] == 'texto' else JsonFormatter())
+
+    handler = _ColaHandler(cola, salida)
+    handler.addFilter(_ContextoRequest())
+    handler.addFilter(_MuestreoDebug(app.config['LOG_MUESTREO_DEBUG']))
+
+    raiz = logging.getLogger()
+    for anterior in [h for h in raiz.handlers if isinstance(h, _ColaHandler)]:
+        raiz.removeHandler(anterior)  # Otra app creada en el mismo proceso (tests, benchmark)
+        anterior.detener_listener()
+    raiz.addHandler(handler)
+
+    # app.logger de Flask se llama como el paquete y en modo debug quedaría en DEBUG
+    niveles = {'': app.config['LOG_NIVEL'].upper(), app.name: app.config['LOG_NIVEL'].upper()}
+    niveles.update(parse_niveles(app.config['LOG_NIVELES']))
+    for nombre, nivel in niveles.items():
+        logging.getLogger(nombre or None).setLevel(nivel)
+
+    handler.iniciar_listener()
+
+    encabezado = app.config['LOG_REQUEST_ID_HEADER']
+
+    @app.before_request
+    def _asignar_request_id():
+        recibido = request.headers.get(encabezado, '')
+        g.request_id = recibido if _REQUEST_ID_VALIDO.match(recibido) else uuid.uuid4().hex
+
+    @app.after_request
+    def _devolver_request_id(response):
+        if 'request_id' in g:
+            response.headers[encabezado] = g.request_id
+        return response
@@ -0,0 +1,102 @@
+"""
+Operaciones masivas sobre alumnos con SQL por conjuntos.
+
+Cada operación es una sentencia por tabla (UPDATE/DELETE ... WHERE id IN)
+dentro de una sola transacción, en vez de un request y un commit por alumno.
+Las actualizaciones incrementan version a mano: el version_id_col del ORM no
+interviene en sentencias de Core, y sin ese incremento los fragmentos
+cacheados seguirían mostrando el rango anterior.
+"""
+
+import csv
+import io
+from datetime import datetime
+from sqlalchemy import and_, delete, insert, literal, not_, select, update
+from app import db
+from app.models.alumno import Alumno, MAX_NIVEL
+from app.models.asistencia import Asistencia
+from app.models.promocion import Promocion
+from app.models.usuario import Usuario
+from app.utils.sync import registrar_eliminados
+
+def _versiones(ids, *condiciones):
+    """[(id, version)] de los alumnos seleccionados que cumplen las condiciones"""
+    return db.session.execute(
+        select(Alumno.id, Alumno.version).where(Alumno.id.in_(ids), *condiciones)
+    ).all()
+
+def _promover(ids, condicion, cinturon, nivel, otorgada_por_id):
+    """Registra el historial y aplica el nuevo rango a los alumnos que cumplen condicion"""
+    filtro = and_(Alumno.id.in_(ids), condicion)
+    afectados = _versiones(ids, condicion)
+    if not afectados:
+        return []
+
+    ahora = datetime.utcnow()
+    # Historial primero, leyendo el rango anterior de las mismas filas
+    db.session.execute(
+        insert(Promocion).from_select(
+            ['alumno_id', 'cinturon_anterior', 'nivel_anterior', 'cinturon', 'nivel', 'fecha', 'otorgada_por_id'],
+            select(Alumno.id, Alumno.cinturon, Alumno.nivel, cinturon, nivel,
+                   literal(ahora, Promocion.fecha.type), literal(otorgada_por_id, Promocion.otorgada_por_id.type))
+            .where(filtro),
+        )
+    )
+    db.session.execute(
+        update(Alumno).where(filtro)
+        .values(cinturon=cinturon, nivel=nivel, rango_desde=ahora, version=Alumno.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return afectados
+
+def agregar_rayita(ids, otorgada_por_id=None):
+    """Suma una rayita a los alumnos seleccionados que no tienen el máximo
+
+    Retorna [(id, version anterior)] de los alumnos promovidos.
+    """
+    return _promover(ids, Alumno.nivel < MAX_NIVEL, Alumno.cinturon, Alumno.nivel + 1, otorgada_por_id)
+
+def asignar_cinturon(ids, cinturon, otorgada_por_id=None):
+    """Asigna un cinturón (sin rayitas) a los alumnos seleccionados
+
+    Retorna [(id, version anterior)] de los alumnos cuyo rango cambió.
+    """
+    sin_cambio = and_(Alumno.cinturon == cinturon, Alumno.nivel == 0)
+    return _promover(ids, not_(sin_cambio), literal(cinturon), literal(0), otorgada_por_id)
+
+def eliminar_alumnos(ids):
+    """Elimina los alumnos seleccionados con sus dependencias
+
+    Retorna [(id, version, foto)] para limpiar caché y fotos después del commit.
+    """
+    eliminados = db.session.execute(
+        select(Alumno.id, Alumno.version, Alumno.foto).where(Alumno.id.in_(ids))
+    ).all()
+    if not eliminados:
+        return []
+    ids = [fila.id for fila in eliminados]
+
+    db.session.execute(delete(Asistencia).where(Asistencia.alumno_id.in_(ids)).execution_options(synchronize_session=False))
+    db.session.execute(delete(Promocion).where(Promocion.alumno_id.in_(ids)).execution_options(synchronize_session=False))
+    db.session.execute(
+        update(Usuario).where(Usuario.alumno_id.in_(ids)).values(alumno_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(delete(Alumno).where(Alumno.id.in_(ids)).execution_options(synchronize_session=False))
+    registrar_eliminados(ids)
+    return eliminados
+
+EXPORT_COLUMNAS = ['rut', 'nombre', 'apellido', 'fecha_nacimiento', 'cinturon', 'nivel', 'peso', 'rango_desde', 'fecha_registro']
+
+def exportar_csv(ids):
+    """CSV de los alumnos seleccionados, en una sola consulta"""
+    filas = db.session.execute(
+        select(*[getattr(Alumno, columna) for columna in EXPORT_COLUMNAS])
+        .where(Alumno.id.in_(ids))
+        .order_by(Alumno.apellido, Alumno.nombre)
+    )
+    salida = io.StringIO()
+    writer = csv.writer(salida)
+    writer.writerow(EXPORT_COLUMNAS)
+    writer.writerows(filas)
+    return salida.getvalue()
@@ -0,0 +1,130 @@
+"""
+Métricas Prometheus de la aplicación.
+
+Con varios workers de gunicorn, PROMETHEUS_MULTIPROC_DIR debe estar definido
+antes de importar prometheus_client (ver gunicorn.conf.py); cada worker escribe
+sus valores en ese directorio y /metrics los agrega.
+"""
+
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, current_app, g, request, abort, has_request_context
+from flask.signals import before_render_template, template_rendered
+from flask_login import current_user
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    generate_latest, multiprocess,
+)
+from app.utils.sql_monitor import request_sql_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    'lempar_request_duration_seconds', 'Latencia de requests HTTP',
+    ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'lempar_requests_in_progress', 'Requests en curso',
+    multiprocess_mode='livesum',
+)
+DB_TIME = Histogram(
+    'lempar_request_db_seconds', 'Tiempo en la base de datos por request',
+    ['endpoint'], buckets=LATENCY_BUCKETS,
+)
+RENDER_TIME = Histogram(
+    'lempar_request_render_seconds', 'Tiempo renderizando plantillas por request',
+    ['endpoint'], buckets=LATENCY_BUCKETS,
+)
+PHOTO_BYTES = Counter(
+    'lempar_photo_bytes_served_total', 'Bytes de fotos de alumnos servidos',
+)
+PASSWORD_HASH_TIME = Histogram(
+    'lempar_password_hash_seconds', 'Tiempo de hash/verificación de contraseñas',
+    ['operacion'], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+@contextmanager
+def observe_password_hash(operacion):
+    """Mide el tiempo de generar o verificar un hash de contraseña"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        PASSWORD_HASH_TIME.labels(operacion).observe(time.perf_counter() - inicio)
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_render_time = 0.0
+    g._metrics_render_depth = 0
+    REQUESTS_IN_PROGRESS.inc()
+
+def _after_request(response):
+    inicio = g.get('_metrics_start')
+    if inicio is None:
+        return response
+
+    endpoint = request.endpoint or 'none'
+    REQUEST_LATENCY.labels(endpoint, request.method, str(response.status_code)).observe(time.perf_counter() - inicio)
+    stats = request_sql_stats()
+    DB_TIME.labels(endpoint).observe(stats.time if stats is not None else 0.0)
+    RENDER_TIME.labels(endpoint).observe(g._metrics_render_time)
+
+    if endpoint == 'static' and (request.view_args or {}).get('filename', '').startswith('uploads/'):
+        PHOTO_BYTES.inc(g.get('archivo_bytes') or response.content_length or 0)
+    return response
+
+def _teardown_request(exc):
+    if g.pop('_metrics_start', None) is not None:
+        REQUESTS_IN_PROGRESS.dec()
+
+def _before_render(sender, template, context, **extra):
+    if not has_request_context() or '_metrics_render_depth' not in g:
+        return
+    # Las plantillas pueden anidarse (fragmentos); solo se mide la más externa
+    if g._metrics_render_depth == 0:
+        g._metrics_render_start = time.perf_counter()
+    g._metrics_render_depth += 1
+
+def _after_render(sender, template, context, **extra):
+    if not has_request_context() or '_metrics_render_depth' not in g:
+        return
+    g._metrics_render_depth -= 1
+    if g._metrics_render_depth == 0:
+        g._metrics_render_time += time.perf_counter() - g._metrics_render_start
+
+def init_metrics(app):
+    """Registra la instrumentación de requests y plantillas
+
+    El tiempo de base de datos lo acumula app.utils.sql_monitor.
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+def _autorizado():
+    """Con METRICS_TOKEN, el scraper envía Authorization: Bearer <token>; si no, solo un admin con sesión
+
+    No se confía en la IP de origen: detrás de nginx todas las peticiones llegan desde loopback.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    recibido = request.headers.get('Authorization', '')
+    if token and recibido.startswith('Bearer ') and hmac.compare_digest(recibido[7:].encode(), token.encode()):
+        return True
+    return current_user.is_authenticated and current_user.is_admin()
+
+def metrics_response():
+    """Respuesta en formato de exposición de Prometheus"""
+    if not _autorizado():
+        abort(401)
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    # content_type y no mimetype: CONTENT_TYPE_LATEST ya trae el charset
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
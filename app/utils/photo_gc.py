@@ -0,0 +1,112 @@
+"""
+Recolector de fotos huérfanas en UPLOAD_FOLDER.
+
+Uso:
+    python -m app.utils.photo_gc [--dry-run] [--min-age SEGUNDOS] [--workers N]
+
+- Lee en una sola consulta el conjunto de fotos referenciadas por Alumno.foto
+- Recorre el directorio con os.scandir por bloques, sin cargar el listado completo
+- Hace stat/unlink de cada bloque en un pool de hilos (dominado por E/S)
+- Ignora archivos ocultos, subdirectorios y archivos más nuevos que --min-age,
+  que pueden pertenecer a una transacción que aún no hace commit
+- Informa cuántos archivos y bytes se recuperaron y qué fotos referenciadas faltan
+"""
+
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from sqlalchemy import select
+
+BLOQUE = 1000
+MIN_AGE_DEFAULT = 3600
+WORKERS_DEFAULT = 8
+
+logger = logging.getLogger(__name__)
+
+def fotos_referenciadas(db):
+    """Conjunto de nombres de archivo referenciados por algún alumno"""
+    from app.models.alumno import Alumno
+    return set(db.session.execute(select(Alumno.foto).where(Alumno.foto.isnot(None))).scalars())
+
+def _candidatos(directorio, referenciadas, vistas):
+    """Entradas del directorio que no están referenciadas (las referenciadas se anotan en vistas)"""
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if entrada.name.startswith('.') or not entrada.is_file(follow_symlinks=False):
+                continue
+            if entrada.name in referenciadas:
+                vistas.add(entrada.name)
+                continue
+            yield entrada
+
+def _procesar(entrada, limite, dry_run):
+    """Retorna los bytes recuperados, o None si el archivo es reciente o no se pudo eliminar"""
+    try:
+        info = entrada.stat(follow_symlinks=False)
+        if info.st_mtime > limite:
+            return None
+        if not dry_run:
+            os.unlink(entrada.path)
+        return info.st_size
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning('No se pudo eliminar %s: %s', entrada.path, e)
+        return None
+
+def recolectar(directorio, referenciadas, min_age=MIN_AGE_DEFAULT, workers=WORKERS_DEFAULT, dry_run=False):
+    """Elimina las fotos huérfanas de directorio
+
+    Retorna un dict con archivos, bytes, recientes y faltantes (referenciadas sin archivo).
+    """
+    limite = time.time() - min_age
+    vistas = set()
+    resultado = {'archivos': 0, 'bytes': 0, 'recientes': 0}
+    candidatos = _candidatos(directorio, referenciadas, vistas)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            bloque = list(islice(candidatos, BLOQUE))
+            if not bloque:
+                break
+            for tamaño in pool.map(lambda entrada: _procesar(entrada, limite, dry_run), bloque):
+                if tamaño is None:
+                    resultado['recientes'] += 1
+                else:
+                    resultado['archivos'] += 1
+                    resultado['bytes'] += tamaño
+    resultado['faltantes'] = sorted(referenciadas - vistas)
+    return resultado
+
+def _opcion(nombre, default):
+    if nombre in sys.argv:
+        return int(sys.argv[sys.argv.index(nombre) + 1])
+    return default
+
+if __name__ == '__main__':
+    from app import create_app, db
+
+    dry_run = '--dry-run' in sys.argv
+    app = create_app()
+    with app.app_context():
+        directorio = app.config['UPLOAD_FOLDER']
+        referenciadas = fotos_referenciadas(db)
+        inicio = time.perf_counter()
+        resultado = recolectar(directorio, referenciadas,
+                               min_age=_opcion('--min-age', MIN_AGE_DEFAULT),
+                               workers=_opcion('--workers', WORKERS_DEFAULT),
+                               dry_run=dry_run)
+        duracion = time.perf_counter() - inicio
+
+    accion = 'Se eliminarían' if dry_run else 'Eliminadas'
+    print(f'[INFO] {accion} {resultado["archivos"]} fotos huérfanas '
+          f'({resultado["bytes"] / 1024 / 1024:.1f} MB) en {duracion:.2f}s')
+    if resultado['recientes']:
+        print(f'[INFO] {resultado["recientes"]} huérfanas omitidas por ser recientes o no eliminables')
+    if resultado['faltantes']:
+        print(f'[WARNING] {len(resultado["faltantes"])} fotos referenciadas no existen en {directorio}:')
+        for nombre in resultado['faltantes'][:20]:
+            print(f'  {nombre}')
@@ -0,0 +1,125 @@
+"""
+Perfilado de requests a pedido, solo para administradores.
+
+Un request con ?_profile=1 o el encabezado X-Profile: 1 se ejecuta bajo el
+perfilador de muestreo (pyinstrument, o cProfile si no está instalado) y el
+informe queda en PROFILE_DIR. Sin el interruptor el costo es revisar un
+parámetro y un encabezado.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+from flask import current_app, g, request
+from flask_login import current_user
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+# 20240131-153000-123456_GET_alumnos.listar_alumnos_152ms.html
+_NOMBRE_RE = re.compile(r'^(\d{8}-\d{6}-\d{6})_([A-Z]+)_([\w.]+)_(\d+)ms\.(html|txt)$')
+
+def _solicitado():
+    return request.args.get('_profile') == '1' or request.headers.get('X-Profile') == '1'
+
+def _before_request():
+    if not current_app.config.get('PROFILE_ENABLED') or not _solicitado():
+        return
+    if not current_user.is_authenticated or not current_user.is_admin():
+        return
+
+    if Profiler is not None:
+        profiler = Profiler(interval=current_app.config['PROFILE_INTERVAL'], async_mode='disabled')
+    else:
+        profiler = cProfile.Profile()
+    g._profiler = profiler
+    g._profile_start = time.perf_counter()
+    if Profiler is not None:
+        profiler.start()
+    else:
+        profiler.enable()
+
+def _stop(profiler):
+    if Profiler is not None:
+        profiler.stop()
+    else:
+        profiler.disable()
+
+def _report(profiler):
+    """Contenido y extensión del informe"""
+    if Profiler is not None:
+        return profiler.output_html(), 'html'
+    salida = io.StringIO()
+    pstats.Stats(profiler, stream=salida).sort_stats('cumulative').print_stats(60)
+    return salida.getvalue(), 'txt'
+
+def _after_request(response):
+    profiler = g.pop('_profiler', None)
+    if profiler is None:
+        return response
+    _stop(profiler)
+
+    duracion_ms = (time.perf_counter() - g._profile_start) * 1000
+    contenido, extension = _report(profiler)
+    nombre = (f'{datetime.now():%Y%m%d-%H%M%S-%f}_{request.method}_'
+              f'{request.endpoint or "none"}_{duracion_ms:.0f}ms.{extension}')
+
+    carpeta = current_app.config['PROFILE_DIR']
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, nombre), 'w', encoding='utf-8') as f:
+        f.write(contenido)
+    prune_profiles(carpeta, current_app.config['PROFILE_MAX_FILES'])
+
+    response.headers['X-Profile-Report'] = nombre
+    return response
+
+def _teardown_request(exc):
+    # Si el request falló antes de after_request, detener el perfilador igual
+    profiler = g.pop('_profiler', None)
+    if profiler is not None:
+        _stop(profiler)
+
+def prune_profiles(carpeta, maximo):
+    """Elimina los informes más antiguos por sobre el máximo"""
+    nombres = sorted(n for n in os.listdir(carpeta) if _NOMBRE_RE.match(n))
+    for nombre in nombres[:max(len(nombres) - maximo, 0)]:
+        try:
+            os.remove(os.path.join(carpeta, nombre))
+        except FileNotFoundError:
+            pass  # Otro worker lo eliminó primero
+
+def list_profiles(carpeta):
+    """Informes guardados, del más reciente al más antiguo"""
+    if not os.path.isdir(carpeta):
+        return []
+    perfiles = []
+    for nombre in sorted(os.listdir(carpeta), reverse=True):
+        match = _NOMBRE_RE.match(nombre)
+        if not match:
+            continue
+        fecha, metodo, endpoint, duracion, formato = match.groups()
+        perfiles.append({
+            'nombre': nombre,
+            'fecha': datetime.strptime(fecha, '%Y%m%d-%H%M%S-%f'),
+            'metodo': metodo,
+            'endpoint': endpoint,
+            'duracion_ms': int(duracion),
+            'formato': formato,
+            'bytes': os.path.getsize(os.path.join(carpeta, nombre)),
+        })
+    return perfiles
+
+def is_profile_name(nombre):
+    return _NOMBRE_RE.match(nombre) is not None
+
+def init_profiling(app):
+    """Registra los hooks del perfilador (antes que el resto de la instrumentación)"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,81 @@
+"""
+Códigos QR firmados de los alumnos.
+
+El token es L1.<id>.<rut_num>.<firma>, con la firma HMAC-SHA256 truncada a
+80 bits en base32. Todo en mayúsculas, dígitos y puntos: el QR usa el modo
+alfanumérico y queda más chico (más fácil de leer desde un carnet impreso).
+
+verificar() valida un token solo con la clave, sin consultar la base; el
+kiosco resuelve después el alumno desde el índice de RUT en memoria.
+
+Las imágenes (PNG y SVG) se generan al primer pedido y se guardan en
+QR_CACHE_DIR con la versión del alumno en el nombre.
+"""
+
+import base64
+import glob
+import hashlib
+import hmac
+import os
+import threading
+from functools import lru_cache
+
+import segno
+from flask import current_app
+
+PREFIJO = 'L1.'
+FORMATOS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+@lru_cache(maxsize=4)
+def _clave(secret):
+    # Clave derivada: la misma SECRET_KEY no firma sesiones y QR con la misma clave
+    return hmac.new(secret.encode(), b'qr-alumno', hashlib.sha256).digest()
+
+def _secret():
+    return current_app.config['QR_SECRET'] or current_app.config['SECRET_KEY']
+
+def _firma(clave, mensaje):
+    digest = hmac.new(clave, mensaje.encode(), hashlib.sha256).digest()
+    return base64.b32encode(digest[:10]).decode()
+
+def firmar(alumno_id, rut_num, secret=None):
+    """Token QR de un alumno"""
+    mensaje = f'{alumno_id}.{rut_num}'
+    return f'{PREFIJO}{mensaje}.{_firma(_clave(secret or _secret()), mensaje)}'
+
+def es_token(codigo):
+    return codigo.strip().upper().startswith(PREFIJO)
+
+def verificar(token, secret=None):
+    """(alumno_id, rut_num) de un token válido, o None; no consulta la base"""
+    partes = token.strip().upper().split('.')
+    if len(partes) != 4 or partes[0] + '.' != PREFIJO or not partes[1].isdigit() or not partes[2].isdigit():
+        return None
+    mensaje = f'{partes[1]}.{partes[2]}'
+    if not hmac.compare_digest(partes[3], _firma(_clave(secret or _secret()), mensaje)):
+        return None
+    return int(partes[1]), int(partes[2])
+
+def archivo_qr(alumno_id, version, rut_num, formato):
+    """Nombre del archivo QR en QR_CACHE_DIR; lo genera si no existe"""
+    cache_dir = current_app.config['QR_CACHE_DIR']
+    nombre = f'{alumno_id}-v{version}.{formato}'
+    destino = os.path.join(cache_dir, nombre)
+    if os.path.exists(destino):
+        return nombre
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for anterior in glob.glob(os.path.join(cache_dir, f'{alumno_id}-v*.{formato}')):
+        if anterior != destino:  # Otro request pudo generarlo recién
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+    codigo = segno.make(firmar(alumno_id, rut_num), error='m')
+    temporal = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'  # Un temporal por hilo
+    if formato == 'svg':
+        codigo.save(temporal, kind='svg', scale=8, border=2, xmldecl=False)
+    else:
+        codigo.save(temporal, kind='png', scale=10, border=2)
+    os.replace(temporal, destino)
+    return nombre
@@ -0,0 +1,99 @@
+"""
+RUT chileno: validación módulo 11 y forma canónica.
+
+Un RUT se guarda como texto con formato (12.345.678-5) para mostrarlo y como
+cuerpo entero + dígito verificador para buscarlo: "12345678-5", "12.345.678-5"
+y "123456785" corresponden al mismo rut_num.
+"""
+
+import logging
+import re
+from sqlalchemy import bindparam, select
+
+logger = logging.getLogger(__name__)
+
+_RUT_RE = re.compile(r'^(\d{1,3}(?:\.?\d{3})*)-?([\dkK])$')
+
+class RutInvalido(ValueError):
+    """RUT con formato incorrecto o dígito verificador que no corresponde"""
+
+def digito_verificador(cuerpo):
+    """Dígito verificador de un RUT chileno (módulo 11)"""
+    suma, factor = 0, 2
+    for digito in reversed(str(cuerpo)):
+        suma += int(digito) * factor
+        factor = 2 if factor == 7 else factor + 1
+    resto = 11 - suma % 11
+    return {11: '0', 10: 'K'}.get(resto, str(resto))
+
+def formatear_rut(cuerpo, dv=None):
+    """RUT con puntos y guion: 12.345.678-5"""
+    return f'{cuerpo:,}'.replace(',', '.') + '-' + (dv or digito_verificador(cuerpo))
+
+def parse_rut(texto):
+    """Cuerpo entero y dígito verificador de un RUT escrito en cualquier formato
+
+    Lanza RutInvalido si el formato no es reconocible o el dígito no corresponde.
+    """
+    match = _RUT_RE.match((texto or '').strip().replace(' ', ''))
+    if not match:
+        raise RutInvalido(f'RUT con formato inválido: {texto!r}')
+    cuerpo = int(match.group(1).replace('.', ''))
+    dv = match.group(2).upper()
+    if dv != digito_verificador(cuerpo):
+        raise RutInvalido(f'Dígito verificador incorrecto: {texto!r}')
+    return cuerpo, dv
+
+def rut_num(texto):
+    """Cuerpo entero del RUT, o None si no es válido (para búsquedas)"""
+    try:
+        return parse_rut(texto)[0]
+    except RutInvalido:
+        return None
+
+def backfill_rut(db, *models):
+    """Completa rut_num/rut_dv de filas creadas antes de existir esas columnas
+
+    Se ejecuta al arrancar; solo toca filas con rut_num nulo, por lo que
+    después de la primera vez es una consulta vacía sobre el índice.
+    """
+    for model in models:
+        table = model.__table__
+        pendientes = db.session.execute(
+            select(table.c.id, table.c.rut).where(table.c.rut_num.is_(None))
+        ).all()
+        if not pendientes:
+            continue
+
+        valores, invalidos = [], []
+        for id, rut in pendientes:
+            try:
+                cuerpo, dv = parse_rut(rut)
+            except RutInvalido:
+                invalidos.append(rut)
+                continue
+            valores.append({'_id': id, '_num': cuerpo, '_dv': dv})
+
+        if valores:
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('_id'))
+                .values(rut_num=bindparam('_num'), rut_dv=bindparam('_dv')),
+                valores,
+            )
+        db.session.commit()
+        logger.info('%s: rut_num completado en %d filas', table.name, len(valores))
+        for rut in invalidos:
+            logger.warning('%s: RUT inválido sin rut_num: %s', table.name, rut)
+
+def link_usuarios_alumnos(db, usuario_model, alumno_model):
+    """Asocia por rut_num los usuarios que aún no tienen alumno_id"""
+    usuarios, alumnos = usuario_model.__table__, alumno_model.__table__
+    mismo_alumno = select(alumnos.c.id).where(alumnos.c.rut_num == usuarios.c.rut_num)
+    resultado = db.session.execute(
+        usuarios.update()
+        .where(usuarios.c.alumno_id.is_(None), mismo_alumno.exists())
+        .values(alumno_id=mismo_alumno.scalar_subquery())
+    )
+    db.session.commit()
+    if resultado.rowcount:
+        logger.info('%d usuarios asociados a su alumno', resultado.rowcount)
@@ -0,0 +1,35 @@
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
+
+def ensure_columns(db):
+    """Agrega a tablas existentes las columnas e índices nuevos del modelo
+
+    db.create_all() solo crea tablas que no existen, por lo que las columnas
+    agregadas a un modelo no llegan a bases de datos ya creadas.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    agregadas = []
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existentes = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existentes:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+                agregadas.append(f'{table.name}.{column.name}')
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    for nombre in agregadas:
+        logger.info('Columna agregada: %s', nombre)
+    return agregadas
@@ -0,0 +1,100 @@
+import logging
+import re
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Listas de parámetros de largo variable: "(?, ?, ?)" -> "(?...)"
+_PARAM_LIST_RE = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    """Forma normalizada de una sentencia para agrupar repeticiones"""
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    return _PARAM_LIST_RE.sub('(?...)', statement)
+
+def parameter_shape(parameters):
+    """Tipos de los parámetros, sin exponer sus valores en el log"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f'{len(parameters)} x {parameter_shape(parameters[0])}'
+        return tuple(type(value).__name__ for value in parameters)
+    return type(parameters).__name__
+
+class RequestSQLStats:
+    """Sentencias y tiempo de base de datos acumulados en un request"""
+
+    __slots__ = ('count', 'time', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.shapes = Counter()
+
+def request_sql_stats():
+    """Estadísticas SQL del request actual (None fuera de un request)"""
+    if not has_request_context():
+        return None
+    return g.get('_sql_stats')
+
+def _before_request():
+    g._sql_stats = RequestSQLStats()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['_sql_query_start'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info.pop('_sql_query_start', None)
+    if inicio is None:
+        return
+    duracion = time.perf_counter() - inicio
+
+    stats = request_sql_stats()
+    if stats is not None:
+        stats.count += 1
+        stats.time += duracion
+        stats.shapes[statement_shape(statement)] += 1
+
+    umbral_ms = current_app.config.get('SQL_SLOW_QUERY_MS') if has_request_context() else None
+    if umbral_ms is not None and duracion * 1000 >= umbral_ms:
+        logger.warning('Consulta lenta: %.1f ms en %s', duracion * 1000, request.endpoint, extra={
+            'sentencia': statement_shape(statement),
+            'parametros': parameter_shape(parameters),
+        })
+
+def _after_request(response):
+    stats = request_sql_stats()
+    if stats is None:
+        return response
+
+    umbral = current_app.config.get('SQL_N_PLUS_ONE_THRESHOLD')
+    if umbral:
+        for shape, veces in stats.shapes.items():
+            if veces >= umbral:
+                logger.warning('Posible N+1 en %s: %d ejecuciones', request.endpoint, veces, extra={'sentencia': shape})
+
+    if current_app.config.get('SQL_SERVER_TIMING'):
+        timings = [f'db;dur={stats.time * 1000:.1f};desc="{stats.count} queries"']
+        render_time = g.get('_metrics_render_time')
+        if render_time is not None:
+            timings.append(f'render;dur={render_time * 1000:.1f}')
+        inicio = g.get('_metrics_start')
+        if inicio is not None:
+            timings.append(f'app;dur={(time.perf_counter() - inicio) * 1000:.1f}')
+        response.headers.add('Server-Timing', ', '.join(timings))
+    return response
+
+def init_sql_monitor(app, db):
+    """Registra los hooks del motor que cuentan y miden sentencias por request"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
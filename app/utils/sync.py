@@ -0,0 +1,55 @@
+"""
+Sincronización incremental de la lista de alumnos para los kioscos offline.
+
+- snapshot(): todos los alumnos y un cursor (hora del servidor)
+- cambios(desde): alumnos con actualizado_en posterior al cursor y los ids
+  eliminados desde entonces (AlumnoEliminado)
+
+Al consultar, el cursor se retrocede SYNC_MARGEN_SEGUNDOS: una transacción que
+fijó actualizado_en antes del cursor pero hizo commit después no se pierde. Los
+repetidos no importan porque el cliente reemplaza por id.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from app import db
+from app.models.alumno import Alumno, AlumnoEliminado, ALUMNO_JSON_SELECT, alumno_rows_to_dicts
+
+def _cursor(momento):
+    return momento.isoformat(timespec='microseconds')
+
+def snapshot():
+    """Lista completa de alumnos con el cursor para pedir cambios"""
+    ahora = datetime.utcnow()
+    rows = db.session.execute(ALUMNO_JSON_SELECT.order_by(Alumno.id))
+    return {'cursor': _cursor(ahora), 'alumnos': alumno_rows_to_dicts(rows), 'eliminados': [], 'reiniciar': True}
+
+def cambios(desde):
+    """Alumnos modificados y eliminados desde el cursor
+
+    Si el cursor es más antiguo que el registro de eliminados se responde la
+    lista completa con reiniciar=True.
+    """
+    ahora = datetime.utcnow()
+    if desde < ahora - timedelta(days=current_app.config['SYNC_ELIMINADOS_DIAS']):
+        return snapshot()
+
+    inicio = desde - timedelta(seconds=current_app.config['SYNC_MARGEN_SEGUNDOS'])
+    rows = db.session.execute(ALUMNO_JSON_SELECT.where(Alumno.actualizado_en >= inicio).order_by(Alumno.id))
+    eliminados = db.session.execute(
+        select(AlumnoEliminado.alumno_id).where(AlumnoEliminado.eliminado_en >= inicio)
+    ).scalars().all()
+    return {'cursor': _cursor(ahora), 'alumnos': alumno_rows_to_dicts(rows), 'eliminados': eliminados, 'reiniciar': False}
+
+def registrar_eliminados(ids):
+    """Anota alumnos eliminados (en la transacción en curso) y descarta registros vencidos"""
+    ahora = datetime.utcnow()
+    limite = ahora - timedelta(days=current_app.config['SYNC_ELIMINADOS_DIAS'])
+    # SQLite puede reutilizar el id de un alumno eliminado: se reemplaza el registro anterior
+    db.session.execute(
+        delete(AlumnoEliminado)
+        .where((AlumnoEliminado.alumno_id.in_(ids)) | (AlumnoEliminado.eliminado_en < limite))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(insert(AlumnoEliminado), [{'alumno_id': id, 'eliminado_en': ahora} for id in ids])
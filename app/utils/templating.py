@@ -0,0 +1,36 @@
+import logging
+import os
+import time
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+def init_template_cache(app):
+    """Configura la caché de bytecode de Jinja compartida entre workers
+
+    Debe llamarse antes del primer acceso a app.jinja_env, que se crea
+    de forma perezosa con las opciones de app.jinja_options.
+    """
+    cache_dir = app.config.get('TEMPLATE_CACHE_DIR')
+    if not cache_dir:
+        return None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(cache_dir, pattern='lempar-%s.cache')
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': bytecode_cache}
+    return bytecode_cache
+
+def warmup_templates(app):
+    """Compila todas las plantillas al arrancar para evitar el pico del primer request"""
+    inicio = time.perf_counter()
+    compiladas = 0
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(name)
+            compiladas += 1
+        except Exception as e:
+            logger.warning('No se pudo compilar la plantilla %s: %s', name, e)
+
+    duracion = (time.perf_counter() - inicio) * 1000
+    logger.info('%d plantillas precompiladas en %.1f ms', compiladas, duracion)
+    return compiladas
@@ -0,0 +1,385 @@
+"""
+Llaves de torneo a partir de la lista de alumnos.
+
+dividir() agrupa a los alumnos en divisiones (cinturón, categoría de edad y
+categoría de peso) con una sola consulta de Core, una pasada que calcula las
+claves de cada fila (bisect sobre los límites de edad y peso) y un solo sort
+que deja juntas las divisiones y, dentro de cada una, a los competidores en
+orden de semilla. Las llaves se generan en memoria como listas de dicts con
+las mismas columnas que Combate y se insertan por lote, así un torneo de
+2.000 competidores se arma en milisegundos.
+
+Formatos:
+- 'simple': eliminación simple; la llave se completa a potencia de 2 y los
+  byes van a las mejores semillas (1 contra 16, 8 contra 9, ...)
+- 'doble': llave de ganadores, llave de perdedores y una final (sin
+  revancha si gana quien viene de perdedores)
+- 'todos': todos contra todos por el método del círculo; también se usa en
+  las divisiones de hasta TORNEO_TODOS_CONTRA_TODOS_HASTA competidores
+"""
+
+import logging
+import random
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import groupby
+from flask import current_app
+from sqlalchemy import insert, select
+from app import db
+from app.models.alumno import Alumno, CINTURONES
+from app.models.torneo import Torneo, Division, Competidor, Combate
+
+logger = logging.getLogger(__name__)
+
+# (nombre, edad mínima) por edad de competencia: año del torneo - año de nacimiento
+CATEGORIAS_EDAD = (
+    ('Mirim', 0),
+    ('Infantil', 7),
+    ('Infanto-juvenil', 10),
+    ('Adolescente', 13),
+    ('Juvenil', 16),
+    ('Adulto', 18),
+    ('Master 1', 30),
+    ('Master 2', 36),
+    ('Master 3', 41),
+    ('Master 4', 46),
+    ('Master 5', 51),
+)
+
+# (nombre, límite superior en kg); la última categoría de cada tabla no tiene límite
+_PESOS_ADULTO = (
+    ('Gallo', 57.5), ('Pluma', 64), ('Pena', 70), ('Ligero', 76), ('Medio', 82.3),
+    ('Medio pesado', 88.3), ('Pesado', 94.3), ('Súper pesado', 100.5), ('Pesadísimo', None),
+)
+_PESOS_JUVENIL = (
+    ('Gallo', 53.5), ('Pluma', 58.5), ('Pena', 64), ('Ligero', 69), ('Medio', 74),
+    ('Medio pesado', 79.3), ('Pesado', 84.3), ('Súper pesado', 89.3), ('Pesadísimo', None),
+)
+_PESOS_INFANTIL = tuple((None, limite) for limite in range(20, 80, 5)) + ((None, None),)
+
+PESOS = {
+    'Mirim': _PESOS_INFANTIL,
+    'Infantil': _PESOS_INFANTIL,
+    'Infanto-juvenil': _PESOS_INFANTIL,
+    'Adolescente': _PESOS_INFANTIL,
+    'Juvenil': _PESOS_JUVENIL,
+}  # El resto usa _PESOS_ADULTO
+
+COLUMNAS_COMBATE = ('numero', 'llave', 'ronda', 'origen1', 'origen2', 'semilla1', 'semilla2',
+                    'bye1', 'bye2', 'ganador', 'automatico')
+
+def _kg(valor):
+    return f'{valor:g}'.replace('.', ',')
+
+def _tabla_pesos(tabla):
+    """Límites para bisect y nombre de cada categoría ('Pluma (-64 kg)', '+75 kg')"""
+    limites = [limite for _, limite in tabla[:-1]]
+    nombres = []
+    for nombre, limite in tabla:
+        rango = f'-{_kg(limite)} kg' if limite is not None else f'+{_kg(limites[-1])} kg'
+        nombres.append(f'{nombre} ({rango})' if nombre else rango)
+    return limites, nombres
+
+_EDADES = [minimo for _, minimo in CATEGORIAS_EDAD]
+_PESOS_POR_CATEGORIA = [_tabla_pesos(PESOS.get(nombre, _PESOS_ADULTO)) for nombre, _ in CATEGORIAS_EDAD]
+_ORDEN_CINTURON = {cinturon: i for i, cinturon in enumerate(CINTURONES)}
+
+def dividir(filas, fecha, semilla=0):
+    """Agrupa filas de alumnos en divisiones con los competidores en orden de semilla
+
+    filas: tuplas (id, nombre, apellido, fecha_nacimiento, cinturon, nivel,
+    peso, rango_desde). Dentro de cada división se siembra por rayitas, luego
+    por antigüedad en el rango y al final al azar (reproducible con semilla).
+    Retorna (divisiones, sin_peso): divisiones es una lista de dicts
+    {cinturon, categoria_edad, categoria_peso, competidores} y sin_peso los
+    alumnos que quedaron fuera por no tener peso registrado.
+    """
+    azar = random.Random(semilla)
+    anio = fecha.year
+    sin_rango = datetime.max
+    claves = []
+    sin_peso = []
+    for fila in filas:
+        id, nombre, apellido, fecha_nacimiento, cinturon, nivel, peso, rango_desde = fila
+        if peso is None:
+            sin_peso.append(fila)
+            continue
+        edad = anio - fecha_nacimiento.year
+        i_edad = max(bisect_right(_EDADES, edad) - 1, 0)
+        i_peso = bisect_left(_PESOS_POR_CATEGORIA[i_edad][0], peso)  # Justo en el límite entra en esa categoría
+        claves.append((
+            _ORDEN_CINTURON.get(cinturon, len(CINTURONES)), cinturon, i_edad, i_peso,
+            -nivel, rango_desde or sin_rango, azar.random(),
+            id, f'{nombre} {apellido}', nivel, edad, peso,
+        ))
+    claves.sort()
+
+    divisiones = []
+    for (_, cinturon, i_edad, i_peso), grupo in groupby(claves, key=lambda clave: clave[:4]):
+        competidores = [
+            {'semilla': semilla_division, 'alumno_id': clave[7], 'nombre': clave[8], 'cinturon': cinturon,
+             'nivel': clave[9], 'edad': clave[10], 'peso': clave[11]}
+            for semilla_division, clave in enumerate(grupo, 1)
+        ]
+        divisiones.append({
+            'cinturon': cinturon,
+            'categoria_edad': CATEGORIAS_EDAD[i_edad][0],
+            'categoria_peso': _PESOS_POR_CATEGORIA[i_edad][1][i_peso],
+            'competidores': competidores,
+        })
+    return divisiones, sin_peso
+
+def _combate(numero, llave, ronda, origen1=None, origen2=None):
+    return {'numero': numero, 'llave': llave, 'ronda': ronda, 'origen1': origen1, 'origen2': origen2,
+            'semilla1': None, 'semilla2': None, 'bye1': False, 'bye2': False,
+            'ganador': None, 'automatico': False}
+
+def posiciones_semillas(tam):
+    """Orden de las semillas en la primera ronda: cada par suma tam + 1 y las mejores se cruzan al final"""
+    orden = [1]
+    while len(orden) < tam:
+        total = len(orden) * 2 + 1
+        orden = [s for semilla in orden for s in (semilla, total - semilla)]
+    return orden
+
+def _eliminacion(n, combates, llave='G'):
+    """Agrega la llave de eliminación de n semillas; retorna los números por ronda"""
+    tam = 1 << (n - 1).bit_length()
+    posiciones = posiciones_semillas(tam)
+    ronda = []
+    for i in range(0, tam, 2):
+        combate = _combate(len(combates) + 1, llave, 1)
+        for lado, semilla in ((1, posiciones[i]), (2, posiciones[i + 1])):
+            if semilla <= n:
+                combate[f'semilla{lado}'] = semilla
+            else:
+                combate[f'bye{lado}'] = True
+        combates.append(combate)
+        ronda.append(combate['numero'])
+    rondas = [ronda]
+    while len(ronda) > 1:
+        siguiente = []
+        for a, b in zip(ronda[::2], ronda[1::2]):
+            combates.append(_combate(len(combates) + 1, llave, len(rondas) + 1, f'G{a}', f'G{b}'))
+            siguiente.append(len(combates))
+        rondas.append(siguiente)
+        ronda = siguiente
+    return rondas
+
+def eliminacion_simple(n):
+    combates = []
+    _eliminacion(n, combates)
+    return combates
+
+def doble_eliminacion(n):
+    """Llave de ganadores, de perdedores y final
+
+    La llave de perdedores alterna rondas en que entran los perdedores de la
+    ronda de ganadores correspondiente (en orden invertido una ronda sí y otra
+    no, para postergar revanchas) con rondas entre los que siguen vivos.
+    """
+    combates = []
+    rondas = _eliminacion(n, combates)
+    if len(rondas) == 1:
+        combates.append(_combate(2, 'F', 1, f'G{rondas[0][0]}', f'P{rondas[0][0]}'))
+        return combates
+
+    ronda_p = 1
+    vivos = []
+    primera = rondas[0]
+    for a, b in zip(primera[::2], primera[1::2]):
+        combates.append(_combate(len(combates) + 1, 'P', ronda_p, f'P{a}', f'P{b}'))
+        vivos.append(len(combates))
+    for j, ronda in enumerate(rondas[1:], 1):
+        ronda_p += 1
+        entrantes = ronda[::-1] if j % 2 else ronda
+        nuevos = []
+        for perdedor, vivo in zip(entrantes, vivos):
+            combates.append(_combate(len(combates) + 1, 'P', ronda_p, f'P{perdedor}', f'G{vivo}'))
+            nuevos.append(len(combates))
+        vivos = nuevos
+        if len(vivos) > 1:
+            ronda_p += 1
+            nuevos = []
+            for a, b in zip(vivos[::2], vivos[1::2]):
+                combates.append(_combate(len(combates) + 1, 'P', ronda_p, f'G{a}', f'G{b}'))
+                nuevos.append(len(combates))
+            vivos = nuevos
+    combates.append(_combate(len(combates) + 1, 'F', 1, f'G{rondas[-1][0]}', f'G{vivos[0]}'))
+    return combates
+
+def todos_contra_todos(n):
+    """Método del círculo: cada ronda nadie pelea dos veces (con n impar uno descansa)"""
+    jugadores = list(range(1, n + 1)) + ([None] if n % 2 else [])
+    m = len(jugadores)
+    combates = []
+    for ronda in range(1, m):
+        for i in range(m // 2):
+            a, b = jugadores[i], jugadores[m - 1 - i]
+            if a is not None and b is not None:
+                combate = _combate(len(combates) + 1, 'T', ronda)
+                combate['semilla1'], combate['semilla2'] = min(a, b), max(a, b)
+                combates.append(combate)
+        jugadores = [jugadores[0], jugadores[-1]] + jugadores[1:-1]
+    return combates
+
+GENERADORES = {
+    'simple': eliminacion_simple,
+    'doble': doble_eliminacion,
+    'todos': todos_contra_todos,
+}
+
+def generar_llave(formato, n):
+    """Combates de una división de n competidores, con los byes ya resueltos"""
+    if n < 2:
+        return []
+    combates = GENERADORES[formato](n)
+    resolver(combates)
+    return combates
+
+def resolver(combates):
+    """Completa los lados que vienen de otros combates y decide los byes
+
+    Recorre por número (los orígenes siempre son anteriores). Si un resultado
+    cambió, los combates que dependían de él con otros contrincantes vuelven
+    a quedar pendientes. Retorna los números de los combates modificados.
+    """
+    por_numero = {combate['numero']: combate for combate in combates}
+    modificados = set()
+    for combate in sorted(combates, key=lambda c: c['numero']):
+        antes = tuple(combate[columna] for columna in COLUMNAS_COMBATE)
+        for lado in (1, 2):
+            origen = combate[f'origen{lado}']
+            if origen is None:
+                continue
+            fuente = por_numero[int(origen[1:])]
+            if fuente['ganador'] is None:
+                semilla, bye = None, False
+            else:
+                cual = fuente['ganador'] if origen[0] == 'G' else 3 - fuente['ganador']
+                semilla, bye = fuente[f'semilla{cual}'], fuente[f'bye{cual}']
+            combate[f'semilla{lado}'], combate[f'bye{lado}'] = semilla, bye
+
+        listo1 = combate['semilla1'] is not None or combate['bye1']
+        listo2 = combate['semilla2'] is not None or combate['bye2']
+        if combate['bye1'] or combate['bye2']:
+            if listo1 and listo2:
+                # Pasa quien no es bye; si ambos lo son, pasa un bye
+                combate['ganador'] = 2 if combate['bye1'] and not combate['bye2'] else 1
+                combate['automatico'] = True
+            else:
+                combate['ganador'], combate['automatico'] = None, False
+        elif combate['automatico']:
+            combate['ganador'], combate['automatico'] = None, False
+        elif combate['ganador'] is not None and (antes[5], antes[6]) != (combate['semilla1'], combate['semilla2']):
+            combate['ganador'] = None
+
+        if tuple(combate[columna] for columna in COLUMNAS_COMBATE) != antes:
+            modificados.add(combate['numero'])
+    return modificados
+
+def decidir(combates, numero, ganador):
+    """Registra el ganador (1 o 2, None para anular) y propaga a los combates siguientes"""
+    combate = next((c for c in combates if c['numero'] == numero), None)
+    if combate is None:
+        raise ValueError('El combate no existe en esta división')
+    if combate['automatico']:
+        raise ValueError('Este combate se decide por bye')
+    if ganador is not None:
+        if ganador not in (1, 2):
+            raise ValueError('Ganador inválido')
+        if combate['semilla1'] is None or combate['semilla2'] is None:
+            raise ValueError('El combate todavía no tiene a sus dos competidores')
+    combate['ganador'] = ganador
+    return resolver(combates) | {numero}
+
+def campeon(formato, combates, n):
+    """Semilla del campeón de la división, o None si falta algún resultado"""
+    if n == 1:
+        return 1
+    if formato == 'todos':
+        if any(combate['ganador'] is None for combate in combates):
+            return None
+        return posiciones_todos(combates, n)[0]['semilla']
+    final = combates[-1]  # La final es el combate de mayor número
+    if final['ganador'] is None:
+        return None
+    return final[f"semilla{final['ganador']}"]
+
+def posiciones_todos(combates, n):
+    """Tabla de un todos contra todos: victorias, y el duelo directo desempata entre dos"""
+    victorias = dict.fromkeys(range(1, n + 1), 0)
+    directo = {}
+    for combate in combates:
+        if combate['ganador'] is not None:
+            ganador = combate[f"semilla{combate['ganador']}"]
+            perdedor = combate[f"semilla{3 - combate['ganador']}"]
+            victorias[ganador] += 1
+            directo[(ganador, perdedor)] = True
+    tabla = sorted(victorias.items(), key=lambda item: (-item[1], item[0]))
+    for i in range(len(tabla) - 1):
+        (a, va), (b, vb) = tabla[i], tabla[i + 1]
+        if va == vb and directo.get((b, a)):
+            tabla[i], tabla[i + 1] = tabla[i + 1], tabla[i]
+    return [{'semilla': semilla, 'victorias': cantidad} for semilla, cantidad in tabla]
+
+def armar_torneo(nombre, fecha, formato, cinturones=None, creado_por=None):
+    """Arma el torneo con todos los alumnos que tienen peso (de los cinturones indicados)
+
+    Retorna (torneo, sin_peso). No hace commit.
+    """
+    consulta = select(Alumno.id, Alumno.nombre, Alumno.apellido, Alumno.fecha_nacimiento,
+                      Alumno.cinturon, Alumno.nivel, Alumno.peso, Alumno.rango_desde)
+    if cinturones:
+        consulta = consulta.where(Alumno.cinturon.in_(cinturones))
+    filas = db.session.execute(consulta).all()
+
+    torneo = Torneo(nombre=nombre, fecha=fecha, formato=formato,
+                    semilla=random.randrange(2 ** 31), creado_por_id=creado_por)
+    db.session.add(torneo)
+    db.session.flush()
+
+    divisiones, sin_peso = dividir(filas, fecha, torneo.semilla)
+    hasta = current_app.config['TORNEO_TODOS_CONTRA_TODOS_HASTA']
+    objetos = [
+        Division(torneo_id=torneo.id, orden=orden, cinturon=division['cinturon'],
+                 categoria_edad=division['categoria_edad'], categoria_peso=division['categoria_peso'],
+                 formato='todos' if len(division['competidores']) <= hasta else formato)
+        for orden, division in enumerate(divisiones, 1)
+    ]
+    db.session.add_all(objetos)
+    db.session.flush()  # Ids de las divisiones para los inserts por lote
+
+    competidores = []
+    combates = []
+    for objeto, division in zip(objetos, divisiones):
+        competidores.extend(dict(competidor, division_id=objeto.id) for competidor in division['competidores'])
+        combates.extend(dict(combate, division_id=objeto.id)
+                        for combate in generar_llave(objeto.formato, len(division['competidores'])))
+    if competidores:
+        db.session.execute(insert(Competidor), competidores)
+    if combates:
+        db.session.execute(insert(Combate), combates)
+    logger.info('Torneo armado', extra={'torneo_id': torneo.id, 'divisiones': len(objetos),
+                                        'competidores': len(competidores), 'combates': len(combates)})
+    return torneo, sin_peso
+
+def combates_division(division_id):
+    """Combates de una división como dicts (el formato de generar_llave)"""
+    filas = db.session.execute(
+        select(*[getattr(Combate, columna) for columna in COLUMNAS_COMBATE])
+        .where(Combate.division_id == division_id)
+        .order_by(Combate.numero)
+    )
+    return [dict(fila._mapping) for fila in filas]
+
+def registrar_resultado(division, numero, ganador):
+    """Guarda el resultado de un combate y actualiza los siguientes; no hace commit"""
+    filas = Combate.query.filter_by(division_id=division.id).order_by(Combate.numero).all()
+    combates = [{columna: getattr(fila, columna) for columna in COLUMNAS_COMBATE} for fila in filas]
+    modificados = decidir(combates, numero, ganador)
+    for fila, combate in zip(filas, combates):
+        if combate['numero'] in modificados:
+            for columna in COLUMNAS_COMBATE:
+                setattr(fila, columna, combate[columna])
+    return modificados
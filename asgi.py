@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada ASGI: API asíncrona de lectura de alumnos + app Flask
+Uso: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+"""
+
+import os
+from app import create_app
+from app.asgi import create_asgi_app
+from app.config import config
+
+# Determinar el entorno
+config_name = os.environ.get('FLASK_ENV', 'default')
+flask_app = create_app(config[config_name])
+app = create_asgi_app(flask_app)
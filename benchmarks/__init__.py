@@ -0,0 +1,8 @@
+"""
+Benchmarks y pruebas de carga del sistema de alumnos.
+
+    python -m benchmarks.run --alumnos 1000 --output resultados.json
+    python -m benchmarks.compare antes.json despues.json
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_compression
+"""
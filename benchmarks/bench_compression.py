@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compresión de respuestas: bytes enviados y costo de CPU por request
+
+Uso: python -m benchmarks.bench_compression [--alumnos 500] [--repeticiones 20]
+"""
+
+import argparse
+import time
+
+from benchmarks.environment import configure
+
+# La configuración se evalúa al importar app.config: fijar el entorno antes
+configure(COMPRESS_ENABLED='0')
+
+from app import create_app, db
+from app.config import ProductionConfig
+from app.utils.compression import CompressionMiddleware, available_encodings
+from benchmarks.roster import seed_roster
+
+RUTAS = ['/api/alumnos', '/alumnos/', '/usuarios/']
+NIVELES = {'gzip': [1, 6, 9], 'br': [1, 4, 11], 'zstd': [1, 3, 10]}
+
+def medir(client, ruta, accept_encoding, repeticiones):
+    """Retorna (bytes, ms de CPU por request)"""
+    headers = {'Accept-Encoding': accept_encoding}
+    response = client.get(ruta, headers=headers)
+    size = len(response.get_data())
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        client.get(ruta, headers=headers).get_data()
+    return size, (time.process_time() - inicio) * 1000 / repeticiones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alumnos', type=int, default=500)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(ProductionConfig)
+    app.config['WTF_CSRF_ENABLED'] = False
+    base_wsgi = app.wsgi_app
+    with app.app_context():
+        seed_roster(db, args.alumnos)
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+
+    print(f'\nAlumnos: {args.alumnos}  Repeticiones: {args.repeticiones}\n')
+    print(f'{"ruta":<14} {"encoding":<9} {"nivel":>5} {"bytes":>10} {"ratio":>7} {"ms/req":>8} {"+ms":>7}')
+    for ruta in RUTAS:
+        app.wsgi_app = base_wsgi
+        raw_size, raw_ms = medir(client, ruta, 'identity', args.repeticiones)
+        print(f'{ruta:<14} {"identity":<9} {"-":>5} {raw_size:>10} {1:>7.1f} {raw_ms:>8.2f} {0:>7.2f}')
+
+        for encoding in available_encodings():
+            for nivel in NIVELES[encoding]:
+                app.wsgi_app = CompressionMiddleware(base_wsgi, levels={encoding: nivel}, encodings=[encoding])
+                size, ms = medir(client, ruta, encoding, args.repeticiones)
+                print(f'{ruta:<14} {encoding:<9} {nivel:>5} {size:>10} {raw_size / size:>7.1f} {ms:>8.2f} {ms - raw_ms:>7.2f}')
+        print()
+
+if __name__ == '__main__':
+    main()
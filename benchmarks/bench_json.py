@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de serialización JSON de alumnos: filas por segundo
+
+Compara ORM + Alumno.to_dict() contra filas Core + alumno_rows_to_dicts,
+cada uno con los proveedores JSON disponibles (estándar, orjson, msgspec).
+
+Uso: python -m benchmarks.bench_json [--alumnos 5000] [--repeticiones 10]
+"""
+
+import argparse
+import time
+
+from benchmarks.environment import configure
+
+# La configuración se evalúa al importar app.config: fijar el entorno antes
+configure()
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.config import ProductionConfig
+from app.models.alumno import Alumno, ALUMNO_JSON_SELECT, alumno_rows_to_dicts
+from app.utils import json_provider
+from benchmarks.roster import seed_roster
+
+def orm_path():
+    db.session.expunge_all()
+    return [alumno.to_dict() for alumno in Alumno.query.all()]
+
+def core_path():
+    return alumno_rows_to_dicts(db.session.execute(ALUMNO_JSON_SELECT))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alumnos', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app(ProductionConfig)
+    providers = [('stdlib', DefaultJSONProvider)]
+    if json_provider.orjson is not None:
+        providers.append(('orjson', json_provider.OrjsonProvider))
+    if json_provider.msgspec is not None:
+        providers.append(('msgspec', json_provider.MsgspecProvider))
+
+    with app.test_request_context():
+        seed_roster(db, args.alumnos)
+        assert orm_path() == core_path(), 'Las dos rutas deben producir el mismo JSON'
+
+        print(f'\nAlumnos: {args.alumnos}  Repeticiones: {args.repeticiones}\n')
+        print(f'{"filas":<6} {"json":<8} {"filas/s":>12} {"ms/request":>11}')
+        for path_name, path in [('orm', orm_path), ('core', core_path)]:
+            for provider_name, provider_class in providers:
+                app.json = provider_class(app)
+                path()
+                inicio = time.perf_counter()
+                for _ in range(args.repeticiones):
+                    app.json.response(path()).get_data()
+                total = time.perf_counter() - inicio
+                filas_s = args.alumnos * args.repeticiones / total
+                print(f'{path_name:<6} {provider_name:<8} {filas_s:>12,.0f} {total * 1000 / args.repeticiones:>11.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Compara dos archivos de resultados de benchmarks.run
+
+Uso: python -m benchmarks.compare antes.json despues.json
+"""
+
+import argparse
+import json
+
+METRICAS = [('throughput_rps', 'req/s', True), ('p50_ms', 'p50', False),
+            ('p95_ms', 'p95', False), ('p99_ms', 'p99', False),
+            ('queries_per_request', 'queries', False)]
+
+def _delta(antes, despues, mayor_es_mejor):
+    if antes in (None, 0) or despues is None:
+        return '-'
+    cambio = (despues - antes) / antes * 100
+    signo = '+' if cambio >= 0 else ''
+    marca = ''
+    if abs(cambio) >= 5:
+        marca = ' ✓' if (cambio > 0) == mayor_es_mejor else ' ✗'
+    return f'{signo}{cambio:.1f}%{marca}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('antes')
+    parser.add_argument('despues')
+    args = parser.parse_args()
+
+    with open(args.antes, encoding='utf-8') as f:
+        antes = json.load(f)
+    with open(args.despues, encoding='utf-8') as f:
+        despues = json.load(f)
+
+    print(f'antes:   {antes["meta"].get("commit")} ({antes["meta"].get("fecha")})')
+    print(f'después: {despues["meta"].get("commit")} ({despues["meta"].get("fecha")})')
+
+    for modo, rutas in despues['resultados'].items():
+        if modo not in antes['resultados']:
+            continue
+        print(f'\n[{modo}]')
+        print(f'{"ruta":<15} ' + ' '.join(f'{etiqueta:>20}' for _, etiqueta, _ in METRICAS))
+        for ruta, r in rutas.items():
+            base = antes['resultados'][modo].get(ruta)
+            if base is None:
+                continue
+            celdas = []
+            for clave, _, mayor_es_mejor in METRICAS:
+                valor = r.get(clave)
+                texto = '-' if valor is None else f'{valor:.1f}'
+                celdas.append(f'{texto} ({_delta(base.get(clave), valor, mayor_es_mejor)})'.rjust(20))
+            print(f'{ruta:<15} ' + ' '.join(celdas))
+
+if __name__ == '__main__':
+    main()
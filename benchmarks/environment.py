@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+def configure(database_url=None, **config):
+    """Fija el entorno de la app; debe llamarse antes de importar el paquete app
+
+    La configuración de app.config se evalúa al importarse, por lo que
+    DATABASE_URL y las demás opciones se pasan como variables de entorno.
+    Sin database_url se usa una base SQLite temporal.
+    """
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='lempar-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['TEMPLATE_CACHE_DIR'] = os.path.join(tempfile.gettempdir(), 'lempar-bench-jinja')
+    for key, value in config.items():
+        os.environ[key] = str(value)
+    return database_url
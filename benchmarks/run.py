@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Benchmark reproducible de las rutas principales
+
+Siembra N alumnos sintéticos y ejecuta cada ruta con el cliente de pruebas de
+Flask (en proceso, secuencial) y con un generador de carga HTTP concurrente
+contra un servidor local o una URL externa (p. ej. gunicorn). Reporta
+throughput, p50/p95/p99 y sentencias SQL por ruta y guarda todo en JSON
+para comparar entre commits con benchmarks.compare.
+
+Uso:
+    python -m benchmarks.run --alumnos 1000 --requests 200 --output base.json
+    python -m benchmarks.run --database-url postgresql://... --modo http --concurrencia 16
+    python -m benchmarks.run --modo http --url http://127.0.0.1:8000 --database-url <misma BD del servidor>
+"""
+
+import argparse
+import http.cookiejar
+import json
+import logging
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.environment import configure
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+ADMIN = {'username': 'admin', 'password': 'admin123'}
+
+def percentiles(latencias):
+    """p50/p95/p99 y media en milisegundos"""
+    if len(latencias) < 2:
+        valor = latencias[0] * 1000 if latencias else 0.0
+        return {'p50_ms': valor, 'p95_ms': valor, 'p99_ms': valor, 'mean_ms': valor}
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return {
+        'p50_ms': round(cortes[49] * 1000, 3),
+        'p95_ms': round(cortes[94] * 1000, 3),
+        'p99_ms': round(cortes[98] * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencias) * 1000, 3),
+    }
+
+def queries_en(server_timing):
+    match = SERVER_TIMING_QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+def resumen(latencias, errores, queries, duracion):
+    datos = {
+        'requests': len(latencias),
+        'errors': errores,
+        'throughput_rps': round(len(latencias) / duracion, 2) if duracion else 0.0,
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+    }
+    datos.update(percentiles(latencias))
+    return datos
+
+class Escenario:
+    """Datos compartidos entre rutas: ids de alumnos, RUT sin cuenta, usuarios"""
+
+    def __init__(self, ids, ruts_con_cuenta, ruts_sin_cuenta, seed=42):
+        self.ids = ids
+        self.ruts_con_cuenta = ruts_con_cuenta
+        self.ruts = list(ruts_con_cuenta) + list(ruts_sin_cuenta)
+        self.ruts_sin_cuenta = list(ruts_sin_cuenta)
+        self.rnd = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def alumno_id(self):
+        with self._lock:
+            return self.rnd.choice(self.ids)
+
+    def usuario_login(self):
+        with self._lock:
+            i = self.rnd.randrange(len(self.ruts_con_cuenta))
+        from benchmarks.roster import BENCH_PASSWORD
+        return {'username': f'bench{i}', 'password': BENCH_PASSWORD}
+
+    def checkin(self):
+        with self._lock:
+            rut = self.rnd.choice(self.ruts)
+        return {'rut': rut, 'sede': 'Central', 'clase': 'Benchmark'}
+
+    def nuevo_registro(self):
+        with self._lock:
+            if not self.ruts_sin_cuenta:
+                return None
+            rut = self.ruts_sin_cuenta.pop()
+        # Derivado del RUT para no repetir nombres entre modos
+        n = rut.split('-')[0].replace('.', '')
+        return {
+            'rut': rut,
+            'username': f'nuevo{n}',
+            'email': f'nuevo{n}@lempar.com',
+            'password': 'password123',
+            'confirm_password': 'password123',
+        }
+
+# (nombre, método, ruta, requiere sesión de admin, status esperado)
+RUTAS = [
+    ('alumnos', 'GET', '/alumnos/', True, 200),
+    ('alumnos_pagina', 'GET', '/alumnos/pagina?despues={id}', True, 200),
+    ('ver_alumno', 'GET', '/alumnos/{id}', True, 200),
+    ('api_alumnos', 'GET', '/api/alumnos', True, 200),
+    ('usuarios', 'GET', '/usuarios/', True, 200),
+    ('checkin', 'POST', '/asistencia/checkin', True, 200),
+    ('login', 'POST', '/login', False, 302),
+    ('registro', 'POST', '/registro', False, 302),
+]
+
+def _form(nombre, escenario):
+    if nombre == 'login':
+        return escenario.usuario_login()
+    if nombre == 'registro':
+        return escenario.nuevo_registro()
+    if nombre == 'checkin':
+        return escenario.checkin()
+    return None
+
+def run_test_client(app, escenario, requests_por_ruta):
+    """Ejecuta las rutas en proceso con el cliente de pruebas de Flask"""
+    admin = app.test_client()
+    admin.post('/login', data=ADMIN)
+    resultados = {}
+
+    for nombre, metodo, ruta, con_sesion, esperado in RUTAS:
+        latencias, queries, errores = [], [], 0
+        inicio_ruta = time.perf_counter()
+        for _ in range(requests_por_ruta):
+            client = admin if con_sesion else app.test_client()
+            path = ruta.format(id=escenario.alumno_id())
+            data = _form(nombre, escenario)
+            if metodo == 'POST' and data is None:
+                break
+            inicio = time.perf_counter()
+            response = client.open(path, method=metodo, data=data)
+            response.get_data()
+            latencias.append(time.perf_counter() - inicio)
+            if response.status_code != esperado:
+                errores += 1
+            q = queries_en(response.headers.get('Server-Timing'))
+            if q is not None:
+                queries.append(q)
+        resultados[nombre] = resumen(latencias, errores, queries, time.perf_counter() - inicio_ruta)
+    return resultados
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+def _opener():
+    jar = http.cookiejar.CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), _NoRedirect())
+
+def _request(opener, url, data=None):
+    """Retorna (status, encabezados, cuerpo) sin seguir redirecciones"""
+    body = urllib.parse.urlencode(data).encode() if data is not None else None
+    try:
+        with opener.open(url, data=body, timeout=60) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def _post_form(opener, url, data):
+    """POST de un formulario WTForms, obteniendo antes el token CSRF si existe"""
+    _, _, html = _request(opener, url)
+    match = CSRF_RE.search(html.decode('utf-8', 'replace'))
+    if match:
+        data = dict(data, csrf_token=match.group(1))
+    inicio = time.perf_counter()
+    status, headers, _ = _request(opener, url, data)
+    return status, headers, time.perf_counter() - inicio
+
+def run_http(base_url, escenario, requests_por_ruta, concurrencia):
+    """Generador de carga HTTP concurrente (un opener con cookies por hilo)"""
+    local = threading.local()
+
+    def admin_opener():
+        if not hasattr(local, 'admin'):
+            local.admin = _opener()
+            _post_form(local.admin, base_url + '/login', ADMIN)
+        return local.admin
+
+    resultados = {}
+    for nombre, metodo, ruta, con_sesion, esperado in RUTAS:
+        def una_request(_):
+            path = ruta.format(id=escenario.alumno_id())
+            data = _form(nombre, escenario)
+            if metodo == 'POST' and data is None:
+                return None
+            if metodo == 'POST' and not con_sesion:
+                # Formularios públicos: sesión nueva y token CSRF por request
+                status, headers, latencia = _post_form(_opener(), base_url + path, data)
+            else:
+                opener = admin_opener() if con_sesion else _opener()
+                inicio = time.perf_counter()
+                status, headers, _ = _request(opener, base_url + path, data)
+                latencia = time.perf_counter() - inicio
+            return latencia, status == esperado, queries_en(headers.get('Server-Timing'))
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            # Calentar las sesiones de admin antes de medir
+            list(pool.map(lambda _: admin_opener(), range(concurrencia)))
+            inicio_ruta = time.perf_counter()
+            muestras = [m for m in pool.map(una_request, range(requests_por_ruta)) if m is not None]
+            duracion = time.perf_counter() - inicio_ruta
+
+        resultados[nombre] = resumen(
+            [m[0] for m in muestras],
+            sum(1 for m in muestras if not m[1]),
+            [m[2] for m in muestras if m[2] is not None],
+            duracion,
+        )
+    return resultados
+
+def _serve_local(app):
+    """Levanta un servidor WSGI local con hilos y retorna su URL base"""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+def imprimir(modo, resultados):
+    print(f'\n[{modo}]')
+    print(f'{"ruta":<15} {"req":>6} {"err":>5} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8}')
+    for nombre, r in resultados.items():
+        q = '-' if r['queries_per_request'] is None else f'{r["queries_per_request"]:.1f}'
+        print(f'{nombre:<15} {r["requests"]:>6} {r["errors"]:>5} {r["throughput_rps"]:>9.1f} '
+              f'{r["p50_ms"]:>9.2f} {r["p95_ms"]:>9.2f} {r["p99_ms"]:>9.2f} {q:>8}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alumnos', type=int, default=1000)
+    parser.add_argument('--usuarios', type=int, default=100, help='Alumnos con cuenta (para /login)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests por ruta')
+    parser.add_argument('--modo', choices=['client', 'http', 'ambos'], default='ambos')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--database-url', help='Por defecto, SQLite temporal')
+    parser.add_argument('--url', help='Servidor externo que usa --database-url (solo modo http)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    args = parser.parse_args()
+
+    database_url = configure(args.database_url, SQL_SERVER_TIMING='1', SQL_SLOW_QUERY_MS='1000000')
+
+    from app import create_app, db
+    from app.config import ProductionConfig
+    from benchmarks.roster import seed_roster, remove_photos
+
+    app = create_app(ProductionConfig)
+    app.config['WTF_CSRF_ENABLED'] = False
+    upload_folder = app.config['UPLOAD_FOLDER']
+
+    with app.app_context():
+        inicio = time.perf_counter()
+        con_cuenta, sin_cuenta = seed_roster(db, args.alumnos, usuarios=args.usuarios,
+                                             upload_folder=upload_folder, seed=args.seed)
+        print(f'[INFO] {args.alumnos} alumnos sembrados en {time.perf_counter() - inicio:.2f} s')
+        from app.models.alumno import Alumno
+        ids = [id for (id,) in db.session.query(Alumno.id)]
+
+    resultados = {}
+    try:
+        if args.modo in ('client', 'ambos'):
+            escenario = Escenario(ids, con_cuenta, sin_cuenta, seed=args.seed)
+            resultados['test_client'] = run_test_client(app, escenario, args.requests)
+            imprimir('test_client', resultados['test_client'])
+            sin_cuenta = escenario.ruts_sin_cuenta
+
+        if args.modo in ('http', 'ambos'):
+            server = None
+            base_url = args.url
+            if base_url is None:
+                base_url, server = _serve_local(app)
+            escenario = Escenario(ids, con_cuenta, sin_cuenta, seed=args.seed)
+            resultados['http'] = run_http(base_url.rstrip('/'), escenario, args.requests, args.concurrencia)
+            imprimir(f'http x{args.concurrencia}', resultados['http'])
+            if server is not None:
+                server.shutdown()
+    finally:
+        remove_photos(upload_folder)
+
+    if args.output:
+        salida = {
+            'meta': {
+                'commit': _git_commit(),
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'alumnos': args.alumnos,
+                'usuarios': args.usuarios,
+                'requests_por_ruta': args.requests,
+                'concurrencia': args.concurrencia,
+                'base_de_datos': database_url.split(':', 1)[0],
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+            },
+            'resultados': resultados,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(salida, f, indent=2)
+        print(f'\n[OK] Resultados guardados en {args.output}')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""
+Configuración de gunicorn (se carga automáticamente desde el directorio actual)
+"""
+
+import os
+import shutil
+
+# Directorio compartido de métricas Prometheus entre workers.
+# Debe definirse antes de que los workers importen prometheus_client.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/lempar-metrics')
+
+# Sin proxy, los archivos de send_file salen con sendfile(2) (STATIC_DELIVERY=flask)
+sendfile = True
+
+def on_starting(server):
+    """Limpia métricas de ejecuciones anteriores al arrancar el master"""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Marca como terminado al worker para que sus gauges 'live' no se sumen"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,89 @@
+// Service worker de la recepción offline (generado por pwa.service_worker)
+const VERSION = '{{ version }}';
+const SHELL = 'lempar-shell-' + VERSION;
+const ESTATICOS = 'lempar-estaticos';
+const MAX_ESTATICOS = 2000;  // Fotos y fuentes guardadas al usarse
+const RECURSOS = {{ recursos | tojson }};
+const URL_SHELL = {{ shell | tojson }};
+
+async function guardar(cache, url) {
+    const mismoOrigen = new URL(url, self.location.href).origin === self.location.origin;
+    // Las dependencias de CDN (sin construir static/vendor) se guardan como respuestas opacas
+    const response = await fetch(url, {mode: mismoOrigen ? 'same-origin' : 'no-cors', cache: 'reload'});
+    if (mismoOrigen && !response.ok) {
+        throw new Error(`No se pudo guardar ${url}: ${response.status}`);
+    }
+    await cache.put(url, response);
+}
+
+self.addEventListener('install', function (event) {
+    event.waitUntil((async function () {
+        const cache = await caches.open(SHELL);
+        await Promise.all(RECURSOS.map(url => guardar(cache, url)));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil((async function () {
+        const nombres = await caches.keys();
+        await Promise.all(nombres
+            .filter(nombre => nombre.startsWith('lempar-shell-') && nombre !== SHELL)
+            .map(nombre => caches.delete(nombre)));
+        await self.clients.claim();
+    })());
+});
+
+async function recortar(cache) {
+    const claves = await cache.keys();
+    for (const clave of claves.slice(0, Math.max(0, claves.length - MAX_ESTATICOS))) {
+        await cache.delete(clave);
+    }
+}
+
+// Shell: respuesta inmediata desde la caché y actualización en segundo plano
+async function shell(event) {
+    const cache = await caches.open(SHELL);
+    const guardada = await cache.match(URL_SHELL);
+    const red = fetch(event.request).then(async function (response) {
+        // Una redirección al login (sesión vencida) no reemplaza el shell guardado
+        if (response.ok && !response.redirected) {
+            await cache.put(URL_SHELL, response.clone());
+        }
+        return response;
+    });
+    if (guardada) {
+        event.waitUntil(red.catch(() => null));
+        return guardada;
+    }
+    return red;
+}
+
+// Estáticos (con hash, fotos con nombre único, CDN): primero la caché
+async function estatico(request) {
+    const guardada = await caches.match(request);
+    if (guardada) {
+        return guardada;
+    }
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        const cache = await caches.open(ESTATICOS);
+        await cache.put(request, response.clone());
+        recortar(cache);
+    }
+    return response;
+}
+
+self.addEventListener('fetch', function (event) {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.origin === self.location.origin && url.pathname === URL_SHELL && request.mode === 'navigate') {
+        event.respondWith(shell(event));
+    } else if (url.origin === self.location.origin ? url.pathname.startsWith('/static/') : request.destination !== '') {
+        event.respondWith(estatico(request));
+    }
+    // El resto (páginas del sitio, API, check-in) va directo a la red
+});
@@ -0,0 +1,155 @@
+"""
+Bus de invalidación con varios procesos, como los workers de gunicorn.
+
+Los procesos se crean con fork después de armar la app (igual que gunicorn
+con preload) y se comunican solo por el bus de archivo en un BUS_DIR temporal.
+"""
+
+import multiprocessing
+import time
+from datetime import date
+
+import pytest
+from flask import Flask
+
+from app.utils import bus as bus_mod
+
+pytestmark = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                                reason='Requiere fork (POSIX)')
+
+SUSCRIPTORES = 3
+PUBLICADORES = 3
+MENSAJES = 300
+ESPERA = 10  # Segundos máximos para que lleguen los avisos
+PAUSA = 0.001  # Entre mensajes: los suscriptores no quedan SEGMENTOS_GUARDADOS atrás (eso sí pierde avisos)
+
+def _bus(directorio):
+    return bus_mod.Bus(Flask(__name__), bus_mod.TransporteArchivo(directorio), intervalo=0.005)
+
+def _suscriptor(directorio, listo, resultados):
+    bus = _bus(directorio)
+    vistos = set()
+    bus.suscribir('prueba', lambda claves: vistos.update(map(tuple, claves)))
+    bus.iniciar()
+    listo.set()
+    fin = time.monotonic() + ESPERA
+    while time.monotonic() < fin and len(vistos) < PUBLICADORES * MENSAJES:
+        time.sleep(0.05)
+    resultados.put(sorted(vistos))
+
+def _publicador(directorio, numero):
+    bus = _bus(directorio)
+    for mensaje in range(MENSAJES):
+        bus.publicar('prueba', [[numero, mensaje]])
+        time.sleep(PAUSA)
+
+def test_todos_los_suscriptores_reciben_todo_con_rotacion(tmp_path, monkeypatch):
+    # Segmentos chicos: cada publicador pasa por varias rotaciones y borrados
+    monkeypatch.setattr(bus_mod, 'MAX_ARCHIVO', 4096)
+    directorio = str(tmp_path / 'bus')
+    ctx = multiprocessing.get_context('fork')
+    resultados = ctx.Queue()
+    listos = [ctx.Event() for _ in range(SUSCRIPTORES)]
+    suscriptores = [ctx.Process(target=_suscriptor, args=(directorio, listo, resultados)) for listo in listos]
+    for proceso in suscriptores:
+        proceso.start()
+    for listo in listos:
+        assert listo.wait(ESPERA)
+
+    publicadores = [ctx.Process(target=_publicador, args=(directorio, numero)) for numero in range(PUBLICADORES)]
+    for proceso in publicadores:
+        proceso.start()
+    for proceso in publicadores:
+        proceso.join(ESPERA)
+        assert proceso.exitcode == 0
+
+    esperados = sorted((numero, mensaje) for numero in range(PUBLICADORES) for mensaje in range(MENSAJES))
+    recibidos = [resultados.get(timeout=ESPERA) for _ in suscriptores]
+    for proceso in suscriptores:
+        proceso.join(ESPERA)
+    assert bus_mod.TransporteArchivo(directorio)._segmentos()[-1] > bus_mod.SEGMENTOS_GUARDADOS  # Hubo rotación
+    assert all([tuple(clave) for clave in vistos] == esperados for vistos in recibidos)
+
+RUT_ANTERIOR = '12.345.678-5'
+RUT_NUEVO = '11.111.111-1'
+WORKERS = 4
+
+def _app(tmp_path):
+    from app import create_app
+    from app.config import Config
+
+    class ConfigPrueba(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'alumnos.db'}"
+        BUS_BACKEND = 'archivo'
+        BUS_DIR = str(tmp_path / 'bus')
+        BUS_INTERVALO = 0.05
+        CHECKIN_INDEX_TTL = 3600  # Sin el bus, el RUT anterior seguiría en el índice todo este tiempo
+        TEMPLATE_WARMUP = False
+        LOG_NIVEL = 'WARNING'
+
+    return create_app(ConfigPrueba)
+
+def _worker(app, indice, listo, cambiar, cambiado, resultados):
+    from app import db
+    from app.models.alumno import Alumno
+    from app.utils.cache import invalidate_alumno
+    from app.utils.checkin import resolver_codigo
+
+    with app.app_context():
+        db.engine.dispose()  # No compartir conexiones con el proceso padre
+        app.extensions['bus'].iniciar()
+        cargado = resolver_codigo(RUT_ANTERIOR) is not None  # Carga el índice de RUT de este worker
+        listo.set()
+
+        if indice == 0:
+            cambiar.wait(ESPERA)
+            alumno = Alumno.query.filter_by(rut_num=12345678).one()
+            version = alumno.version
+            alumno.rut = RUT_NUEVO
+            db.session.commit()
+            invalidate_alumno(alumno.id, version)
+            cambiado.set()
+        else:
+            cambiado.wait(ESPERA)
+
+        fin = time.monotonic() + ESPERA
+        while resolver_codigo(RUT_ANTERIOR) is not None and time.monotonic() < fin:
+            time.sleep(0.05)
+        resultados.put({
+            'worker': indice,
+            'cargado': cargado,
+            'anterior': resolver_codigo(RUT_ANTERIOR),
+            'nuevo': resolver_codigo(RUT_NUEVO) is not None,
+        })
+
+def test_rut_anterior_rechazado_en_todos_los_workers(tmp_path):
+    from app import db
+    from app.models.alumno import Alumno
+
+    app = _app(tmp_path)
+    with app.app_context():
+        alumno = Alumno(rut=RUT_ANTERIOR, nombre='Juan', apellido='Pérez',
+                        fecha_nacimiento=date(1990, 5, 1),
+                        cinturon='Azul', nivel=1)
+        db.session.add(alumno)
+        db.session.commit()
+
+    ctx = multiprocessing.get_context('fork')
+    resultados = ctx.Queue()
+    listos = [ctx.Event() for _ in range(WORKERS)]
+    cambiar, cambiado = ctx.Event(), ctx.Event()
+    workers = [ctx.Process(target=_worker, args=(app, indice, listo, cambiar, cambiado, resultados))
+               for indice, listo in enumerate(listos)]
+    for proceso in workers:
+        proceso.start()
+    for listo in listos:
+        assert listo.wait(ESPERA)
+    cambiar.set()
+
+    finales = sorted((resultados.get(timeout=ESPERA * 2) for _ in workers), key=lambda r: r['worker'])
+    for proceso in workers:
+        proceso.join(ESPERA)
+    assert all(final['cargado'] for final in finales)
+    assert [final['anterior'] for final in finales] == [None] * WORKERS
+    assert all(final['nuevo'] for final in finales)